@@ -0,0 +1,175 @@
+# Before/after benchmark for the precompiled extraction engine.
+#
+#   python benchmarks/bench_extraction.py [--rounds N]
+#
+# Checks that core.extraction.extract_intel returns the same intel as the old
+# per-rule implementation on the scam corpus (identifiers compared in their
+# canonical form, see core/entities.py), then times both.
+
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.entities import IDENTIFIER_KEYS, canonical_values
+from core.extraction import extract_intel
+from benchmarks.corpus import CORPUS, SMS, LONG_PASTE, VOICE, ADVERSARIAL
+
+
+def legacy_extract(text: str) -> dict:
+    """
+    The pre-engine implementation, kept verbatim as the "before" baseline.
+    """
+    intel = {
+        "scammerName": [],
+        "bankAccounts": [],
+        "upiIds": [],
+        "phishingLinks": [],
+        "phoneNumbers": [],
+        "jobTitle": [],
+        "companyNames": [],
+        "location": [],
+        "suspiciousKeywords": []
+    }
+    
+    # Name Extraction (myself [Name], I am [Name], etc.)
+    name_match = re.search(r'(?:myself|i am|this is|i\'m)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)', text, re.IGNORECASE)
+    if name_match:
+        intel["scammerName"].append(name_match.group(1).strip())
+    
+    # Bank account patterns (Indian format - usually 11+ digits to avoid phone collision)
+    bank_patterns = [
+        r'\b\d{11,18}\b',  # 11-18 digit account numbers
+        r'\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b'  # Formatted (16 digits)
+    ]
+    for pattern in bank_patterns:
+        matches = re.findall(pattern, text)
+        intel["bankAccounts"].extend(matches)
+    
+    # UPI IDs
+    upi_pattern = r'\b[\w\.\-]+@[\w]+\b'
+    intel["upiIds"] = re.findall(upi_pattern, text)
+    
+    # Phone numbers (Indian format)
+    phone_patterns = [
+        r'\+91[-\s]?\d{10}',
+        r'\b[6-9]\d{9}\b',
+        r'\b\d{3}[-\s]\d{3}[-\s]\d{4}\b'
+    ]
+    for pattern in phone_patterns:
+        matches = re.findall(pattern, text)
+        intel["phoneNumbers"].extend(matches)
+    
+    # URLs/Links
+    url_pattern = r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
+    intel["phishingLinks"] = re.findall(url_pattern, text)
+    
+    job_keywords = ['manager', 'officer', 'department', 'division', 'supervisor', 'agent', 'support']
+    for word in job_keywords:
+        if word in text.lower():
+            # Extract only a few words around the keyword, but STOP at prepositions
+            # This prevents "branch manager at new delhi" from being one block
+            match = re.search(fr'((?:\w+\W+){{0,2}}\b{word}\b)', text, re.IGNORECASE)
+            if match:
+                clean_job = match.group(1).strip().lower()
+                # Remove "i am", "myself", "this is"
+                clean_job = re.sub(r'^(i am|myself|this is|is|am|a)\s+', '', clean_job)
+                intel["jobTitle"].append(clean_job.title())
+    
+    # Location Extraction (Indian Cities & General Keywords)
+    cities = ['Delhi', 'Mumbai', 'Bangalore', 'Chennai', 'Kolkata', 'Hyderabad', 'Pune', 'Ahmedabad', 'Gurgaon', 'Noida']
+    city_pattern = fr"\b(?:{'|'.join(cities)})\b"
+    intel["location"] = re.findall(city_pattern, text, re.IGNORECASE)
+    # Also check for "at [Place]" or "from [Place]"
+    place_match = re.search(r'(?:at|from|in)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)', text)
+    if place_match:
+        intel["location"].append(place_match.group(1).strip())
+
+    # Suspicious keywords
+    keywords = [
+        'urgent', 'verify', 'suspended', 'blocked', 'immediately',
+        'account', 'security', 'update', 'confirm', 'expire',
+        'risk', 'unauthorized', 'unusual activity', 'click here',
+        'limited time', 'act now', 'verify now', 'customer care',
+        'prize', 'winner', 'congratulations', 'refund', 'KYC'
+    ]
+    found_keywords = [kw for kw in keywords if kw.lower() in text.lower()]
+    intel["suspiciousKeywords"] = found_keywords
+    
+    # Remove duplicates and substring overlaps
+    for key in intel:
+        items = list(set(intel[key]))
+        items.sort(key=len, reverse=True)
+        unique_items = []
+        for item in items:
+            if not any(item.lower() in u.lower() for u in unique_items):
+                unique_items.append(item)
+        intel[key] = unique_items
+
+    # Deduplicate Names from Job Titles
+    # If a job title contains a name that was extracted, clean the job title
+    names = intel.get("scammerName", [])
+    if names:
+        cleaned_jobs = []
+        for job in intel["jobTitle"]:
+            cleaned_job = job
+            for name in names:
+                # Case insensitive removal of name from job title
+                cleaned_job = re.sub(rf'\b{re.escape(name)}\b', '', cleaned_job, flags=re.IGNORECASE).strip(' ,')
+            if cleaned_job:
+                cleaned_jobs.append(cleaned_job)
+        intel["jobTitle"] = cleaned_jobs
+    
+    return intel
+
+
+def same_intel(a: dict, b: dict) -> bool:
+    # Old dedup went through set(), so order within a key was arbitrary. It
+    # also dropped identifiers contained in a longer one ("911234567890" in
+    # "4567 911234567890"); canonical entities keep both, so that rule is
+    # applied to both sides before comparing.
+    def norm(intel, key):
+        if key not in IDENTIFIER_KEYS:
+            return sorted(intel[key])
+        values = sorted(set(canonical_values(key, intel[key])), key=len, reverse=True)
+        return sorted(v for i, v in enumerate(values) if not any(v in longer for longer in values[:i]))
+    return a.keys() == b.keys() and all(norm(a, k) == norm(b, k) for k in a)
+
+
+def time_fn(fn, texts, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for t in texts:
+            fn(t)
+    elapsed = time.perf_counter() - start
+    return elapsed, rounds * len(texts) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    mismatches = [t for t in CORPUS if not same_intel(legacy_extract(t), extract_intel(t))]
+    print(f"Equivalence: {len(CORPUS) - len(mismatches)}/{len(CORPUS)} messages identical")
+    for t in mismatches:
+        print(f"  MISMATCH: {t[:80]!r}")
+        print(f"    before: {legacy_extract(t)}")
+        print(f"    after:  {extract_intel(t)}")
+
+    print(f"\n{'set':<12}{'msgs':>6}{'before ops/s':>16}{'after ops/s':>16}{'speedup':>10}")
+    for label, texts in [("sms", SMS), ("long_paste", LONG_PASTE), ("voice", VOICE),
+                         ("adversarial", ADVERSARIAL), ("all", CORPUS)]:
+        rounds = max(1, args.rounds if label != "adversarial" else args.rounds // 10)
+        _, before = time_fn(legacy_extract, texts, rounds)
+        _, after = time_fn(extract_intel, texts, rounds)
+        print(f"{label:<12}{len(texts):>6}{before:>16,.0f}{after:>16,.0f}{after / before:>9.2f}x")
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
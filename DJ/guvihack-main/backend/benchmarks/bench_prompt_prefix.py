@@ -0,0 +1,109 @@
+# Prompt prefix reuse and time-to-first-token: old single-system-message layout
+# (session state in the middle of the persona prompt) vs the static-prefix layout.
+#
+#   GROQ_API_KEY=... python benchmarks/bench_prompt_prefix.py [--turns 8] [--persona grandma]
+#
+# Plays the same conversation through both layouts, streaming each completion,
+# and prints TTFT, total latency and the prompt/cached token counts the provider
+# reports. Needs network access to the Groq API (or GROQ_BASE_URL pointed at a
+# compatible server).
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import SMS, VOICE
+from core.llm import VigilanteBrain
+from core.prompts import RESPONSE_RULES, get_persona
+
+
+def legacy_messages(brain: VigilanteBrain, user_input: str, persona, history: list, intel: dict) -> list:
+    """
+    Pre-change layout: one system message with the dynamic state between the
+    persona prompt and the format rules.
+    """
+    prefix, state, user = brain.build_messages(user_input, persona, history, intel)
+    system_msg = f"{persona.system_prompt}\n\n{state['content']}\n\n{RESPONSE_RULES}"
+    return [{"role": "system", "content": system_msg}, user]
+
+
+def shared_prefix(a: str, b: str) -> int:
+    n = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        n += 1
+    return n
+
+
+async def run_layout(brain: VigilanteBrain, label: str, build, persona, turns: int):
+    history, intel = [], {}
+    scam_lines = SMS + VOICE
+    previous = ""
+    rows = []
+    for turn in range(turns):
+        message = scam_lines[turn % len(scam_lines)]
+        messages = build(message, persona, history, intel)
+        rendered = "".join(m["content"] for m in messages)
+        reused = shared_prefix(previous, rendered)
+        previous = rendered
+
+        started = time.perf_counter()
+        ttft = None
+        usage = None
+        text = []
+        stream = await brain.client.chat.completions.create(
+            messages=messages, model="llama-3.3-70b-versatile",
+            temperature=0.7, max_tokens=200, stream=True
+        )
+        async for chunk in stream:
+            x_groq = getattr(chunk, "x_groq", None)
+            if x_groq is not None and getattr(x_groq, "usage", None) is not None:
+                usage = x_groq.usage
+            if chunk.choices and chunk.choices[0].delta.content:
+                if ttft is None:
+                    ttft = time.perf_counter() - started
+                text.append(chunk.choices[0].delta.content)
+        latency = time.perf_counter() - started
+
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) if usage else 0
+        details = getattr(usage, "prompt_tokens_details", None) if usage else None
+        cached = (getattr(details, "cached_tokens", 0) or 0) if details else 0
+        rows.append((ttft or latency, latency, prompt_tokens, cached, reused / max(1, len(rendered))))
+
+        history.append({"sender": "scammer", "text": message})
+        try:
+            reply = json.loads("".join(text)).get("reply", "")
+        except ValueError:
+            reply = "ok"
+        history.append({"sender": "user", "text": reply})
+        if turn == 2:
+            intel = {"phoneNumbers": ["9876543210"]}  # phase flips to EXTRACTION mid-run
+
+    ttfts = sorted(r[0] for r in rows[1:]) or [rows[0][0]]
+    print(f"{label:<16} ttft p50 {ttfts[len(ttfts) // 2] * 1000:>7.0f}ms   "
+          f"latency p50 {sorted(r[1] for r in rows)[len(rows) // 2] * 1000:>7.0f}ms   "
+          f"prompt tok {sum(r[2] for r in rows):>7}   cached tok {sum(r[3] for r in rows):>7}   "
+          f"prefix shared with previous turn {sum(r[4] for r in rows[1:]) / max(1, len(rows) - 1):.0%}")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=8)
+    parser.add_argument("--persona", default="grandma")
+    args = parser.parse_args()
+
+    brain = VigilanteBrain()
+    persona = get_persona(args.persona)
+    await run_layout(brain, "legacy layout",
+                     lambda *a: legacy_messages(brain, *a), persona, args.turns)
+    await run_layout(brain, "static prefix", brain.build_messages, persona, args.turns)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,102 @@
+# Read/write latency of the session stores under concurrent workers.
+#
+#   python benchmarks/bench_session_store.py [--workers 4] [--ops 2000] [--sessions 500]
+#
+# Each worker process plays uvicorn-worker: for a random session it does one
+# get (load state) and one put (save state) per simulated turn. The SQLite store
+# is shared by all workers through one WAL file; the memory store is per process,
+# so its numbers are the single-worker baseline.
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.session_intel import SessionIntel
+from services.session_store import MemorySessionStore, SQLiteSessionStore
+
+
+def make_state(i: int) -> SessionIntel:
+    state = SessionIntel()
+    state.merge({
+        "upiIds": [f"scammer{i}@ybl"],
+        "phoneNumbers": [f"98765{i:05d}"],
+        "suspiciousKeywords": ["urgent", "verify", "blocked", "KYC"],
+    })
+    state.seen = {f"{i:032x}{j}" for j in range(20)}
+    state.turns = 10
+    state.persona = "Mrs. Lakshmi Iyer"
+    return state
+
+
+def run_ops(store, ops: int, sessions: int, seed: int) -> tuple:
+    rng = random.Random(seed)
+    reads, writes = [], []
+    for _ in range(ops):
+        sid = f"session-{rng.randrange(sessions)}"
+        t0 = time.perf_counter()
+        state = store.get(sid)
+        t1 = time.perf_counter()
+        if state is None:
+            state = make_state(rng.randrange(10 ** 5))
+        state.turns += 1
+        store.put(sid, state)
+        t2 = time.perf_counter()
+        reads.append(t1 - t0)
+        writes.append(t2 - t1)
+    return reads, writes
+
+
+def sqlite_worker(args) -> tuple:
+    path, ops, sessions, seed = args
+    store = SQLiteSessionStore(path, dumps=SessionIntel.to_dict, loads=SessionIntel.from_dict)
+    try:
+        return run_ops(store, ops, sessions, seed)
+    finally:
+        store.close()
+
+
+def pct(values: list, p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] * 1e6
+
+
+def report(label: str, reads: list, writes: list, elapsed: float):
+    total = len(reads)
+    print(f"{label:<22}{total / elapsed:>10,.0f} turns/s   "
+          f"get p50 {pct(reads, .5):>7.0f}us p99 {pct(reads, .99):>7.0f}us   "
+          f"put p50 {pct(writes, .5):>7.0f}us p99 {pct(writes, .99):>7.0f}us")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--ops", type=int, default=2000, help="turns per worker")
+    parser.add_argument("--sessions", type=int, default=500)
+    args = parser.parse_args()
+
+    store = MemorySessionStore()
+    start = time.perf_counter()
+    reads, writes = run_ops(store, args.ops, args.sessions, 0)
+    report("memory (1 worker)", reads, writes, time.perf_counter() - start)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sessions.sqlite3")
+        for workers in sorted({1, args.workers}):
+            SQLiteSessionStore(path).close()  # create schema before the race
+            start = time.perf_counter()
+            with multiprocessing.Pool(workers) as pool:
+                results = pool.map(sqlite_worker, [(path, args.ops, args.sessions, seed) for seed in range(workers)])
+            elapsed = time.perf_counter() - start
+            report(f"sqlite ({workers} workers)",
+                   [r for reads, _ in results for r in reads],
+                   [w for _, writes in results for w in writes], elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# Fixed scam-message corpus shared by the benchmark scripts.
+# Messages are modelled on real SMS / WhatsApp / call-transcript scams seen by the
+# honeypot. Keep it deterministic: benchmarks compare numbers across runs.
+
+SMS = [
+    "Your bank account will be blocked today. Verify immediately.",
+    "Dear customer, your SBI account is suspended. Update KYC at http://sbi-kyc-update.in/verify now",
+    "URGENT: Your electricity connection will be disconnected tonight at 9:30pm. Call officer 9876543210",
+    "Congratulations! You are the winner of Rs 25,00,000 lottery prize. Send processing fee to lottery.win@ybl",
+    "Hello, this is Rajesh from HDFC Bank customer care. Your card 4532 7788 1122 9034 is blocked.",
+    "myself Vinod , general manager of state bank of india , delhi branch",
+    "I need your ID to unblock. It's SBI-9922.",
+    "Okay, now click this link to verify: http://sbi-verify-secure.com",
+    "Your Amazon refund of Rs 4,999 is pending. Share OTP to confirm. Call +91 9988776655",
+    "Sir I am calling from Mumbai cyber crime department. There is a warrant against your Aadhaar.",
+    "Transfer Rs 5000 to account 123456789012 IFSC SBIN0001234 immediately to avoid arrest",
+    "Pay the fine at paytm number 9123456780 or your number will be suspended in 2 hours",
+    "Your parcel from FedEx is held at Chennai customs. Pay duty via http://fedex-customs-pay.co/track?id=88231",
+    "This is Priya from ICICI Bank, we noticed unusual activity on your account. Please confirm your UPI PIN.",
+    "Limited time offer! Act now and get 50% cashback. Click here: https://bit.ly/3xYz9Qw",
+    "Hi mam, I am Suresh Kumar, supervisor at Airtel support division. Your SIM will expire today.",
+    "send 1 rupee to verify.me@oksbi and you will receive 10000 refund",
+    "Call our toll free 1800-419-4332 or WhatsApp 987-654-3210 for KYC update",
+    "Your PAN card is linked to money laundering. Officer Sharma from Delhi Police will call you.",
+    "Dear user your Netflix payment failed. Update card details at https://netflix-billing-help.com/login",
+]
+
+LONG_PASTE = [
+    (
+        "Dear Valued Customer,\n\nThis is to inform you that due to incomplete KYC documentation, your "
+        "account ending 4521 has been temporarily suspended as per RBI guidelines. To restore access you "
+        "must verify your identity within 24 hours, failing which the account will be permanently blocked "
+        "and the balance will be transferred to the government treasury. Please click here "
+        "https://rbi-kyc-portal.co.in/update?ref=AC45219981 and enter your details, or contact our "
+        "customer care executive Mr. Anil Mehra (Senior Officer, Compliance Department) at +91-9812345670 "
+        "or 022-456-7890. You may also transfer a refundable security deposit of Rs 1,999 to "
+        "rbi.compliance@axisbank to expedite the process. Account for deposit: 50100234567891, IFSC "
+        "HDFC0000123, Branch: Andheri East, Mumbai. This is an automated message, do not reply.\n\n"
+        "Regards,\nRBI Customer Protection Cell, Kolkata Regional Office"
+    ),
+    (
+        "Congratulations!!! Your mobile number has been selected in the KBC Lucky Draw 2025 and you have "
+        "won a prize of Rs 35,00,000 (Thirty Five Lakhs). To claim your prize, contact our manager "
+        "Rana Pratap Singh on WhatsApp 8899001122. Registration fee Rs 12,500 must be paid via Google Pay "
+        "or PhonePe to kbc.lottery.office@okicici. Do not share this with anyone, otherwise the prize will "
+        "be cancelled. Limited time only, act now! Visit http://kbc-lucky-draw-2025.org/claim for details. "
+        "Our office is at Connaught Place, New Delhi. Winner ID: KBC/2025/88213. Congratulations again "
+        "from the entire KBC team and Sony Entertainment Television."
+    ),
+    (
+        "Hello sir this is from Income Tax Department. Your PAN ABCDE1234F has unauthorized transactions "
+        "of Rs 8,45,000 flagged for unusual activity. A case has been registered at Hyderabad cyber cell "
+        "and an arrest warrant will be issued within 2 hours unless you confirm your details. Our senior "
+        "officer Inspector Ramesh Gupta will verify your account. Keep your bank account number, debit card "
+        "number 5241 8890 1123 4456 and CVV ready. For immediate resolution transfer the security amount to "
+        "our RBI escrow account 918020045678123 or UPI taxrefund.gov@sbi. Call 7700112233 now."
+    ),
+]
+
+VOICE = [
+    "hello madam this is vikram calling from your bank the account will be blocked today",
+    "please note the upi id it is vikram dot sharma at ybl okay vikram dot sharma at ybl",
+    "my number is nine eight seven six five four three two one zero you can call me back",
+    "send the money to double nine eight eight seven seven six six five five",
+    "someone often calls you from our office the officer will verify your kyc",
+    "the account number is one two three four five six seven eight nine zero one two",
+    "i am speaking from the mumbai branch sir just tell me the otp quickly",
+    "verify now otherwise your sim will be suspended in one hour i am the senior manager",
+]
+
+# Inputs that stress the regexes: long digit runs, repeated separators, many '@',
+# unicode, near-miss URLs.
+ADVERSARIAL = [
+    "9" * 400,
+    "1234 " * 200,
+    "a@b " * 300,
+    "http://" + "a" * 2000,
+    ("at " * 500) + "Delhi",
+    "call me call me call me " * 100 + "9876543210",
+    "अपना खाता सत्यापित करें तुरंत 9876543210 पर कॉल करें " * 20,
+    "i am " * 400,
+    "+91-" * 300,
+    "manager officer agent support " * 150,
+]
+
+# Numbers whose bank/phone matches overlap: each rule must still find its own
+# (the formatted 16-digit account spans the end of one number and the next).
+OVERLAPPING_NUMBERS = [
+    "022-123-4567 911234567890 officer",
+    "4567 98765 43210 pay 555 123 4567 911234567890",
+    "1234 5678 9012 3456 123456789012345678 555 123 4567 1234 5678 9012 3456 9876543210",
+    "12345678901 022-123-4567 1234-5678-9012-3456 123456789012345678",
+    "call +91 9876543210 or 9876 5432 1098 7654 3210 1234",
+]
+
+CORPUS = SMS + LONG_PASTE + VOICE + ADVERSARIAL + OVERLAPPING_NUMBERS
+
+
+def session_history(turns: int) -> list:
+    """
+    A synthetic multi-turn conversation built from the corpus, in the
+    conversationHistory format the webhook receives.
+    """
+    history = []
+    replies = ["oh dear who is this", "wait wait let me find my glasses", "ok beta what should i do",
+               "my grandson handles all this", "arey the link is not opening"]
+    messages = SMS + VOICE
+    for i in range(turns):
+        history.append({"sender": "scammer", "text": messages[i % len(messages)]})
+        history.append({"sender": "user", "text": replies[i % len(replies)]})
+    return history
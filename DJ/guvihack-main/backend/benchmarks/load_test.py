@@ -0,0 +1,217 @@
+# Concurrent multi-turn load test for the webhook.
+#
+#   python benchmarks/load_test.py --spawn [--sessions 200] [--turns 6] [--workers 1]
+#                                  [--mock-latency 0.6] [--mock-jitter 0.2] [--mock-error-rate 0.02]
+#   python benchmarks/load_test.py --url http://127.0.0.1:8000 [--stream]
+#
+# Each simulated scammer session sends --turns messages in order, resending the
+# growing conversationHistory like the hackathon tester does. All sessions run
+# at once (capped by --concurrency). With --spawn the script starts
+# benchmarks/mock_groq.py and the backend (uvicorn) itself, pointing the backend
+# at the mock for both Groq and the GUVI callback, so no network or quota is used.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.corpus import SMS, VOICE
+
+API_KEY = "meowdj@32"
+FALLBACK_REPLIES = {"sorry wait... my phone is glitching. what did u say?", "Could you repeat that?"}
+
+
+class Results:
+    def __init__(self):
+        self.latencies = []
+        self.ttfts = []
+        self.errors = {}
+        self.fallbacks = 0
+
+    def error(self, kind: str):
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+
+
+def pct(values: list, p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] * 1000
+
+
+async def send_turn(client: httpx.AsyncClient, url: str, payload: dict, stream: bool, results: Results) -> str:
+    started = time.perf_counter()
+    try:
+        if not stream:
+            response = await client.post(f"{url}/webhook", json=payload, headers={"x-api-key": API_KEY})
+            if response.status_code != 200:
+                results.error(f"http_{response.status_code}")
+                return None
+            reply = response.json().get("reply", "")
+        else:
+            reply = None
+            async with client.stream("POST", f"{url}/webhook/stream", json=payload,
+                                     headers={"x-api-key": API_KEY}) as response:
+                if response.status_code != 200:
+                    results.error(f"http_{response.status_code}")
+                    return None
+                event = None
+                first_reply = None
+                async for line in response.aiter_lines():
+                    if line.startswith("event: "):
+                        event = line[7:]
+                        if event == "reply" and first_reply is None:
+                            first_reply = time.perf_counter() - started
+                    elif line.startswith("data: ") and event == "final":
+                        reply = json.loads(line[6:]).get("reply", "")
+                if first_reply is not None:
+                    results.ttfts.append(first_reply)
+            if reply is None:
+                results.error("stream_incomplete")
+                return None
+    except httpx.HTTPError as e:
+        results.error(type(e).__name__)
+        return None
+    results.latencies.append(time.perf_counter() - started)
+    if reply in FALLBACK_REPLIES:
+        results.fallbacks += 1
+    return reply
+
+
+async def run_session(client: httpx.AsyncClient, url: str, index: int, turns: int, stream: bool,
+                      slots: asyncio.Semaphore, results: Results):
+    rng = random.Random(index)
+    messages = SMS + VOICE
+    session_id = f"load-{os.getpid()}-{index}"
+    history = []
+    for turn in range(turns):
+        text = messages[rng.randrange(len(messages))]
+        payload = {
+            "sessionId": session_id,
+            "message": {"sender": "scammer", "text": text, "timestamp": int(time.time() * 1000)},
+            "conversationHistory": list(history),
+            "metadata": {"channel": "SMS", "language": "English", "locale": "IN"}
+        }
+        async with slots:
+            reply = await send_turn(client, url, payload, stream, results)
+        history.append({"sender": "scammer", "text": text})
+        history.append({"sender": "user", "text": reply or "hello?"})
+
+
+async def run_load(args) -> Results:
+    results = Results()
+    slots = asyncio.Semaphore(args.concurrency or args.sessions)
+    limits = httpx.Limits(max_connections=args.concurrency or args.sessions)
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        await asyncio.gather(*(run_session(client, args.url, i, args.turns, args.stream, slots, results)
+                               for i in range(args.sessions)))
+    return results
+
+
+def spawn(args) -> list:
+    """
+    Starts the mock Groq server and the backend; returns the processes.
+    """
+    mock_url = f"http://127.0.0.1:{args.mock_port}"
+    tmp = tempfile.mkdtemp(prefix="vigilante-load-")
+    mock = subprocess.Popen([
+        sys.executable, os.path.join(BACKEND_DIR, "benchmarks", "mock_groq.py"),
+        "--port", str(args.mock_port), "--latency", str(args.mock_latency),
+        "--jitter", str(args.mock_jitter), "--error-rate", str(args.mock_error_rate),
+        "--ttft", str(args.mock_ttft)
+    ])
+    env = dict(os.environ,
+               GROQ_BASE_URL=mock_url,
+               GROQ_API_KEY=os.getenv("GROQ_API_KEY", "gsk_mock"),
+               GUVI_CALLBACK_URL=f"{mock_url}/callback",
+               CALLBACK_OUTBOX=os.path.join(tmp, "callback_outbox.jsonl"),
+               LLM_CACHE_BYPASS="1",          # measure the pipeline, not cache hits
+               LOG_LEVEL=os.getenv("LOG_LEVEL", "warning"))
+    port = args.url.rsplit(":", 1)[-1].strip("/")
+    backend = subprocess.Popen([
+        sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", port,
+        "--workers", str(args.workers), "--log-level", "warning"
+    ], cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL)
+
+    deadline = time.time() + 30
+    for url in (mock_url + "/stats", args.url + "/"):
+        while True:
+            try:
+                if httpx.get(url, timeout=1).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.time() > deadline:
+                stop(mock, backend)
+                sys.exit(f"{url} did not come up")
+            time.sleep(0.2)
+    return [mock, backend]
+
+
+def stop(*processes):
+    for process in processes:
+        if process.poll() is None:
+            process.send_signal(signal.SIGINT)
+    for process in processes:
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def report(args, results: Results, elapsed: float):
+    total = len(results.latencies) + sum(results.errors.values())
+    print(f"\n{args.sessions} sessions x {args.turns} turns, concurrency {args.concurrency or args.sessions}, "
+          f"{'stream' if args.stream else 'webhook'}")
+    print(f"requests     {total}  ({len(results.latencies)} ok) in {elapsed:.1f}s  ->  {total / elapsed:,.1f} req/s")
+    print(f"latency      p50 {pct(results.latencies, .5):7.0f}ms   p95 {pct(results.latencies, .95):7.0f}ms   "
+          f"p99 {pct(results.latencies, .99):7.0f}ms   max {pct(results.latencies, 1):7.0f}ms")
+    if results.ttfts:
+        print(f"first reply  p50 {pct(results.ttfts, .5):7.0f}ms   p95 {pct(results.ttfts, .95):7.0f}ms   "
+              f"p99 {pct(results.ttfts, .99):7.0f}ms")
+    print(f"fallbacks    {results.fallbacks}")
+    print(f"errors       {sum(results.errors.values())}  {results.errors or ''}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=6)
+    parser.add_argument("--concurrency", type=int, default=0, help="max requests in flight (default: one per session)")
+    parser.add_argument("--stream", action="store_true", help="use /webhook/stream and record time to first reply")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--spawn", action="store_true", help="start mock Groq + backend locally")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers with --spawn")
+    parser.add_argument("--mock-port", type=int, default=8100)
+    parser.add_argument("--mock-latency", type=float, default=0.6)
+    parser.add_argument("--mock-jitter", type=float, default=0.2)
+    parser.add_argument("--mock-error-rate", type=float, default=0.02)
+    parser.add_argument("--mock-ttft", type=float, default=0.25)
+    args = parser.parse_args()
+    args.url = args.url.rstrip("/")
+
+    processes = spawn(args) if args.spawn else []
+    try:
+        started = time.perf_counter()
+        results = asyncio.run(run_load(args))
+        report(args, results, time.perf_counter() - started)
+        if args.spawn:
+            print(f"mock groq    {httpx.get(f'http://127.0.0.1:{args.mock_port}/stats').json()}")
+    finally:
+        stop(*processes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+# Microbenchmarks with regression gates for the per-turn extraction/detection code.
+#
+#   python benchmarks/microbench.py                 compare against the baseline, exit 1 on regression
+#   python benchmarks/microbench.py --save          record a new baseline
+#   python benchmarks/microbench.py --only detect   run cases whose name contains "detect"
+#
+# For every case: ops/sec (median of --repeats timed runs), the run-to-run
+# spread of those repeats (interquartile range over the median), and allocations per op (tracemalloc peak and
+# allocated blocks). Throughput is compared raw, so record the baseline on the
+# machine that runs the gate. A case fails when its ops/sec drops by more than
+# --threshold plus the larger of its baseline and current spread, or its peak
+# allocation grows by more than --alloc-threshold. When the baseline came from
+# a different machine/Python, throughput drops are only reported as warnings
+# and just the allocation check can fail the run.
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import SMS, LONG_PASTE, VOICE, ADVERSARIAL, session_history
+from core.extraction import extract_intel
+from core.keywords import KEYWORDS
+from core.llm import VigilanteBrain
+from core.voice_text import VoiceNormalizer
+from services.intelligence import IntelligenceExtractor
+from services.session_intel import IntelAccumulator
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "microbench_baseline.json")
+INPUT_SETS = {"sms": SMS, "long_paste": LONG_PASTE, "voice": VOICE, "adversarial": ADVERSARIAL}
+
+
+def machine() -> dict:
+    """
+    What a raw ops/sec baseline is only valid for.
+    """
+    return {"python": sys.version.split()[0], "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(), "cpus": os.cpu_count()}
+
+
+def normalize_streamed(text: str) -> str:
+    """
+    A transcript arriving as ~3-word STT partials.
+    """
+    normalizer = VoiceNormalizer()
+    out = [normalizer.feed(text[i:i + 16]) for i in range(0, len(text), 16)]
+    return "".join(out) + normalizer.flush()
+
+
+def build_cases() -> list:
+    """
+    (name, fn, inputs): fn is called once per input; one op = one call.
+    """
+    extractor = IntelligenceExtractor()
+    brain = VigilanteBrain()
+    cases = []
+    for label, texts in INPUT_SETS.items():
+        cases.append((f"extractor.extract/{label}", extractor.extract, texts))
+        cases.append((f"extractor.normalize_voice/{label}", extractor._normalize_voice_text, texts))
+        cases.append((f"extractor.detect_scam/{label}", extractor.detect_scam, texts))
+        cases.append((f"brain.extract_intel/{label}", brain.extract_intelligence_from_text, texts))
+    cases.append(("keywords.scan/long_paste", KEYWORDS.scan, LONG_PASTE))
+    cases.append(("voice.normalize_stream/voice", normalize_streamed, VOICE))
+
+    # History cost: a new session extracts the whole history once (cold); later
+    # turns resend it and only the new tail is extracted (warm).
+    for turns in (10, 50):
+        history = session_history(turns)
+        warm = IntelAccumulator(extract_intel)
+        warm.update("bench", history)
+        cases.append((f"history.cold/{turns}_turns",
+                      lambda h: IntelAccumulator(extract_intel).update("bench", h), [history]))
+        cases.append((f"history.warm/{turns}_turns",
+                      lambda h, acc=warm: acc.update("bench", h), [history]))
+        cases.append((f"history.cold_with_context/{turns}_turns",
+                      lambda h: IntelAccumulator(extract_intel).update_with_context("bench", h), [history]))
+    return cases
+
+
+def measure(fn, inputs: list, min_time: float, repeats: int) -> dict:
+    for item in inputs:          # warm-up (regex caches, lazy imports)
+        fn(item)
+
+    # Pick a loop count that runs for about min_time
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            for item in inputs:
+                fn(item)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or loops >= 1 << 20:
+            break
+        loops *= 2
+
+    times = [elapsed]
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            for item in inputs:
+                fn(item)
+        times.append(time.perf_counter() - start)
+    ops = loops * len(inputs)
+    median = statistics.median(times)
+    q1, _, q3 = statistics.quantiles(times, n=4)
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base_current, _ = tracemalloc.get_traced_memory()
+    blocks_before = sys.getallocatedblocks()
+    peak = 0
+    for item in inputs:
+        tracemalloc.reset_peak()
+        fn(item)
+        _, item_peak = tracemalloc.get_traced_memory()
+        peak = max(peak, item_peak - base_current)
+    retained = sys.getallocatedblocks() - blocks_before
+    tracemalloc.stop()
+
+    return {"ops_per_sec": ops / median, "spread": (q3 - q1) / median,
+            "peak_bytes_per_op": max(0, peak), "retained_blocks": max(0, retained)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--save", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=0.25, help="max ops/sec drop beyond run-to-run spread (0.25 = 25%%)")
+    parser.add_argument("--alloc-threshold", type=float, default=0.5, help="max peak allocation growth")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timed run")
+    parser.add_argument("--repeats", type=int, default=7)
+    parser.add_argument("--only", default="", help="substring filter on case names")
+    args = parser.parse_args()
+
+    cases = [c for c in build_cases() if args.only in c[0]]
+    baseline = None
+    if not args.save and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    here = machine()
+    foreign = bool(baseline) and baseline.get("machine") != here
+    if foreign:
+        print(f"WARNING: baseline was recorded on {baseline.get('machine')}, this is {here}; "
+              f"ops/sec drops are reported but do not fail the run")
+
+    results = {}
+    failures = []
+    warnings = []
+    print(f"\n{'case':<44}{'ops/s':>12}{'spread':>8}{'peak B/op':>11}{'blocks':>8}{'vs base':>9}")
+    for name, fn, inputs in cases:
+        r = measure(fn, inputs, args.min_time, args.repeats)
+        results[name] = r
+        verdict = ""
+        old = (baseline or {}).get("cases", {}).get(name)
+        if old:
+            ratio = r["ops_per_sec"] / old["ops_per_sec"]
+            noise = max(r["spread"], old.get("spread", 0.0))
+            verdict = f"{ratio:>8.2f}x"
+            if ratio < 1 - args.threshold - noise:
+                (warnings if foreign else failures).append(f"{name}: {ratio:.2f}x of baseline throughput")
+                verdict += " SLOW"
+            if r["peak_bytes_per_op"] > max(1024, old["peak_bytes_per_op"] * (1 + args.alloc_threshold)):
+                failures.append(f"{name}: peak {r['peak_bytes_per_op']} B/op vs {old['peak_bytes_per_op']} B/op")
+                verdict += " ALLOC"
+        print(f"{name:<44}{r['ops_per_sec']:>12,.0f}{r['spread']:>8.0%}{r['peak_bytes_per_op']:>11,}"
+              f"{r['retained_blocks']:>8}{verdict}")
+
+    if args.save:
+        if args.only and os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                results = {**json.load(f)["cases"], **results}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"machine": here, "cases": results},
+                      f, indent=2, sort_keys=True)
+        print(f"\nBaseline written to {args.baseline}")
+        return
+
+    if baseline is None:
+        print("\nNo baseline yet; run with --save to record one.")
+        return
+    if warnings:
+        print("\nSLOWER THAN BASELINE (other machine, not gated):")
+        for warning in warnings:
+            print(f"  {warning}")
+    if failures:
+        print("\nREGRESSIONS:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# Local stand-in for the Groq chat-completions API, for load tests without
+# network access or API quota.
+#
+#   python benchmarks/mock_groq.py [--port 8100] [--latency 0.6] [--jitter 0.2]
+#                                  [--error-rate 0.02] [--ttft 0.25]
+#   GROQ_BASE_URL=http://127.0.0.1:8100 uvicorn main:app
+#
+# Serves POST /openai/v1/chat/completions, streaming and non-streaming, plus
+# POST /callback as a GUVI callback sink. Replies are valid brain JSON.
+# Latency is normal(latency, jitter) clipped at 0; a fraction --error-rate of
+# requests get a 500 or 429.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+REPLIES = [
+    ("oh dear beta, which bank did u say?", "verifying ID"),
+    ("wait wait my glasses... what is ur name again", "stalling"),
+    ("arey the link is not opening, send again na", "faking error"),
+    ("ok ok but where do i send the money, which upi?", "extracting UPI"),
+    ("my grandson handles all this, give me ur number", "extracting phone"),
+]
+
+CONFIG = {"latency": 0.6, "jitter": 0.2, "error_rate": 0.02, "ttft": 0.25}
+STATS = {"requests": 0, "streamed": 0, "errors": 0, "callbacks": 0}
+
+app = FastAPI(title="Mock Groq")
+
+
+def _delay(mean: float) -> float:
+    return max(0.0, random.gauss(mean, CONFIG["jitter"]))
+
+
+def _brain_json() -> str:
+    reply, strategy = random.choice(REPLIES)
+    return json.dumps({
+        "analysis": "Scammer is pushing for payment",
+        "strategy": strategy,
+        "reply": reply,
+        "extractedIntel": {
+            "scammerName": [], "bankAccounts": [], "upiIds": [], "phishingLinks": [], "phoneNumbers": [],
+            "jobTitle": [], "companyNames": [], "location": [], "suspiciousKeywords": []
+        }
+    })
+
+
+def _usage(body: dict, content: str) -> dict:
+    prompt_chars = sum(len(m.get("content") or "") for m in body.get("messages", []))
+    prompt_tokens = prompt_chars // 4
+    completion_tokens = len(content) // 4
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens}
+
+
+@app.post("/openai/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    STATS["requests"] += 1
+    if random.random() < CONFIG["error_rate"]:
+        STATS["errors"] += 1
+        await asyncio.sleep(_delay(CONFIG["ttft"]))
+        status = random.choice([500, 429])
+        return JSONResponse(status_code=status, content={"error": {"message": "mock failure", "type": "mock"}})
+
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+    created = int(time.time())
+    model = body.get("model", "llama-3.3-70b-versatile")
+    content = _brain_json()
+
+    if not body.get("stream"):
+        await asyncio.sleep(_delay(CONFIG["latency"]))
+        return {
+            "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": _usage(body, content)
+        }
+
+    STATS["streamed"] += 1
+
+    async def events():
+        await asyncio.sleep(_delay(CONFIG["ttft"]))
+        pieces = [content[i:i + 12] for i in range(0, len(content), 12)]
+        per_piece = max(0.0, CONFIG["latency"] - CONFIG["ttft"]) / max(1, len(pieces))
+        for i, piece in enumerate(pieces):
+            chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                     "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+            yield f"data: {json.dumps(chunk)}\n\n"
+            if per_piece:
+                await asyncio.sleep(per_piece)
+        final = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                 "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                 "x_groq": {"id": completion_id, "usage": _usage(body, content)}}
+        yield f"data: {json.dumps(final)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.post("/callback")
+async def callback(request: Request):
+    # Stand-in for the GUVI final-result endpoint (GUVI_CALLBACK_URL) during load tests
+    await request.body()
+    STATS["callbacks"] += 1
+    return {"status": "ok"}
+
+
+@app.get("/stats")
+def stats():
+    return {**STATS, "config": CONFIG}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=CONFIG["latency"], help="mean seconds per completion")
+    parser.add_argument("--jitter", type=float, default=CONFIG["jitter"], help="stddev seconds")
+    parser.add_argument("--error-rate", type=float, default=CONFIG["error_rate"])
+    parser.add_argument("--ttft", type=float, default=CONFIG["ttft"], help="mean seconds to first streamed token")
+    args = parser.parse_args()
+    CONFIG.update(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, ttft=args.ttft)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
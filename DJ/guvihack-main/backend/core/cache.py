@@ -0,0 +1,156 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Scammers reuse word-for-word scripts, so the same (persona, message, context)
+# keeps coming back. Cache the brain's JSON reply: an in-memory LRU with TTL in
+# front of an optional SQLite file that survives restarts. get()/put() serve
+# the memory tier inline and run the SQLite tier in a worker thread, so a slow
+# disk never stalls the event loop. Every LLM_CACHE_PURGE_EVERY writes, expired
+# rows are deleted and the file is trimmed to LLM_CACHE_DB_MAX_ROWS.
+
+LLM_CACHE_BYPASS = os.getenv("LLM_CACHE_BYPASS", "0") == "1"
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2048"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "3600"))
+LLM_CACHE_DB = os.getenv("LLM_CACHE_DB")  # e.g. "llm_cache.sqlite3"; unset = memory only
+LLM_CACHE_DB_MAX_ROWS = int(os.getenv("LLM_CACHE_DB_MAX_ROWS", "100000"))
+LLM_CACHE_PURGE_EVERY = int(os.getenv("LLM_CACHE_PURGE_EVERY", "500"))
+
+_WS_RE = re.compile(r"\s+")
+# Sentence punctuation only; dots inside links and UPI IDs are kept
+_PUNCT_RE = re.compile(r"[.,!?;:]+(?=\s|$)")
+
+
+def normalize_message(text: str) -> str:
+    """
+    Case/whitespace/sentence-punctuation insensitive form of a message.
+    """
+    return _WS_RE.sub(" ", _PUNCT_RE.sub("", (text or "").lower())).strip()
+
+
+def make_cache_key(persona_name: str, user_input: str, context: str, intel: dict) -> str:
+    """
+    Key over everything that shapes the prompt: persona, latest message, the
+    conversation context the prompt shows, and the intel state.
+    """
+    payload = json.dumps([
+        persona_name,
+        normalize_message(user_input),
+        normalize_message(context),
+        {k: sorted(v) for k, v in (intel or {}).items() if v},
+    ], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = LLM_CACHE_MAX_ENTRIES, ttl: float = LLM_CACHE_TTL,
+                 db_path: str = LLM_CACHE_DB, bypass: bool = LLM_CACHE_BYPASS,
+                 max_rows: int = LLM_CACHE_DB_MAX_ROWS, purge_every: int = LLM_CACHE_PURGE_EVERY):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.bypass = bypass
+        self.max_rows = max_rows
+        self.purge_every = max(1, purge_every)
+        self._writes = 0
+        self._memory = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()     # memory tier; never held across disk I/O
+        self._db_lock = threading.Lock()  # the one SQLite connection
+        self._db = None
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "bypassed": 0}
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, value TEXT, expires_at REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS llm_cache_expires_at ON llm_cache (expires_at)")
+
+    async def get(self, key: str):
+        if self.bypass:
+            self.counters["bypassed"] += 1
+            return None
+        value = self._memory_get(key)
+        if value is None and self._db is not None:
+            value = await asyncio.to_thread(self._disk_get, key)
+        if value is None:
+            self.counters["misses"] += 1
+        return value
+
+    async def put(self, key: str, value: str):
+        if self.bypass:
+            return
+        expires_at = self._memory_put(key, value)
+        if self._db is not None:
+            self._writes += 1
+            purge = self._writes % self.purge_every == 0
+            await asyncio.to_thread(self._disk_put, key, value, expires_at, purge)
+
+    def _memory_get(self, key: str):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    self.counters["memory_hits"] += 1
+                    return entry[1]
+                del self._memory[key]
+        return None
+
+    def _memory_put(self, key: str, value: str) -> float:
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, value, expires_at)
+            self.counters["stores"] += 1
+        return expires_at
+
+    def _disk_get(self, key: str):
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row and row[1] > time.time():
+            with self._lock:
+                self._remember(key, row[0], row[1])
+                self.counters["disk_hits"] += 1
+            return row[0]
+        return None
+
+    def _disk_put(self, key: str, value: str, expires_at: float, purge: bool = False):
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at)
+            )
+        if purge:
+            self.purge_expired()
+
+    def _remember(self, key: str, value: str, expires_at: float):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def purge_expired(self):
+        """
+        Drops expired entries from both tiers and trims the SQLite file to max_rows.
+        """
+        now = time.time()
+        with self._lock:
+            for key in [k for k, (exp, _) in self._memory.items() if exp <= now]:
+                del self._memory[key]
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+                # Past the row cap, drop the entries closest to expiry
+                self._db.execute(
+                    "DELETE FROM llm_cache WHERE key IN ("
+                    "SELECT key FROM llm_cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_rows,)
+                )
@@ -0,0 +1,137 @@
+import os
+
+# Conversation context for the prompt, fitted to a token budget.
+#
+#   recent   - the newest history messages, verbatim, as many as fit
+#   pinned   - older messages that carried intel (name, UPI, account, link...),
+#              kept verbatim so the persona still knows who said what
+#   summary  - everything else that scrolled out, compressed to one short line
+#              per scammer message ("rolling": only new drop-outs are added)
+#
+# Pinned messages and the summary live on the session state (SessionIntel), so
+# each turn only folds the messages that just left the recent window.
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "600"))
+CONTEXT_PINNED_SHARE = 0.25    # of the budget, for intel-bearing older messages
+CONTEXT_SUMMARY_SHARE = 0.20   # of the budget, for the rolling summary
+PINNED_MAX_CHARS = 300
+SUMMARY_LINE_CHARS = 80
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count (~4 characters per token for Llama-style tokenizers).
+    """
+    return (len(text) + 3) // 4 if text else 0
+
+
+def message_parts(msg) -> tuple:
+    """
+    (sender, text) for a history message (dict or MessageObj).
+    """
+    if isinstance(msg, dict):
+        sender = msg.get('sender') or msg.get('role') or "user"
+        text = msg.get('text') or msg.get('content') or ""
+    else:
+        sender = getattr(msg, 'sender', getattr(msg, 'role', 'user'))
+        text = getattr(msg, 'text', getattr(msg, 'content', ''))
+    return sender, text
+
+
+def _line(msg, max_chars: int = None) -> str:
+    sender, text = message_parts(msg)
+    label = "YOU" if sender in ['user', 'assistant'] else "SCAMMER"
+    text = " ".join(text.split())
+    if max_chars and len(text) > max_chars:
+        text = text[:max_chars - 3].rstrip() + "..."
+    return f"{label}: {text}"
+
+
+class ContextState:
+    """
+    The rolling part of a session's context. SessionIntel carries the same
+    fields; this class is for callers without a session (stateless trimming).
+    """
+    def __init__(self):
+        self.summary = []       # compressed lines for older turns
+        self.pinned = []        # verbatim lines of older intel-bearing messages
+        self.summarized = 0     # history messages folded into summary/pinned
+        self.intel_digests = set()
+
+
+class ContextBuilder:
+    def __init__(self, budget: int = CONTEXT_TOKEN_BUDGET):
+        self.budget = budget
+
+    def build(self, history: list, state=None, digest_fn=None) -> dict:
+        """
+        Fits history into the budget and returns {"text", "tokens", "recent",
+        "pinned", "summarized"}. `state` (SessionIntel or ContextState) is
+        updated in place; `digest_fn` maps a message to the key used in
+        state.intel_digests to mark messages that carried intel.
+        """
+        state = state if state is not None else ContextState()
+        history = history or []
+        if state.summarized > len(history):
+            # History was trimmed or rewritten by the client; start over
+            state.summary, state.pinned, state.summarized = [], [], 0
+
+        recent_lines = [_line(m) for m in history]
+        recent_tokens = [estimate_tokens(line) + 1 for line in recent_lines]
+
+        # Folding grows pinned/summary, which shrinks the room for recent lines,
+        # so repeat until the window fits (each pass folds at least one message)
+        while True:
+            available = self.budget - self._reserved(state)
+            start = len(history)
+            used = 0
+            while start > state.summarized and (
+                    start == len(history) or used + recent_tokens[start - 1] <= available):
+                used += recent_tokens[start - 1]
+                start -= 1
+            if start == state.summarized:
+                break
+            self._fold(history[state.summarized:start], state, digest_fn)
+            state.summarized = start
+
+        text = self._render(state, recent_lines[state.summarized:])
+        return {
+            "text": text,
+            "tokens": estimate_tokens(text),
+            "recent": len(history) - state.summarized,
+            "pinned": len(state.pinned),
+            "summarized": state.summarized
+        }
+
+    def _fold(self, messages: list, state, digest_fn):
+        for msg in messages:
+            sender, _ = message_parts(msg)
+            if digest_fn is not None and digest_fn(msg) in state.intel_digests:
+                state.pinned.append(_line(msg, PINNED_MAX_CHARS))
+            elif sender not in ['user', 'assistant']:
+                state.summary.append(_line(msg, SUMMARY_LINE_CHARS))
+        # Oldest lines roll off first once a section outgrows its share
+        self._trim(state.pinned, int(self.budget * CONTEXT_PINNED_SHARE))
+        self._trim(state.summary, int(self.budget * CONTEXT_SUMMARY_SHARE))
+
+    @staticmethod
+    def _trim(lines: list, max_tokens: int):
+        total = sum(estimate_tokens(line) + 1 for line in lines)
+        while lines and total > max_tokens:
+            total -= estimate_tokens(lines.pop(0)) + 1
+
+    @staticmethod
+    def _reserved(state) -> int:
+        reserved = sum(estimate_tokens(line) + 1 for line in state.pinned + state.summary)
+        return reserved + (10 if reserved else 0)  # section headers
+
+    @staticmethod
+    def _render(state, recent_lines: list) -> str:
+        parts = []
+        if state.summary:
+            parts.append("EARLIER (summarized):\n" + "\n".join(state.summary))
+        if state.pinned:
+            parts.append("KEY EARLIER MESSAGES:\n" + "\n".join(state.pinned))
+        if recent_lines:
+            parts.append("CONVERSATION SO FAR:\n" + "\n".join(recent_lines))
+        return "\n\n".join(parts)
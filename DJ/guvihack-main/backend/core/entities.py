@@ -0,0 +1,186 @@
+import re
+from urllib.parse import urlsplit, urlunsplit
+
+# Canonical intel entities.
+#
+# Every extracted value is reduced to a hashable key per intel type, so the
+# same phone number, UPI handle or link reported by the LLM, the regex pass
+# and earlier turns collapses to one entry with a plain dict/set union:
+#
+#   phoneNumbers   E.164 ("+91 98765-43210", "098765 43210" -> "+919876543210")
+#   upiIds         lowercased handle ("Scammer@PaytM" -> "scammer@paytm")
+#   phishingLinks  lowercase scheme/host, no default port, no trailing
+#                  punctuation, "/" for an empty path
+#   bankAccounts   digits only ("4532-7788-1122-9034" -> "4532778811229034")
+#   everything     else whitespace-collapsed text, keyed case-insensitively
+#
+# The canonical form is also the value reported, which keeps callback
+# payloads free of formatting variants.
+
+INTEL_KEYS = [
+    "scammerName", "bankAccounts", "upiIds", "phishingLinks", "phoneNumbers",
+    "jobTitle", "companyNames", "location", "suspiciousKeywords"
+]
+
+DEFAULT_COUNTRY_CODE = "91"
+
+_NON_DIGIT_RE = re.compile(r"\D+")
+_TRAILING_PUNCT = ".,;:!?)]}'\""
+_DEFAULT_PORTS = {"http": ":80", "https": ":443"}
+
+
+def normalize_phone(value: str) -> str:
+    """
+    E.164 form of a phone number, or None if it has too few/many digits.
+    Bare 10-digit Indian mobiles (and the 0-prefixed trunk form) get +91.
+    """
+    digits = _NON_DIGIT_RE.sub("", value)
+    if len(digits) == 10 and digits[0] in "6789":
+        return "+" + DEFAULT_COUNTRY_CODE + digits
+    if len(digits) == 11 and digits[0] == "0" and digits[1] in "6789":
+        return "+" + DEFAULT_COUNTRY_CODE + digits[1:]
+    if len(digits) == 12 and digits.startswith(DEFAULT_COUNTRY_CODE) and digits[2] in "6789":
+        return "+" + digits
+    if 8 <= len(digits) <= 15:
+        # Landline/toll-free or foreign: keep the country code only if one was given
+        return "+" + digits if value.lstrip().startswith("+") else digits
+    return None
+
+
+def normalize_upi(value: str) -> str:
+    handle = value.strip().rstrip(_TRAILING_PUNCT).lower()
+    user, _, provider = handle.partition("@")
+    if not user or not provider:
+        return None
+    return handle
+
+
+def normalize_url(value: str) -> str:
+    url = value.strip().rstrip(_TRAILING_PUNCT)
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return None
+    if not parts.netloc:
+        return None
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower().rstrip(".")
+    default_port = _DEFAULT_PORTS.get(scheme)
+    if default_port and netloc.endswith(default_port):
+        netloc = netloc[:-len(default_port)]
+    return urlunsplit((scheme, netloc, parts.path or "/", parts.query, parts.fragment))
+
+
+def normalize_account(value: str) -> str:
+    digits = _NON_DIGIT_RE.sub("", value)
+    return digits if 9 <= len(digits) <= 18 else None
+
+
+def _normalize_text(value: str) -> str:
+    return " ".join(value.split()) or None
+
+
+_NORMALIZERS = {
+    "phoneNumbers": normalize_phone,
+    "upiIds": normalize_upi,
+    "phishingLinks": normalize_url,
+    "bankAccounts": normalize_account,
+}
+IDENTIFIER_KEYS = frozenset(_NORMALIZERS)
+
+
+def canonical(kind: str, value) -> tuple:
+    """
+    (key, value) for one raw intel value, or None if it is not a valid entity.
+    The key is what two values must share to count as the same entity.
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        value = str(value)
+    if not isinstance(value, str):
+        return None
+    normalize = _NORMALIZERS.get(kind)
+    if normalize is not None:
+        value = normalize(value)
+        return (value, value) if value else None
+    value = _normalize_text(value)
+    return (value.casefold(), value) if value else None
+
+
+def canonical_values(kind: str, values: list) -> list:
+    """
+    Canonical, deduplicated values of one intel type, in first-seen order.
+    """
+    seen = {}
+    for value in values:
+        entity = canonical(kind, value)
+        if entity is not None and entity[0] not in seen:
+            seen[entity[0]] = entity[1]
+    return list(seen.values())
+
+
+class IntelSet:
+    """
+    Canonical intel, one insertion-ordered {key: value} dict per intel type.
+    Adding the same entity again (in any format, from any source) is a no-op.
+    """
+    __slots__ = ("buckets",)
+
+    def __init__(self, *sources: dict):
+        self.buckets = {key: {} for key in INTEL_KEYS}
+        for source in sources:
+            self.update(source)
+
+    def add(self, kind: str, value) -> bool:
+        """
+        Adds one raw value; returns True if it was a new entity.
+        """
+        bucket = self.buckets.get(kind)
+        entity = canonical(kind, value) if bucket is not None else None
+        if entity is None or entity[0] in bucket:
+            return False
+        bucket[entity[0]] = entity[1]
+        return True
+
+    def update(self, intel: dict):
+        """
+        Merges an extractedIntel-shaped dict. Tolerates the LLM sending a bare
+        string, null or odd types instead of a list.
+        """
+        if not intel or not isinstance(intel, dict):
+            return
+        for kind in INTEL_KEYS:
+            values = intel.get(kind)
+            if not values:
+                continue
+            if isinstance(values, (str, int, float)):
+                values = [values]
+            elif not isinstance(values, (list, tuple, set)):
+                continue
+            bucket = self.buckets[kind]
+            for value in values:
+                # Values that are already canonical (regex output, earlier
+                # turns) hit their own key and skip normalisation
+                if isinstance(value, str) and value in bucket:
+                    continue
+                entity = canonical(kind, value)
+                if entity is not None and entity[0] not in bucket:
+                    bucket[entity[0]] = entity[1]
+
+    def values(self, kind: str) -> list:
+        return list(self.buckets[kind].values())
+
+    def size(self) -> int:
+        """
+        Rough bytes held, for session memory accounting.
+        """
+        return sum(len(v) + 50 for bucket in self.buckets.values() for v in bucket.values())
+
+    def to_dict(self) -> dict:
+        return {kind: list(bucket.values()) for kind, bucket in self.buckets.items()}
+
+
+def merge_intel(*sources: dict) -> dict:
+    """
+    Union of several extractedIntel dicts, canonicalised and deduplicated.
+    """
+    return IntelSet(*sources).to_dict()
@@ -0,0 +1,148 @@
+import re
+from .entities import INTEL_KEYS, IDENTIFIER_KEYS, canonical_values
+from .keywords import KEYWORDS
+
+# Precompiled regex engine behind VigilanteBrain.extract_intelligence_from_text.
+# Everything is compiled once at import; names, places and cities share one
+# combined scan, and the other rules only run when the text can match them.
+
+CITIES = ['Delhi', 'Mumbai', 'Bangalore', 'Chennai', 'Kolkata', 'Hyderabad', 'Pune', 'Ahmedabad', 'Gurgaon', 'Noida']
+
+JOB_KEYWORDS = ['manager', 'officer', 'department', 'division', 'supervisor', 'agent', 'support']
+
+# Pass 1 - context: name cue, "at/from/in <Place>" and known cities.
+# All branches are zero-width lookaheads so one hit never hides another that
+# starts inside it (e.g. "at Police" inside "Kolkata Police"). No two branches
+# can match at the same position (no cue word is a prefix of another cue or of
+# a city name), so taking the first that matches loses nothing.
+# The leading character class lets the regex engine skip straight to
+# candidate positions instead of trying every branch at every offset.
+_CONTEXT_RE = re.compile(
+    r"(?=[mtiafdbckhpgn])(?:"
+    r"(?=(?:myself|i am|this is|i'm)\s+(?P<name>[A-Z][a-z]+(?:\s+[A-Z][a-z]+)?))"
+    r"|(?=(?-i:at|from|in)\s+(?P<place>(?-i:[A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)))"
+    r"|(?=(?P<city>\b(?:" + "|".join(CITIES) + r")\b)))",
+    re.IGNORECASE
+)
+
+# Pass 2 - numbers: bank accounts and Indian phone numbers.
+# One scan per pattern: matches of different patterns overlap ("4567 9112 3456
+# 7890" inside "022-123-4567 911234567890"), and each pattern has to find its
+# own, so they can't share one consuming alternation.
+_DIGIT_RE = re.compile(r"\d")
+_BANK_RES = (
+    re.compile(r"\b\d{11,18}\b"),                                   # 11-18 digit account numbers
+    re.compile(r"\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b"),      # formatted (16 digits)
+)
+_PHONE_INTL_RE = re.compile(r"\+91[-\s]?\d{10}")
+_PHONE_RES = (
+    re.compile(r"\b[6-9]\d{9}\b"),
+    re.compile(r"\b\d{3}[-\s]\d{3}[-\s]\d{4}\b"),
+)
+
+# Only run when the text can contain a match at all
+_UPI_RE = re.compile(r'\b[\w\.\-]+@[\w]+\b')
+_URL_RE = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
+
+# Job titles: the pattern for a keyword only runs if the keyword occurs
+_JOB_RES = {
+    word: re.compile(fr'((?:\w+\W+){{0,2}}\b{word}\b)', re.IGNORECASE)
+    for word in JOB_KEYWORDS
+}
+_JOB_PREFIX_RE = re.compile(r'^(i am|myself|this is|is|am|a)\s+')
+
+
+def empty_intel() -> dict:
+    return {key: [] for key in INTEL_KEYS}
+
+
+def _dedup(items: list) -> list:
+    """
+    Drops duplicates and any item contained (case-insensitively) in a longer one.
+    Only used for free-text fields, where "Delhi" inside "New Delhi" is noise.
+    """
+    unique_items = []
+    unique_lower = []
+    for item in sorted(set(items), key=len, reverse=True):
+        low = item.lower()
+        if not any(low in u for u in unique_lower):
+            unique_items.append(item)
+            unique_lower.append(low)
+    return unique_items
+
+
+def extract_intel(text: str, keyword_hits: dict = None) -> dict:
+    """
+    Regex-based intelligence extraction. Returns the same dict shape as the LLM's
+    extractedIntel block. Pass keyword_hits (KEYWORDS.scan(text)) to reuse a
+    keyword scan already done for scam detection.
+    """
+    intel = empty_intel()
+    text_lower = text.lower()
+
+    # Pass 1: names, places, cities
+    name = place = None
+    for m in _CONTEXT_RE.finditer(text):
+        kind = m.lastgroup
+        if kind == "city":
+            intel["location"].append(m.group("city"))
+        elif kind == "name":
+            if name is None:
+                name = m.group("name").strip()
+        elif place is None:
+            place = m.group("place").strip()
+    if name:
+        intel["scammerName"].append(name)
+    if place:
+        intel["location"].append(place)
+
+    # Pass 2: bank accounts and phone numbers
+    if _DIGIT_RE.search(text):
+        for pattern in _BANK_RES:
+            intel["bankAccounts"].extend(pattern.findall(text))
+        if "+91" in text:
+            intel["phoneNumbers"].extend(_PHONE_INTL_RE.findall(text))
+        for pattern in _PHONE_RES:
+            intel["phoneNumbers"].extend(pattern.findall(text))
+
+    if "@" in text:
+        intel["upiIds"] = _UPI_RE.findall(text)
+
+    if "http" in text:
+        intel["phishingLinks"] = _URL_RE.findall(text)
+
+    for word in JOB_KEYWORDS:
+        if word in text_lower:
+            # Extract only a few words around the keyword, but STOP at prepositions
+            match = _JOB_RES[word].search(text)
+            if match:
+                clean_job = _JOB_PREFIX_RE.sub('', match.group(1).strip().lower())
+                intel["jobTitle"].append(clean_job.title())
+
+    if keyword_hits is None:
+        keyword_hits = KEYWORDS.scan(text)
+    intel["suspiciousKeywords"] = list(keyword_hits["suspicious"])
+
+    # Identifiers collapse by canonical key (one hash lookup per value); the
+    # substring check is only needed for the short free-text lists
+    for key in intel:
+        if not intel[key]:
+            continue
+        if key in IDENTIFIER_KEYS:
+            intel[key] = canonical_values(key, intel[key])
+        elif len(intel[key]) > 1:
+            intel[key] = _dedup(intel[key])
+
+    # Deduplicate Names from Job Titles
+    names = intel["scammerName"]
+    if names and intel["jobTitle"]:
+        cleaned_jobs = []
+        for job in intel["jobTitle"]:
+            cleaned_job = job
+            for n in names:
+                cleaned_job = re.sub(rf'\b{re.escape(n)}\b', '', cleaned_job, flags=re.IGNORECASE).strip(' ,')
+            if cleaned_job:
+                cleaned_jobs.append(cleaned_job)
+        intel["jobTitle"] = cleaned_jobs
+
+    return intel
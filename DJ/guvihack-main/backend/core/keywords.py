@@ -0,0 +1,115 @@
+import json
+import os
+
+from .logs import get_logger
+
+log = get_logger("keywords")
+
+# Keyword groups used by scam detection (urgency/financial/action) and by the
+# suspiciousKeywords field of the extracted intel. Matching is case-insensitive
+# substring matching, same as the old `kw in text.lower()` checks.
+KEYWORD_GROUPS = {
+    "urgency": ['urgent', 'immediately', 'suspended', 'blocked', 'arrest', 'warrant', 'expire', 'lapse'],
+    "financial": ['pay', 'transfer', 'upi', 'bank', 'refund', 'gpay', 'paytm', 'credit card', 'kyc'],
+    "action": ['click here', 'link', 'download', 'apk', 'form'],
+    "suspicious": [
+        'urgent', 'verify', 'suspended', 'blocked', 'immediately',
+        'account', 'security', 'update', 'confirm', 'expire',
+        'risk', 'unauthorized', 'unusual activity', 'click here',
+        'limited time', 'act now', 'verify now', 'customer care',
+        'prize', 'winner', 'congratulations', 'refund', 'KYC'
+    ],
+}
+
+# Optional JSON file ({"group": ["kw", ...]}) with extra keywords, e.g. Hindi/
+# Hinglish variants or brand names. Entries are appended to the groups above.
+KEYWORDS_FILE = os.getenv("SCAM_KEYWORDS_FILE")
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over every keyword group.
+
+    One left-to-right pass over the lowercased text reports all keywords of all
+    groups, so the per-message cost depends on the text length, not on how many
+    keywords are loaded. Transitions are fully resolved at build time (a DFA),
+    so scanning is a single dict lookup per character.
+    """
+    def __init__(self, groups: dict):
+        self.groups = list(groups)
+        self.keywords = []   # (group, keyword as written), indexed by keyword id
+        goto = [{}]
+        out = [[]]
+
+        # 1. Trie
+        for group, words in groups.items():
+            for word in words:
+                kw_id = len(self.keywords)
+                self.keywords.append((group, word))
+                state = 0
+                for ch in word.lower():
+                    nxt = goto[state].get(ch)
+                    if nxt is None:
+                        nxt = len(goto)
+                        goto[state][ch] = nxt
+                        goto.append({})
+                        out.append([])
+                    state = nxt
+                out[state].append(kw_id)
+
+        # 2. Failure links (BFS), folded into a full transition table
+        fail = [0] * len(goto)
+        delta = [goto[0]] + [None] * (len(goto) - 1)
+        queue = list(goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            f = fail[state]
+            for ch, nxt in goto[state].items():
+                fail[nxt] = delta[f].get(ch, 0)
+                queue.append(nxt)
+            out[state] = out[state] + out[f]
+            transitions = dict(delta[f])
+            transitions.update(goto[state])
+            delta[state] = transitions
+
+        self._delta = delta
+        self._out = [tuple(ids) if ids else None for ids in out]
+
+    def scan(self, text: str) -> dict:
+        """
+        Returns {group: [keywords found, in list order]} for every group.
+        """
+        delta = self._delta
+        out = self._out
+        state = 0
+        found = set()
+        for ch in text.lower():
+            state = delta[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+
+        hits = {group: [] for group in self.groups}
+        for kw_id in sorted(found):
+            group, word = self.keywords[kw_id]
+            hits[group].append(word)
+        return hits
+
+
+def load_keyword_groups(path: str = None) -> dict:
+    groups = {group: list(words) for group, words in KEYWORD_GROUPS.items()}
+    if path:
+        try:
+            with open(path, encoding="utf-8") as f:
+                extra = json.load(f)
+            for group, words in extra.items():
+                existing = groups.setdefault(group, [])
+                existing.extend(w for w in words if w not in existing)
+        except Exception as e:
+            log.warning("keywords.file_not_loaded", path=path, error=str(e))
+    return groups
+
+
+# Built once per process and shared by detect_scam and extract_intel
+KEYWORDS = KeywordAutomaton(load_keyword_groups(KEYWORDS_FILE))
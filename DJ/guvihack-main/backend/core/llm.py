@@ -1,10 +1,20 @@
 import os
-import re
 import json
-from groq import Groq
+import time
+import asyncio
+import hashlib
+from collections import deque
+from groq import AsyncGroq
 from dotenv import load_dotenv
 from pathlib import Path
-from .prompts import Persona
+from .prompts import Persona, build_static_prefix
+from .extraction import extract_intel
+from .cache import ResponseCache, make_cache_key
+from .context import ContextBuilder
+from .streaming import ReplyStreamParser
+from .logs import get_logger
+from .metrics import METRICS
+from .tracing import TRACER, span
 
 # Robstly load .env from the backend directory
 env_path = Path(__file__).resolve().parent.parent / '.env'
@@ -15,198 +25,269 @@ load_dotenv()
 
 MSG_HISTORY = []
 
+# Max LLM calls in flight per worker; extra requests wait their turn instead of
+# piling onto the Groq rate limit.
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+
+FALLBACK_RESPONSE = json.dumps({
+    "analysis": "Error occurred",
+    "extractionTarget": "none",
+    "strategy": "Error recovery",
+    "reply": "sorry wait... my phone is glitching. what did u say?",
+    "extractedIntel": {}
+})
+
+log = get_logger("llm")
+
+
+class PromptStats:
+    """
+    How much of each prompt is a reused static prefix, what the provider reports
+    as cached prompt tokens, and time-to-first-token / total latency.
+    """
+    def __init__(self, window: int = 500):
+        self._prefixes = set()
+        self.counters = {"requests": 0, "prefix_reused": 0, "prefix_chars": 0, "dynamic_chars": 0,
+                         "context_tokens": 0, "prompt_tokens": 0, "cached_tokens": 0}
+        self.ttft = deque(maxlen=window)
+        self.latency = deque(maxlen=window)
+
+    def record_prompt(self, messages: list, context_tokens: int = 0):
+        prefix = messages[0]["content"]
+        digest = hashlib.blake2b(prefix.encode("utf-8"), digest_size=8).digest()
+        self.counters["requests"] += 1
+        if digest in self._prefixes:
+            self.counters["prefix_reused"] += 1
+        self._prefixes.add(digest)
+        self.counters["prefix_chars"] += len(prefix)
+        self.counters["dynamic_chars"] += sum(len(m["content"]) for m in messages[1:])
+        self.counters["context_tokens"] += context_tokens
+
+    def record_usage(self, usage):
+        if usage is None:
+            return
+        self.counters["prompt_tokens"] += getattr(usage, "prompt_tokens", 0) or 0
+        details = getattr(usage, "prompt_tokens_details", None)
+        self.counters["cached_tokens"] += (getattr(details, "cached_tokens", 0) or 0) if details else 0
+
+    def snapshot(self) -> dict:
+        def p50(values):
+            return round(sorted(values)[len(values) // 2], 4) if values else None
+        c = self.counters
+        return {
+            **c,
+            "prefix_reuse_rate": round(c["prefix_reused"] / c["requests"], 4) if c["requests"] else 0.0,
+            "prefix_share": round(c["prefix_chars"] / max(1, c["prefix_chars"] + c["dynamic_chars"]), 4),
+            "cached_token_rate": round(c["cached_tokens"] / c["prompt_tokens"], 4) if c["prompt_tokens"] else 0.0,
+            "ttft_p50_s": p50(self.ttft),
+            "latency_p50_s": p50(self.latency)
+        }
+
 
 class VigilanteBrain:
-    def __init__(self):
-        self.client = Groq(api_key=os.getenv("GROQ_API_KEY", "gsk_placeholder"))
+    def __init__(self, max_concurrency: int = LLM_MAX_CONCURRENCY):
+        # GROQ_BASE_URL points the client at another endpoint (e.g. benchmarks/mock_groq.py)
+        self.client = AsyncGroq(api_key=os.getenv("GROQ_API_KEY", "gsk_placeholder"),
+                                base_url=os.getenv("GROQ_BASE_URL") or None)
+        self._llm_slots = asyncio.Semaphore(max(1, max_concurrency))
+        self.cache = ResponseCache()
+        self.prompt_stats = PromptStats()
+        self.context_builder = ContextBuilder()
         
-    def generate_response(self, user_input: str, persona: Persona, conversation_history: list = None, extracted_intel: dict = None):
+    def build_messages(self, user_input: str, persona: Persona, conversation_history: list = None, extracted_intel: dict = None, context: dict = None) -> list:
         """
-        Generates a response with intelligence extraction focus and dynamic context
+        Chat messages for one turn: the persona's static prefix, the per-turn
+        session state, then the scammer's latest message as the user turn.
+        `context` is a ContextBuilder result; without one the history is
+        trimmed to the token budget with no session summary.
         """
-        
-        # Build conversation context
-        context = ""
-        if conversation_history:
-            context = "\n\nCONVERSATION SO FAR:\n"
-            # Show last 10 messages for better flow awareness
-            for msg in conversation_history[-10:]:
-                if isinstance(msg, dict):
-                    text = msg.get('text') or msg.get('content') or ""
-                    sender_raw = msg.get('sender') or msg.get('role') or "user"
-                else:
-                    text = getattr(msg, 'text', getattr(msg, 'content', ''))
-                    sender_raw = getattr(msg, 'sender', getattr(msg, 'role', 'user'))
-                
-                label = "YOU" if sender_raw in ['user', 'assistant'] else "SCAMMER"
-                context += f"{label}: {text}\n"
-        
+        if context is None:
+            context = self.context_builder.build(conversation_history)
+        context_text = f"\n{context['text']}\n" if context["text"] else ""
+
         # Determine status based on intelligence gathered
         intel_count = sum(len(v) for v in extracted_intel.values()) if extracted_intel else 0
         current_phase = "ENGAGEMENT" if intel_count == 0 else "EXTRACTION"
-        
-        system_msg = f"""
-{persona.system_prompt}
-
-🚨 TONE & FLOW CONSTRAINTS:
-- BE NATURAL. Respond directly to the Scammer's last message.
-- SUB 12 WORDS per message. No filler like "Oh hello".
-- NEVER repeat the same strategy or "tech error" twice. Use variety.
-- If they have already said their name (see INTEL GATHERED), DO NOT ask "who's this?" or "what's ur name?".
-- If they ask a question, answer it in character before moving to your goal.
 
-🚨 SESSION STATE:
+        # Static persona prefix first (identical every turn -> provider prompt cache),
+        # then only the per-turn session state.
+        session_state = f"""🚨 SESSION STATE:
 - CURRENT PHASE: {current_phase}
 - INTEL GATHERED SO FAR: {json.dumps(extracted_intel or {})}
-- GOAL: Extract {', '.join(persona.intelligence_targets)} without being suspicious.
-
-{context}
-
+{context_text}
 🤖 LATEST SCAMMER MESSAGE: "{user_input}"
+Reply in the JSON format above."""
+
+        return [
+            {"role": "system", "content": build_static_prefix(persona)},
+            {"role": "system", "content": session_state},
+            {"role": "user", "content": user_input}
+        ]
 
-IMPORTANT: You must respond in valid JSON format ONLY.
-{{
-    "analysis": "Short analysis of their intent",
-    "strategy": "Your current tactic (e.g. 'faking error', 'distracting', 'verifying ID')",
-    "reply": "Your in-character response (short, lowercase, informal)",
-    "extractedIntel": {{
-        "scammerName": [], "bankAccounts": [], "upiIds": [], "phishingLinks": [], "phoneNumbers": [],
-        "jobTitle": [], "companyNames": [], "location": [], "suspiciousKeywords": []
-    }}
-}}
-"""
+    async def generate_response(self, user_input: str, persona: Persona, conversation_history: list = None, extracted_intel: dict = None, context: dict = None, use_cache: bool = True):
+        """
+        Generates a response with intelligence extraction focus and dynamic context.
+        Replies to a context seen before are served from the response cache
+        unless use_cache is False.
+        """
         
+        if context is None:
+            context = self.context_builder.build(conversation_history)
+        cache_key = None
+        if use_cache:
+            with span("brain.cache_lookup") as current:
+                cache_key = make_cache_key(persona.name, user_input, context["text"], extracted_intel)
+                cached = await self.cache.get(cache_key)
+                if current is not None:
+                    current.set(hit=cached is not None)
+            if cached is not None:
+                return cached
+
+        with span("brain.build_messages", context_tokens=context["tokens"]):
+            messages = self.build_messages(user_input, persona, conversation_history, extracted_intel, context)
+            self.prompt_stats.record_prompt(messages, context["tokens"])
+
         try:
-            chat_completion = self.client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": system_msg},
-                    {"role": "user", "content": user_input}
-                ],
-                model="llama-3.3-70b-versatile",
-                temperature=0.7,
-                max_tokens=1000,
-                response_format={"type": "json_object"}
-            )
+            waited = time.perf_counter()
+            async with self._llm_slots:
+                started = time.perf_counter()
+                with span("llm.chat_completion", model="llama-3.3-70b-versatile",
+                          slot_wait_ms=round((started - waited) * 1000, 2)) as current:
+                    chat_completion = await self.client.chat.completions.create(
+                        messages=messages,
+                        model="llama-3.3-70b-versatile",
+                        temperature=0.7,
+                        max_tokens=1000,
+                        response_format={"type": "json_object"}
+                    )
+                    usage = getattr(chat_completion, "usage", None)
+                    if current is not None and usage is not None:
+                        current.set(prompt_tokens=getattr(usage, "prompt_tokens", None),
+                                    completion_tokens=getattr(usage, "completion_tokens", None))
             
+            self.prompt_stats.latency.append(time.perf_counter() - started)
+            self.prompt_stats.record_usage(usage)
             response_text = chat_completion.choices[0].message.content
             
             # Parse and validate
+            if cache_key and response_text:
+                await self.cache.put(cache_key, response_text)
             return response_text
             
         except Exception as e:
-            print(f"LLM Error: {str(e)}")
+            log.error("llm.error", error=str(e))
+            METRICS.inc("llm_fallbacks_total", mode="sync")
             # Fallback JSON
-            return json.dumps({
-                "analysis": "Error occurred",
-                "extractionTarget": "none",
-                "strategy": "Error recovery",
-                "reply": "sorry wait... my phone is glitching. what did u say?",
-                "extractedIntel": {}
-            })
-
-    def extract_intelligence_from_text(self, text: str) -> dict:
+            return FALLBACK_RESPONSE
+
+    async def generate_response_stream(self, user_input: str, persona: Persona, conversation_history: list = None, extracted_intel: dict = None, context: dict = None, use_cache: bool = True):
+        """
+        Streaming variant of generate_response. Yields ("reply", text_delta) events
+        as soon as the reply field's tokens arrive, then one ("done", json_str)
+        event with the complete brain JSON (or the fallback JSON on errors).
+        """
+        if context is None:
+            context = self.context_builder.build(conversation_history)
+        cache_key = None
+        if use_cache:
+            cache_key = make_cache_key(persona.name, user_input, context["text"], extracted_intel)
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                try:
+                    yield ("reply", json.loads(cached).get("reply", ""))
+                except ValueError:
+                    pass
+                yield ("done", cached)
+                return
+
+        messages = self.build_messages(user_input, persona, conversation_history, extracted_intel, context)
+        self.prompt_stats.record_prompt(messages, context["tokens"])
+        parser = ReplyStreamParser()
+        # Started by hand (not activated): this generator yields between chunks
+        llm_span = TRACER.start("llm.chat_completion.stream", kind="client",
+                                attributes={"model": "llama-3.3-70b-versatile"})
+        # The upstream read runs in its own task and holds the concurrency slot
+        # only until Groq finishes; reply deltas are buffered in a queue, so a
+        # slow SSE client can't keep a slot busy while it reads
+        deltas = asyncio.Queue()
+        pump = asyncio.create_task(self._pump_stream(messages, parser, llm_span, deltas))
+        try:
+            while True:
+                reply_delta = await deltas.get()
+                if reply_delta is None:
+                    break
+                yield ("reply", reply_delta)
+            await pump  # re-raises an upstream error
+
+            response_text = json.dumps(parser.parse())
+            if llm_span is not None:
+                llm_span.end()
+            if cache_key:
+                await self.cache.put(cache_key, response_text)
+            yield ("done", response_text)
+
+        except Exception as e:
+            log.error("llm.stream_error", error=str(e))
+            if llm_span is not None:
+                llm_span.error = f"{type(e).__name__}: {e}"
+                llm_span.end()
+            METRICS.inc("llm_fallbacks_total", mode="stream")
+            if parser.reply:
+                # The caller already heard part of the reply; finish with what we have
+                yield ("done", json.dumps({
+                    "analysis": "Error parsing brain",
+                    "strategy": "Fallback",
+                    "reply": parser.reply,
+                    "extractedIntel": {}
+                }))
+            else:
+                yield ("reply", json.loads(FALLBACK_RESPONSE)["reply"])
+                yield ("done", FALLBACK_RESPONSE)
+        finally:
+            # The client went away mid-reply: stop reading upstream too
+            pump.cancel()
+
+    async def _pump_stream(self, messages: list, parser: ReplyStreamParser, llm_span, deltas: asyncio.Queue):
+        """
+        Reads one streamed completion under a concurrency slot, feeding reply
+        deltas to the queue; None marks the end (also after an error).
+        """
+        try:
+            async with self._llm_slots:
+                started = time.perf_counter()
+                first_token = None
+                # JSON mode is left off here (Groq doesn't stream in JSON mode);
+                # the prompt already demands JSON only and the result is checked below.
+                stream = await self.client.chat.completions.create(
+                    messages=messages,
+                    model="llama-3.3-70b-versatile",
+                    temperature=0.7,
+                    max_tokens=1000,
+                    stream=True
+                )
+                async for chunk in stream:
+                    # Groq reports usage on the last chunk under x_groq
+                    x_groq = getattr(chunk, "x_groq", None)
+                    self.prompt_stats.record_usage(getattr(x_groq, "usage", None) if x_groq else None)
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        if first_token is None:
+                            first_token = time.perf_counter()
+                            self.prompt_stats.ttft.append(first_token - started)
+                            if llm_span is not None:
+                                llm_span.add_event("first_token")
+                        reply_delta = parser.feed(delta)
+                        if reply_delta:
+                            deltas.put_nowait(reply_delta)
+            self.prompt_stats.latency.append(time.perf_counter() - started)
+        finally:
+            deltas.put_nowait(None)
+
+    def extract_intelligence_from_text(self, text: str, keyword_hits: dict = None) -> dict:
         """
         Fallback regex-based intelligence extraction
         Use this in addition to LLM extraction for redundancy
         """
-        intel = {
-            "scammerName": [],
-            "bankAccounts": [],
-            "upiIds": [],
-            "phishingLinks": [],
-            "phoneNumbers": [],
-            "jobTitle": [],
-            "companyNames": [],
-            "location": [],
-            "suspiciousKeywords": []
-        }
-        
-        # Name Extraction (myself [Name], I am [Name], etc.)
-        name_match = re.search(r'(?:myself|i am|this is|i\'m)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)', text, re.IGNORECASE)
-        if name_match:
-            intel["scammerName"].append(name_match.group(1).strip())
-        
-        # Bank account patterns (Indian format - usually 11+ digits to avoid phone collision)
-        bank_patterns = [
-            r'\b\d{11,18}\b',  # 11-18 digit account numbers
-            r'\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b'  # Formatted (16 digits)
-        ]
-        for pattern in bank_patterns:
-            matches = re.findall(pattern, text)
-            intel["bankAccounts"].extend(matches)
-        
-        # UPI IDs
-        upi_pattern = r'\b[\w\.\-]+@[\w]+\b'
-        intel["upiIds"] = re.findall(upi_pattern, text)
-        
-        # Phone numbers (Indian format)
-        phone_patterns = [
-            r'\+91[-\s]?\d{10}',
-            r'\b[6-9]\d{9}\b',
-            r'\b\d{3}[-\s]\d{3}[-\s]\d{4}\b'
-        ]
-        for pattern in phone_patterns:
-            matches = re.findall(pattern, text)
-            intel["phoneNumbers"].extend(matches)
-        
-        # URLs/Links
-        url_pattern = r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
-        intel["phishingLinks"] = re.findall(url_pattern, text)
-        
-        job_keywords = ['manager', 'officer', 'department', 'division', 'supervisor', 'agent', 'support']
-        for word in job_keywords:
-            if word in text.lower():
-                # Extract only a few words around the keyword, but STOP at prepositions
-                # This prevents "branch manager at new delhi" from being one block
-                match = re.search(fr'((?:\w+\W+){{0,2}}\b{word}\b)', text, re.IGNORECASE)
-                if match:
-                    clean_job = match.group(1).strip().lower()
-                    # Remove "i am", "myself", "this is"
-                    clean_job = re.sub(r'^(i am|myself|this is|is|am|a)\s+', '', clean_job)
-                    intel["jobTitle"].append(clean_job.title())
-        
-        # Location Extraction (Indian Cities & General Keywords)
-        cities = ['Delhi', 'Mumbai', 'Bangalore', 'Chennai', 'Kolkata', 'Hyderabad', 'Pune', 'Ahmedabad', 'Gurgaon', 'Noida']
-        city_pattern = fr"\b(?:{'|'.join(cities)})\b"
-        intel["location"] = re.findall(city_pattern, text, re.IGNORECASE)
-        # Also check for "at [Place]" or "from [Place]"
-        place_match = re.search(r'(?:at|from|in)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)', text)
-        if place_match:
-            intel["location"].append(place_match.group(1).strip())
-
-        # Suspicious keywords
-        keywords = [
-            'urgent', 'verify', 'suspended', 'blocked', 'immediately',
-            'account', 'security', 'update', 'confirm', 'expire',
-            'risk', 'unauthorized', 'unusual activity', 'click here',
-            'limited time', 'act now', 'verify now', 'customer care',
-            'prize', 'winner', 'congratulations', 'refund', 'KYC'
-        ]
-        found_keywords = [kw for kw in keywords if kw.lower() in text.lower()]
-        intel["suspiciousKeywords"] = found_keywords
-        
-        # Remove duplicates and substring overlaps
-        for key in intel:
-            items = list(set(intel[key]))
-            items.sort(key=len, reverse=True)
-            unique_items = []
-            for item in items:
-                if not any(item.lower() in u.lower() for u in unique_items):
-                    unique_items.append(item)
-            intel[key] = unique_items
-
-        # Deduplicate Names from Job Titles
-        # If a job title contains a name that was extracted, clean the job title
-        names = intel.get("scammerName", [])
-        if names:
-            cleaned_jobs = []
-            for job in intel["jobTitle"]:
-                cleaned_job = job
-                for name in names:
-                    # Case insensitive removal of name from job title
-                    cleaned_job = re.sub(rf'\b{re.escape(name)}\b', '', cleaned_job, flags=re.IGNORECASE).strip(' ,')
-                if cleaned_job:
-                    cleaned_jobs.append(cleaned_job)
-            intel["jobTitle"] = cleaned_jobs
-        
-        return intel
+        return extract_intel(text, keyword_hits)
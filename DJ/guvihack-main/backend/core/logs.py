@@ -0,0 +1,179 @@
+import atexit
+import contextvars
+import json
+import os
+import queue
+import random
+import sys
+import threading
+import time
+
+# JSON-lines logging that never blocks the request path.
+#
+# Callers only check the level/sampling and put a small tuple on a bounded
+# queue; a background thread does the json.dumps and the writes, in batches.
+# If the writer falls behind, new records are dropped (and counted) rather
+# than making a request wait.
+#
+#   LOG_LEVEL=info                         global minimum level
+#   LOG_LEVELS=callbacks=warning,llm=debug per-logger overrides
+#   LOG_SAMPLE=/webhook=0.1,/token=0       keep this fraction of info/debug records per route
+#   LOG_FILE=backend.log                   default: stdout
+#   LOG_QUEUE_SIZE=10000
+
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "info").lower()
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+LOG_SAMPLE = os.getenv("LOG_SAMPLE", "")
+LOG_FILE = os.getenv("LOG_FILE")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+# Active tracing span (set by core.tracing); records logged inside a span
+# carry its trace_id/span_id so logs and traces can be joined.
+TRACE_CONTEXT = contextvars.ContextVar("trace_context", default=None)
+
+
+def _parse_pairs(spec: str) -> dict:
+    pairs = {}
+    for item in spec.split(","):
+        if "=" in item:
+            key, value = item.rsplit("=", 1)
+            pairs[key.strip()] = value.strip()
+    return pairs
+
+
+class LogWriter:
+    """
+    Background thread that drains the queue and writes one JSON object per line.
+    """
+    def __init__(self, path: str = LOG_FILE, maxsize: int = LOG_QUEUE_SIZE):
+        self.path = path
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._thread = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+        self.written = 0
+
+    def submit(self, record: tuple):
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        stream = open(self.path, "a", encoding="utf-8") if self.path else sys.stdout
+        while True:
+            record = self._queue.get()
+            batch = [record]
+            # Drain whatever else is waiting so the stream is written in one go
+            while len(batch) < 512:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            records = [r for r in batch if r is not None]
+            if records:
+                try:
+                    stream.write(self._render(records))
+                    stream.flush()
+                except (OSError, ValueError):
+                    pass
+                self.written += len(records)
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
+                if self.path:
+                    stream.close()
+                return
+
+    def _render(self, records: list) -> str:
+        return "".join(self._format(r) for r in records)
+
+    @staticmethod
+    def _format(record: tuple) -> str:
+        ts, level, logger, event, fields = record
+        entry = {"ts": round(ts, 6), "level": level, "logger": logger, "event": event}
+        entry.update(fields)
+        return json.dumps(entry, ensure_ascii=False, default=str) + "\n"
+
+    def close(self, timeout: float = 2.0):
+        """
+        Flushes queued records and stops the writer thread.
+        """
+        thread = self._thread
+        if thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        thread.join(timeout)
+        self._thread = None
+
+
+class Logger:
+    def __init__(self, name: str, writer: LogWriter, level: str, sample: dict):
+        self.name = name
+        self.writer = writer
+        self.min_level = LEVELS.get(level, 20)
+        self.sample = sample
+
+    def enabled(self, level: str, route: str = None) -> bool:
+        value = LEVELS[level]
+        if value < self.min_level:
+            return False
+        if route is not None and value < LEVELS["warning"]:
+            rate = self.sample.get(route)
+            if rate is not None and random.random() >= rate:
+                return False
+        return True
+
+    def log(self, level: str, event: str, **fields):
+        if self.enabled(level, fields.get("route")):
+            span = TRACE_CONTEXT.get()
+            if span is not None:
+                fields["trace_id"] = span.trace_id
+                fields["span_id"] = span.span_id
+            self.writer.submit((time.time(), level, self.name, event, fields))
+
+    def debug(self, event: str, **fields):
+        self.log("debug", event, **fields)
+
+    def info(self, event: str, **fields):
+        self.log("info", event, **fields)
+
+    def warning(self, event: str, **fields):
+        self.log("warning", event, **fields)
+
+    def error(self, event: str, **fields):
+        self.log("error", event, **fields)
+
+
+WRITER = LogWriter()
+_LEVEL_OVERRIDES = _parse_pairs(LOG_LEVELS)
+_SAMPLE_RATES = {route: float(rate) for route, rate in _parse_pairs(LOG_SAMPLE).items()}
+_LOGGERS = {}
+
+
+def get_logger(name: str) -> Logger:
+    """
+    Shared Logger for `name`, with its LOG_LEVELS override if any.
+    """
+    logger = _LOGGERS.get(name)
+    if logger is None:
+        logger = Logger(name, WRITER, _LEVEL_OVERRIDES.get(name, LOG_LEVEL).lower(), _SAMPLE_RATES)
+        _LOGGERS[name] = logger
+    return logger
+
+
+atexit.register(WRITER.close)
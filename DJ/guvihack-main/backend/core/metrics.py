@@ -0,0 +1,127 @@
+import bisect
+import time
+from contextlib import contextmanager
+
+# In-process counters and latency histograms, rendered in the Prometheus text
+# exposition format by GET /metrics. Recording is a bisect plus a few integer
+# adds, cheap enough to leave on. Each uvicorn worker keeps its own numbers
+# (scrape every worker, or run one).
+
+# Seconds. Regex stages sit in the first buckets, LLM calls in the last ones.
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in sorted(labels.items())) + "}"
+
+
+class Metrics:
+    def __init__(self):
+        self._histograms = {}  # (name, labels tuple) -> Histogram
+        self._counters = {}    # (name, labels tuple) -> int
+        self._help = {}
+
+    def describe(self, name: str, help_text: str):
+        self._help[name] = help_text
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = Histogram()
+        histogram.observe(value)
+
+    def inc(self, name: str, amount: int = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        self._counters[key] = self._counters.get(key, 0) + amount
+
+    @contextmanager
+    def stage(self, stage: str, name: str = "webhook_stage_seconds"):
+        """
+        Times the with-block into histogram `name` with label stage=<stage>.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, stage=stage)
+
+    def render(self, gauges: dict = None, counters: dict = None) -> str:
+        """
+        Prometheus text format. `gauges` adds point-in-time values and
+        `counters` running totals kept elsewhere (names ending in _total),
+        both as {name: value} or {name: [(labels, value), ...]}.
+        """
+        lines = []
+        by_name = {}
+        for (name, labels), histogram in self._histograms.items():
+            by_name.setdefault(name, []).append((dict(labels), histogram))
+        for name in sorted(by_name):
+            self._header(lines, name, "histogram")
+            for labels, histogram in by_name[name]:
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels({**labels, 'le': repr(bound)})} {cumulative}")
+                lines.append(f"{name}_bucket{_labels({**labels, 'le': '+Inf'})} {histogram.count}")
+                lines.append(f"{name}_sum{_labels(labels)} {histogram.sum:.6f}")
+                lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+
+        totals = {}
+        for (name, labels), value in self._counters.items():
+            totals.setdefault(name, []).append((dict(labels), value))
+        for name, value in (counters or {}).items():
+            totals[name] = value
+        for name in sorted(totals):
+            self._series(lines, name, "counter", totals[name])
+
+        for name, value in sorted((gauges or {}).items()):
+            self._series(lines, name, "gauge", value)
+        return "\n".join(lines) + "\n"
+
+    def _series(self, lines: list, name: str, kind: str, value):
+        self._header(lines, name, kind)
+        series = value if isinstance(value, list) else [({}, value)]
+        for labels, v in series:
+            lines.append(f"{name}{_labels(labels)} {v}")
+
+    def _header(self, lines: list, name: str, kind: str):
+        if name in self._help:
+            lines.append(f"# HELP {name} {self._help[name]}")
+        lines.append(f"# TYPE {name} {kind}")
+
+
+METRICS = Metrics()
+METRICS.describe("webhook_stage_seconds", "Time spent in each stage of a webhook turn")
+METRICS.describe("http_request_seconds", "Request latency by route")
+METRICS.describe("llm_fallbacks_total", "LLM calls that returned the fallback reply")
+METRICS.describe("brain_parse_failures_total", "Brain replies that were not valid JSON")
+METRICS.describe("voice_speculative_drafts_total", "Voice replies drafted before end of turn, by outcome")
+METRICS.describe("voice_speculative_wasted_tokens_total", "LLM tokens spent on discarded voice reply drafts")
+METRICS.describe("llm_cache_events_total", "Response cache lookups and stores, by event")
+METRICS.describe("llm_prompt_total", "Prompt sizes and token usage, summed over LLM calls")
+METRICS.describe("callback_events_total", "GUVI callback submissions and delivery outcomes, by event")
+# Export the error counters at 0 before the first failure
+METRICS.inc("llm_fallbacks_total", 0, mode="sync")
+METRICS.inc("llm_fallbacks_total", 0, mode="stream")
+METRICS.inc("brain_parse_failures_total", 0)
@@ -267,3 +267,46 @@ def get_persona(name: str) -> Persona:
         "student": STUDENT_PERSONA
     }
     return personas.get(name.lower(), GRANDMA_PERSONA)
+
+
+# --- Prompt layout ---
+# Everything that never changes for a persona goes first, byte-identical on every
+# turn, so the provider's prompt cache can reuse it. Per-turn state (phase, intel,
+# conversation) follows in a separate, small message.
+
+RESPONSE_RULES = """
+🚨 TONE & FLOW CONSTRAINTS:
+- BE NATURAL. Respond directly to the Scammer's last message.
+- SUB 12 WORDS per message. No filler like "Oh hello".
+- NEVER repeat the same strategy or "tech error" twice. Use variety.
+- If they have already said their name (see INTEL GATHERED), DO NOT ask "who's this?" or "what's ur name?".
+- If they ask a question, answer it in character before moving to your goal.
+
+IMPORTANT: You must respond in valid JSON format ONLY.
+{
+    "analysis": "Short analysis of their intent",
+    "strategy": "Your current tactic (e.g. 'faking error', 'distracting', 'verifying ID')",
+    "reply": "Your in-character response (short, lowercase, informal)",
+    "extractedIntel": {
+        "scammerName": [], "bankAccounts": [], "upiIds": [], "phishingLinks": [], "phoneNumbers": [],
+        "jobTitle": [], "companyNames": [], "location": [], "suspiciousKeywords": []
+    }
+}
+"""
+
+_PREFIX_CACHE = {}
+
+
+def build_static_prefix(persona: Persona) -> str:
+    """
+    The cacheable part of the system prompt for a persona (built once).
+    """
+    prefix = _PREFIX_CACHE.get(persona.name)
+    if prefix is None:
+        prefix = (
+            f"{persona.system_prompt}\n"
+            f"{RESPONSE_RULES}\n"
+            f"🎯 GOAL: Extract {', '.join(persona.intelligence_targets)} without being suspicious.\n"
+        )
+        _PREFIX_CACHE[persona.name] = prefix
+    return prefix
@@ -0,0 +1,124 @@
+import json
+
+# Incremental parsing of the brain's JSON reply while it is still streaming.
+# We only need one thing early: the characters of the top-level "reply" string,
+# so the caller can hear the persona before analysis/strategy/intel finish.
+
+_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+
+class ReplyStreamParser:
+    """
+    Feed raw completion chunks; returns the newly decoded part of the top-level
+    "reply" string value on each call. Handles escapes split across chunks.
+    """
+    def __init__(self, field: str = "reply"):
+        self.field = field
+        self.buffer = []       # full raw text, for the final json.loads
+        self.reply = ""        # decoded reply so far
+        self.done = False      # reply string closed
+        self._depth = 0
+        self._in_string = False
+        self._escape = None    # None, "" (after backslash) or partial \uXXXX digits
+        self._high_surrogate = None
+        self._string = []      # current string's decoded chars (keys and values)
+        self._last_key = None
+        self._expect_value = False
+        self._streaming = False
+
+    def feed(self, chunk: str) -> str:
+        self.buffer.append(chunk)
+        out = []
+        for ch in chunk:
+            if self._in_string:
+                decoded = self._string_char(ch)
+                if decoded is None:
+                    continue
+                if decoded is _END:
+                    self._end_string()
+                    continue
+                self._string.append(decoded)
+                if self._streaming:
+                    out.append(decoded)
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string = []
+                self._streaming = (self._expect_value and self._depth == 1
+                                   and self._last_key == self.field and not self.done)
+            elif ch in '{[':
+                self._depth += 1
+                self._expect_value = False
+            elif ch in '}]':
+                self._depth -= 1
+            elif ch == ':':
+                self._expect_value = True
+            elif ch == ',':
+                self._expect_value = False
+                self._last_key = None
+
+        delta = "".join(out)
+        self.reply += delta
+        return delta
+
+    def _string_char(self, ch):
+        if self._escape is None:
+            if ch == '\\':
+                self._escape = ""
+                return None
+            if ch == '"':
+                return _END
+            return ch
+        if self._escape == "":
+            if ch == 'u':
+                self._escape = "u"
+                return None
+            self._escape = None
+            return _ESCAPES.get(ch, ch)
+        # \uXXXX in progress
+        self._escape += ch
+        if len(self._escape) < 5:
+            return None
+        code = self._escape[1:]
+        self._escape = None
+        try:
+            point = int(code, 16)
+        except ValueError:
+            return ""
+        # Emoji arrive as surrogate pairs (\ud83d\ude4f); join them
+        if 0xD800 <= point < 0xDC00:
+            self._high_surrogate = point
+            return None
+        if 0xDC00 <= point < 0xE000 and self._high_surrogate is not None:
+            point = 0x10000 + ((self._high_surrogate - 0xD800) << 10) + (point - 0xDC00)
+            self._high_surrogate = None
+        return chr(point)
+
+    def _end_string(self):
+        self._in_string = False
+        text = "".join(self._string)
+        if self._streaming:
+            self.done = True
+            self._streaming = False
+        if self._expect_value:
+            self._expect_value = False
+        elif self._depth == 1:
+            self._last_key = text
+
+    def text(self) -> str:
+        return "".join(self.buffer)
+
+    def parse(self) -> dict:
+        """
+        json.loads of everything fed so far, ignoring anything around the
+        outermost object (e.g. markdown fences). Raises on invalid JSON.
+        """
+        text = self.text()
+        start, end = text.find("{"), text.rfind("}")
+        if start > 0 or (end != -1 and end < len(text) - 1):
+            text = text[start:end + 1]
+        return json.loads(text)
+
+
+_END = object()
@@ -0,0 +1,179 @@
+import json
+import os
+import secrets
+import time
+from contextlib import contextmanager
+
+from .logs import LogWriter, TRACE_CONTEXT
+
+# Per-request tracing without an external collector.
+#
+# Spans nest through a contextvar, so anything called inside `with span(...)`
+# (including awaited coroutines) becomes a child. Finished spans go through a
+# background writer (same queue/thread design as core.logs) to TRACE_FILE as
+# OTLP/JSON: one {"resourceSpans": [...]} document per line, the layout the
+# OpenTelemetry Collector file exporter uses, so the file can be replayed
+# into any OTLP backend or read with jq.
+#
+#   TRACE_FILE=traces.jsonl   unset = tracing off (span() is a no-op)
+#   TRACE_SAMPLE=1.0          fraction of root spans (requests) recorded
+
+TRACE_FILE = os.getenv("TRACE_FILE")
+TRACE_SAMPLE = float(os.getenv("TRACE_SAMPLE", "1.0"))
+SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "vigilante-backend")
+
+_KIND = {"internal": 1, "server": 2, "client": 3, "producer": 4, "consumer": 5}
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "kind", "start_ns", "end_ns",
+                 "attributes", "events", "links", "error", "recording", "_token")
+
+    def __init__(self, name: str, trace_id: str, parent_id: str = None, kind: str = "internal",
+                 attributes: dict = None, links: list = None, recording: bool = True):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes or {})
+        self.events = []
+        self.links = list(links or [])   # [(trace_id, span_id)]
+        self.error = None
+        self.recording = recording  # False for unsampled traces: ids propagate, nothing is exported
+        self._token = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def add_event(self, name: str, **attributes):
+        self.events.append((time.time_ns(), name, attributes))
+
+    def context(self) -> tuple:
+        return (self.trace_id, self.span_id)
+
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            if self.recording:
+                TRACER.export(self)
+
+
+def _value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_value(v) for v in value]}}
+    return {"stringValue": str(value)}
+
+
+def _attributes(attributes: dict) -> list:
+    return [{"key": k, "value": _value(v)} for k, v in attributes.items() if v is not None]
+
+
+def _otlp_span(span: Span) -> dict:
+    data = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": _KIND.get(span.kind, 1),
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": _attributes(span.attributes),
+        "status": {"code": 2, "message": span.error} if span.error else {"code": 0}
+    }
+    if span.parent_id:
+        data["parentSpanId"] = span.parent_id
+    if span.events:
+        data["events"] = [{"timeUnixNano": str(ts), "name": name, "attributes": _attributes(attrs)}
+                          for ts, name, attrs in span.events]
+    if span.links:
+        data["links"] = [{"traceId": trace_id, "spanId": span_id} for trace_id, span_id in span.links]
+    return data
+
+
+class SpanWriter(LogWriter):
+    """
+    LogWriter that renders each batch of finished spans as one OTLP/JSON line.
+    """
+    def _render(self, spans: list) -> str:
+        document = {"resourceSpans": [{
+            "resource": {"attributes": _attributes({"service.name": SERVICE_NAME, "process.pid": os.getpid()})},
+            "scopeSpans": [{"scope": {"name": "vigilante"}, "spans": [_otlp_span(s) for s in spans]}]
+        }]}
+        return json.dumps(document, ensure_ascii=False, default=str) + "\n"
+
+
+class Tracer:
+    def __init__(self, path: str = TRACE_FILE, sample: float = TRACE_SAMPLE):
+        self.enabled = bool(path)
+        self.sample = sample
+        self.writer = SpanWriter(path) if path else None
+
+    def start(self, name: str, kind: str = "internal", attributes: dict = None,
+              links: list = None, root: bool = False, activate: bool = False) -> Span:
+        """
+        Starts a span under the active one (or a new trace). Returns None when
+        tracing is off. With activate=True the span becomes the active one
+        until end_active() is called on it.
+        """
+        if not self.enabled:
+            return None
+        parent = None if root else TRACE_CONTEXT.get()
+        if parent is None:
+            recording = self.sample >= 1.0 or secrets.randbelow(10 ** 6) < self.sample * 10 ** 6
+            span = Span(name, secrets.token_hex(16), None, kind, attributes, links, recording)
+        else:
+            span = Span(name, parent.trace_id, parent.span_id, kind, attributes, links, parent.recording)
+        if activate:
+            span._token = TRACE_CONTEXT.set(span)
+        return span
+
+    def end_active(self, span: Span):
+        if span is None:
+            return
+        if span._token is not None:
+            TRACE_CONTEXT.reset(span._token)
+            span._token = None
+        span.end()
+
+    def export(self, span: Span):
+        if self.writer is not None:
+            self.writer.submit(span)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+TRACER = Tracer()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    `with span("stage", key=value) as s:` - child of the active span; s is None
+    when tracing is off, so guard s.set(...) calls with `if s`.
+    """
+    if not TRACER.enabled:
+        yield None
+        return
+    current = TRACER.start(name, attributes=attributes, activate=True)
+    try:
+        yield current
+    except BaseException as e:
+        if current is not None:
+            current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        TRACER.end_active(current)
+
+
+def current_span() -> Span:
+    return TRACE_CONTEXT.get()
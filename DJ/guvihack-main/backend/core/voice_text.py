@@ -0,0 +1,283 @@
+import re
+
+# Single-pass normalizer for speech-to-text transcripts.
+#
+# Scammers on calls dictate identifiers: "nine eight double seven ...",
+# "rahul dot sharma at the rate okaxis", "nau aath saat ...". Before regex
+# extraction one precompiled pattern finds the whole words the tables below
+# know about, and only those are rewritten, so ordinary words are never
+# touched ("someone" stays "someone", not "s1"). Digits dictated with spaces
+# come out as one run ("9 8 7" -> "987") that the phone/UPI patterns can match.
+#
+#   digit words    English, Hinglish and Devanagari ("nine", "nau", "नौ"),
+#                  Devanagari digits, teens and tens ("ninety eight" -> "98")
+#   repeats        "double"/"triple"/"quadruple" before a digit
+#   "at"           "at" / "at the rate" -> "@" only before a UPI/mail
+#                  provider or right after a dictated "dot"/"underscore", so
+#                  "call me at home" and "at 5 pm" are left alone
+#   symbols        "dot", "underscore", "hyphen" between two words; "plus"
+#                  before a number
+#
+# VoiceNormalizer does the same on a transcript that arrives in pieces.
+
+UNITS = {
+    "zero": "0", "one": "1", "two": "2", "three": "3", "four": "4",
+    "five": "5", "six": "6", "seven": "7", "eight": "8", "nine": "9",
+    # Hinglish
+    "shunya": "0", "shoonya": "0", "sunya": "0", "ek": "1", "do": "2", "teen": "3",
+    "char": "4", "chaar": "4", "paanch": "5", "panch": "5", "chhe": "6", "chhah": "6",
+    "che": "6", "saat": "7", "aath": "8", "aat": "8", "nau": "9",
+    # Devanagari
+    "शून्य": "0", "एक": "1", "दो": "2", "तीन": "3", "चार": "4", "पांच": "5", "पाँच": "5",
+    "छह": "6", "छः": "6", "सात": "7", "आठ": "8", "नौ": "9",
+}
+
+# Number words that are also everyday words; only read as digits next to
+# another number ("do you" and "no one" stay, "nau do teen" -> "923")
+WEAK_UNITS = {"one", "do", "teen", "che", "char", "aat"}
+
+TEENS = {
+    "ten": "10", "eleven": "11", "twelve": "12", "thirteen": "13", "fourteen": "14",
+    "fifteen": "15", "sixteen": "16", "seventeen": "17", "eighteen": "18", "nineteen": "19",
+}
+
+TENS = {
+    "twenty": "2", "thirty": "3", "forty": "4", "fifty": "5",
+    "sixty": "6", "seventy": "7", "eighty": "8", "ninety": "9",
+}
+
+REPEATS = {"double": 2, "dubble": 2, "triple": 3, "tripple": 3, "quadruple": 4}
+
+SYMBOLS = {"dot": ".", "underscore": "_", "hyphen": "-"}
+
+# Words after "at" that make it an "@"
+PROVIDERS = {
+    "paytm", "ybl", "ibl", "axl", "apl", "upi", "okaxis", "oksbi", "okicici", "okhdfcbank",
+    "axisbank", "icici", "sbi", "hdfcbank", "kotak", "yesbank", "freecharge", "airtel",
+    "jio", "phonepe", "gpay", "gmail", "yahoo", "outlook", "hotmail", "rediffmail",
+}
+
+_DEVANAGARI_DIGITS = str.maketrans("०१२३४५६७८९", "0123456789")
+
+_WORD = r"(?:[^\W_]|[ऀ-ॿ])+"
+_EDGE_BEFORE = r"(?<![^\W_])(?<![ऀ-ॿ])"
+_EDGE_AFTER = r"(?![^\W_])(?![ऀ-ॿ])"
+
+# Every word the converter may act on, plus digit runs. Text between matches
+# is copied through untouched, so ordinary prose costs one regex scan.
+_TRIGGER_WORDS = set(UNITS) | set(TEENS) | set(TENS) | set(REPEATS) | set(SYMBOLS) | {"at", "plus"}
+
+
+def _alternation(words: list) -> str:
+    """
+    Regex alternation with shared prefixes factored out ("s(?:even|ix)"), so
+    the engine tests each character once instead of once per word.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def render(node: dict) -> str:
+        branches = [re.escape(ch) + render(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = "(?:" + "|".join(branches) + ")"
+        return body + "?" if "" in node else body
+
+    return render(trie)
+
+
+_TRIGGER_RE = re.compile(
+    _EDGE_BEFORE + r"(?:" + _alternation(_TRIGGER_WORDS) + r"|[0-9०-९]+)" + _EDGE_AFTER
+)
+_NEXT_WORD_RE = re.compile(r"\s*(" + _WORD + ")")
+_WORD_RE = re.compile(_WORD)
+
+# Max words the converter looks past the current one ("at the rate <provider>")
+LOOKAHEAD = 3
+
+
+class VoiceNormalizer:
+    """
+    Incremental transcript normalizer.
+
+        norm = VoiceNormalizer()
+        out = norm.feed("my number is nine ei") + norm.feed("ght seven ...") + norm.flush()
+
+    feed() returns the normalized text that is final so far; the last few
+    words are held back until the lookahead they need has arrived.
+    feed(chunk, final=True) is feed() then flush() for the last chunk.
+    """
+    def __init__(self):
+        self._pending = ""       # raw text not yet converted
+        self._prev = None        # kind of the last emitted text: num/word/sym/punct
+        self._space = ""         # whitespace seen after the last emitted text
+        self._join = False       # last emitted symbol glues to the next text ("@", ".")
+        self._handle = False     # inside a dictated handle ("rahul.k", "rahul_92")
+
+    def feed(self, chunk: str, final: bool = False) -> str:
+        self._pending += chunk.lower()
+        if final:
+            return self.flush()
+        text = self._pending
+        # A trailing word may be cut mid-way; wait for the next chunk
+        words = [m.start() for m in _WORD_RE.finditer(text)]
+        if words and _WORD_RE.match(text, words[-1]).end() == len(text):
+            available = words.pop()
+        else:
+            available = len(text)
+        # Stop early enough that every converted word can see LOOKAHEAD words
+        if len(words) <= LOOKAHEAD:
+            return ""
+        return self._run(words[-(LOOKAHEAD + 1)], available)
+
+    def flush(self) -> str:
+        out = self._run(len(self._pending), len(self._pending)) + self._space
+        self._space = ""
+        return out
+
+    def _run(self, limit: int, end: int) -> str:
+        out = []
+        done = self._convert(self._pending, limit, end, out)
+        self._pending = self._pending[done:]
+        return "".join(out)
+
+    @staticmethod
+    def _next_word(text: str, pos: int, end: int) -> tuple:
+        """
+        (word, end offset) of the word after pos if only whitespace separates them.
+        """
+        m = _NEXT_WORD_RE.match(text, pos, end)
+        return (m.group(1), m.end()) if m else (None, pos)
+
+    def _number(self, text: str, word: str, pos: int, end: int, weak: bool = False) -> tuple:
+        """
+        (digits, end offset) if word (ending at pos) starts a number, else None.
+        Weak words count only next to another number, or with weak=True.
+        """
+        if word[0].isdigit():
+            digits = word.translate(_DEVANAGARI_DIGITS)
+            return (digits, pos) if digits.isdigit() else None
+        if word in TEENS:
+            return TEENS[word], pos
+        if word in TENS:
+            after, after_end = self._next_word(text, pos, end)
+            unit = UNITS.get(after)
+            # "twenty one", but not "twenty do"
+            if unit and unit != "0" and (after == "one" or after not in WEAK_UNITS):
+                return TENS[word] + unit, after_end
+            return TENS[word] + "0", pos
+        digit = UNITS.get(word)
+        if digit is None:
+            return None
+        if word in WEAK_UNITS and not weak and self._prev != "num":
+            after, _ = self._next_word(text, pos, end)
+            if after is None or not self._is_number_word(after):
+                return None
+        return digit, pos
+
+    @staticmethod
+    def _is_number_word(word: str) -> bool:
+        if word[0].isdigit():
+            return word.translate(_DEVANAGARI_DIGITS).isdigit()
+        return word not in WEAK_UNITS and (word in UNITS or word in TEENS or word in TENS)
+
+    def _plain(self, segment: str, out: list):
+        """
+        Copies text that needs no conversion, deferring its trailing whitespace.
+        """
+        body = segment.rstrip()
+        if not body:
+            self._space += segment
+            return
+        if self._join:
+            body = body.lstrip()
+            self._handle = len(body.split(None, 1)) == 1
+        else:
+            out.append(self._space)
+            self._handle = False
+        out.append(body)
+        self._space = segment[len(segment.rstrip()):]
+        last = body[-1]
+        self._prev = "word" if last.isalnum() or "ऀ" <= last <= "ॿ" else "punct"
+        self._join = False
+
+    def _emit(self, out: list, text: str, kind: str, glue: bool = False):
+        # Digits dictated with spaces form one run; symbols glue both sides
+        if not (glue or self._join or (kind == "num" and self._prev == "num")):
+            out.append(self._space)
+        out.append(text)
+        self._space = ""
+        self._handle = self._join or kind == "sym"
+        self._prev = kind
+        self._join = False
+
+    def _convert(self, text: str, limit: int, end: int, out: list) -> int:
+        pos = 0
+        while True:
+            m = _TRIGGER_RE.search(text, pos, limit)
+            if m is None:
+                break
+            if m.start() > pos:
+                self._plain(text[pos:m.start()], out)
+            word = m.group()
+            pos = m.end()
+
+            # double/triple <digit>
+            count = REPEATS.get(word)
+            if count:
+                after, after_end = self._next_word(text, pos, end)
+                number = self._number(text, after, after_end, end, weak=True) if after else None
+                if number and len(number[0]) == 1:
+                    self._emit(out, number[0] * count, "num")
+                    pos = number[1]
+                    continue
+
+            number = self._number(text, word, pos, end)
+            if number:
+                self._emit(out, number[0], "num")
+                pos = number[1]
+                continue
+
+            if word == "at":
+                after, after_end = self._next_word(text, pos, end)
+                if after == "the":
+                    rate, rate_end = self._next_word(text, after_end, end)
+                    if rate == "rate":
+                        after, after_end = self._next_word(text, rate_end, end)
+                if after is not None and (after in PROVIDERS or
+                                          (self._handle and not self._is_number_word(after))):
+                    self._emit(out, "@", "sym", glue=True)
+                    self._join = True
+                    # Resume at the provider word itself
+                    pos = after_end - len(after)
+                    continue
+
+            symbol = SYMBOLS.get(word)
+            if symbol and self._prev in ("word", "num") and self._next_word(text, pos, end)[0]:
+                self._emit(out, symbol, "sym", glue=True)
+                self._join = True
+                continue
+
+            if word == "plus":
+                after, after_end = self._next_word(text, pos, end)
+                if after and self._number(text, after, after_end, end):
+                    self._emit(out, "+", "sym")
+                    self._join = True
+                    continue
+
+            self._emit(out, word, "word")
+        if pos < limit:
+            self._plain(text[pos:limit], out)
+            pos = limit
+        return pos
+
+
+def normalize_voice_text(text: str) -> str:
+    """
+    Lowercased transcript with spoken numbers and symbols written out.
+    """
+    return VoiceNormalizer().feed(text, final=True)
@@ -11,7 +11,7 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-from fastapi import Header, HTTPException, BackgroundTasks, Request
+from fastapi import Header, HTTPException, Request
 import time
 import os
 
@@ -28,33 +28,90 @@ async def startup_event():
     print("READY TO INTERCEPT SCAMMERS...")
     print("✅"*15 + "\n")
 
+def route_label(request: Request) -> str:
+    """
+    The matched route's path template, so metric labels and span names stay
+    bounded; "other" for requests that matched no route (404s, scanners).
+    """
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or "other"
+
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    start_time = time.time()
-    print(f"DEBUG: [INCOMING] {request.method} {request.url}")
-    response = await call_next(request)
-    process_time = time.time() - start_time
-    print(f"DEBUG: [OUTGOING] {request.method} {request.url} - Status: {response.status_code} - Time: {process_time:.4f}s")
+    start_time = time.perf_counter()
+    # Root span for the request; the endpoint and everything it awaits nest under it.
+    # It is named after the matched route template once routing has run.
+    root = TRACER.start(f"{request.method} other", kind="server", root=True, activate=True, attributes={
+        "http.method": request.method, "request.id": request.headers.get("x-request-id")
+    })
+    log.debug("request.start", path=request.url.path, method=request.method)
+    try:
+        response = await call_next(request)
+    except Exception as e:
+        if root is not None:
+            route = route_label(request)
+            root.name = f"{request.method} {route}"
+            root.set(**{"http.route": route})
+            root.error = f"{type(e).__name__}: {e}"
+        TRACER.end_active(root)
+        raise
+    route = route_label(request)
+    if root is not None:
+        root.name = f"{request.method} {route}"
+        root.set(**{"http.route": route, "http.status_code": response.status_code})
+        response.headers["X-Trace-Id"] = root.trace_id
+    TRACER.end_active(root)
+    process_time = time.perf_counter() - start_time
+    METRICS.observe("http_request_seconds", process_time, route=route)
+    log.info("request", route=route, method=request.method, status=response.status_code,
+             ms=round(process_time * 1000, 2))
     return response
 
-from core.llm import VigilanteBrain
+from core.llm import VigilanteBrain  # loads backend/.env
+from core.logs import get_logger, WRITER as LOG_WRITER
+from core.metrics import METRICS
+from core.tracing import TRACER, span, current_span
+from contextlib import contextmanager
 from core.prompts import get_persona
-from models.schemas import ChallengeInput, AgentAPIResponse
+from core.keywords import KEYWORDS
+from core.entities import merge_intel
+from models.schemas import ChallengeInput, AgentAPIResponse, BatchExtractInput, BatchExtractResponse, VoiceTranscriptInput
 from services.intelligence import IntelligenceExtractor
+from services.session_intel import IntelAccumulator, SessionIntel
+from services.session_store import create_session_store, MemorySessionStore
+from services.batch import extract_batch_async, shutdown_pool
+from services.callbacks import CallbackDispatcher
+from services.voice_intel import VoiceCallTracker
+import asyncio
 import json
-import requests
+
+log = get_logger("api")
+
+@contextmanager
+def stage(name: str, **attributes):
+    """
+    One webhook pipeline stage: a latency histogram sample and a tracing span.
+    """
+    with span(name, **attributes) as current, METRICS.stage(name):
+        yield current
 
 brain = VigilanteBrain()
 extractor = IntelligenceExtractor()
 current_persona = get_persona("grandma")
 
-# In-memory session store (Mock Database)
-SESSIONS = {}
+# Session store: bounded in-memory LRU, or SQLite shared by all workers (SESSION_STORE=sqlite)
+SESSIONS = create_session_store(dumps=SessionIntel.to_dict, loads=SessionIntel.from_dict)
+intel_accumulator = IntelAccumulator(brain.extract_intelligence_from_text, store=SESSIONS)
 
 # Guidelines: "Mandatory Final Result Callback"
+# Delivered by a shared async dispatcher (pooled connections, per-session
+# coalescing, retries, on-disk outbox) instead of a blocking request per turn.
+callback_dispatcher = CallbackDispatcher()
+
+# Live voice calls: per-call streaming extraction fed by the voice worker
+voice_calls = VoiceCallTracker()
+
 def send_guvi_callback(session_id: str, total_msgs: int, intel: dict, notes: str):
-    callback_url = "https://hackathon.guvi.in/api/updateHoneyPotFinalResult"
-    
     # Transform intel to callback format
     payload = {
         "sessionId": session_id,
@@ -70,37 +127,65 @@ def send_guvi_callback(session_id: str, total_msgs: int, intel: dict, notes: str
         "agentNotes": notes
     }
     
-    try:
-        requests.post(callback_url, json=payload, timeout=5) # Uncommented for final submission
-        print(f"Callback Payload (Mock Sent): {json.dumps(payload, indent=2)}")
-    except Exception as e:
-        print(f"Callback Failed: {e}")
+    callback_dispatcher.submit(payload)
+
+@app.on_event("startup")
+async def start_callback_dispatcher():
+    await callback_dispatcher.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await callback_dispatcher.stop()
+    shutdown_pool()
+    SESSIONS.close()
+    TRACER.close()
+    LOG_WRITER.close()
 
 @app.get("/")
 def read_root():
     return {"status": "Vigilante AI Module 1 Operational", "mode": "Hackathon_Evaluation"}
 
+from fastapi.responses import PlainTextResponse
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Prometheus scrape endpoint: per-stage webhook latency histograms, request
+    latency by route, fallback/parse-failure counters and a few live gauges.
+    """
+    # Running totals kept by the cache, prompt stats and dispatcher
+    counters = {
+        "llm_cache_events_total": [({"event": k}, v) for k, v in brain.cache.counters.items()],
+        "llm_prompt_total": [({"field": k}, v) for k, v in brain.prompt_stats.counters.items()],
+        "callback_events_total": [({"event": k}, v) for k, v in callback_dispatcher.counters.items()],
+    }
+    gauges = {
+        "callback_pending": callback_dispatcher.pending_count(),
+        "log_records_dropped": LOG_WRITER.dropped,
+        "voice_calls_active": len(voice_calls)
+    }
+    if isinstance(SESSIONS, MemorySessionStore):
+        gauges["sessions_active"] = len(SESSIONS)
+    return PlainTextResponse(METRICS.render(gauges, counters), media_type="text/plain; version=0.0.4")
+
 from livekit import api
 
 # Add validation error handler to debug hackathon tester issues
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
-    # Log the validation error details
-    print("=" * 70)
-    print("❌ VALIDATION ERROR - Request from hackathon tester failed:")
-    print(f"URL: {request.url}")
-    print(f"Method: {request.method}")
-    print(f"Headers: {dict(request.headers)}")
+    # Log the validation error details (hackathon tester debugging)
+    body = None
     try:
         body = await request.body()
-        print(f"Body: {body.decode('utf-8')}")
-    except:
-        print("Could not read request body")
-    print(f"Pydantic Errors: {exc.errors()}")
-    print("=" * 70)
+    except Exception:
+        pass
+    log.warning("validation_error", route=request.url.path, method=request.method,
+                headers=dict(request.headers),
+                body=body.decode('utf-8', 'replace') if body is not None else None,
+                errors=exc.errors())
     
     # Return detailed error for debugging
     return JSONResponse(
@@ -141,27 +226,28 @@ def get_token(request: Request):
         
     return {"token": token.to_jwt(), "url": os.getenv("LIVEKIT_URL")}
 
-@app.post("/webhook", response_model=AgentAPIResponse)
-async def scam_webhook(
-    data: ChallengeInput, 
-    background_tasks: BackgroundTasks,
-    x_api_key: str = Header(None) # Guideline: 4. API Authentication
-):
-    # Auth Check
-    if x_api_key != "meowdj@32": 
-        raise HTTPException(status_code=401, detail="Invalid API Key")
-
-    print(f"Incoming ({data.sessionId}): {data.message.text}")
+async def prepare_turn(data: ChallengeInput) -> dict:
+    """
+    Steps 1-4 of a webhook turn: everything that happens before the LLM call.
+    """
+    request_span = current_span()
+    if request_span is not None:
+        request_span.set(**{"session.id": data.sessionId, "history.length": len(data.conversationHistory)})
+    log.debug("turn.incoming", route="/webhook", session=data.sessionId, text=data.message.text)
     
     # 1. Update Session History
     msg_count = len(data.conversationHistory) + 1
     
     # 2. Extract Intelligence + DETECT SCAM
-    intel_data = extractor.extract(data.message.text)
-    scam_analysis = extractor.detect_scam(data.message.text)
+    # One keyword-automaton pass feeds both the scam score and suspiciousKeywords
+    with stage("keyword_scan"):
+        keyword_hits = KEYWORDS.scan(data.message.text)
+    with stage("detect_scam"):
+        scam_analysis = extractor.detect_scam(data.message.text, keyword_hits)
     
     # Define regex backup for later merging
-    regex_intel = brain.extract_intelligence_from_text(data.message.text)
+    with stage("regex_intel"):
+        regex_intel = brain.extract_intelligence_from_text(data.message.text, keyword_hits)
     
     # 3. Agent Handoff Logic (Guideline: "Once scam intent is detected... activate AI Agent")
     # For this hackathon honey-pot, we are usually aggressive, but we can now be smart.
@@ -169,60 +255,65 @@ async def scam_webhook(
         # Optional: If not a scam, you could behave differently, but for the competition, 
         # we assume all input to this webhook is suspect.
         # We will log it but still engage cautiously.
-        print(f"Low Confidence Scam ({scam_analysis['confidence']}): {scam_analysis['reasons']}")
+        log.info("turn.low_confidence", route="/webhook", session=data.sessionId,
+                 confidence=scam_analysis['confidence'], reasons=scam_analysis['reasons'])
     
     # 4. Aggregated Intelligence (from history)
-    # This ensures the LLM knows what it already has
-    accumulated_intel = {
-        "scammerName": [], "bankAccounts": [], "upiIds": [], "phishingLinks": [], "phoneNumbers": [],
-        "jobTitle": [], "companyNames": [], "location": [], "suspiciousKeywords": []
+    # This ensures the LLM knows what it already has.
+    # Only history messages not seen on earlier turns of this session are extracted.
+    # The prompt context is fitted to a token budget: recent turns verbatim,
+    # older intel-bearing messages pinned, the rest in a rolling summary.
+    # A blocking (SQLite) session store is read and written off the event loop.
+    with stage("history_extract"):
+        update_args = (data.sessionId, data.conversationHistory, current_persona.name)
+        if SESSIONS.blocking:
+            accumulated_intel, context = await asyncio.to_thread(intel_accumulator.update_with_context, *update_args)
+        else:
+            accumulated_intel, context = intel_accumulator.update_with_context(*update_args)
+    log.debug("turn.context", route="/webhook", session=data.sessionId, tokens=context['tokens'],
+              recent=context['recent'], pinned=context['pinned'], summarized=context['summarized'])
+
+    return {
+        "msg_count": msg_count,
+        "scam_analysis": scam_analysis,
+        "regex_intel": regex_intel,
+        "accumulated_intel": accumulated_intel,
+        "context": context
     }
-    
-    # Simple aggregation from history metadata (if available) or by re-running extractor
-    # For now, we re-run extraction on history to get a clean state for the brain
-    for msg in data.conversationHistory:
-        hist_intel = brain.extract_intelligence_from_text(msg.text)
-        for key in accumulated_intel:
-            accumulated_intel[key] = list(set(accumulated_intel[key] + hist_intel.get(key, [])))
 
-    # 5. Brain Response (LLM) - now passing accumulated_intel
-    response_json_str = brain.generate_response(
-        user_input=data.message.text, 
-        persona=current_persona,
-        conversation_history=data.conversationHistory,
-        extracted_intel=accumulated_intel
-    )
-    
+def finish_turn(data: ChallengeInput, turn: dict, response_json_str: str) -> tuple:
+    """
+    Steps 5-7 of a webhook turn: parse the brain JSON, merge intel, schedule the
+    callback. Returns (AgentAPIResponse, parsed brain fields).
+    """
+    msg_count = turn["msg_count"]
+    scam_analysis = turn["scam_analysis"]
+    regex_intel = turn["regex_intel"]
+
     reply_text = "Thinking..."
     analysis = "Processing..."
     strategy = "Standard"
     llm_intel = {}
 
-    try:
-        llm_data = json.loads(response_json_str)
-        reply_text = llm_data.get("reply", "I'm sorry, I didn't verify that.")
-        analysis = llm_data.get("analysis", "Processing...")
-        strategy = llm_data.get("strategy", "Standard")
-        llm_intel = llm_data.get("extractedIntel", {})
-    except:
-        reply_text = "Could you repeat that?"
-        analysis = "Error parsing brain"
-        strategy = "Fallback"
+    with stage("json_parse"):
+        try:
+            llm_data = json.loads(response_json_str)
+            reply_text = llm_data.get("reply", "I'm sorry, I didn't verify that.")
+            analysis = llm_data.get("analysis", "Processing...")
+            strategy = llm_data.get("strategy", "Standard")
+            llm_intel = llm_data.get("extractedIntel", {})
+        except:
+            reply_text = "Could you repeat that?"
+            analysis = "Error parsing brain"
+            strategy = "Fallback"
+            METRICS.inc("brain_parse_failures_total")
         
     # 5. Merge Intelligence (LLM + Regex)
-    def merge_lists(l1, l2):
-        return list(set((l1 or []) + (l2 or [])))
-
-    final_intel = {
-        "bankAccounts": merge_lists(llm_intel.get('bankAccounts'), regex_intel.get('bankAccounts')),
-        "upiIds": merge_lists(llm_intel.get('upiIds'), regex_intel.get('upiIds')),
-        "phishingLinks": merge_lists(llm_intel.get('phishingLinks'), regex_intel.get('phishingLinks')),
-        "phoneNumbers": merge_lists(llm_intel.get('phoneNumbers'), regex_intel.get('phoneNumbers')),
-        "jobTitle": merge_lists(llm_intel.get('jobTitle'), regex_intel.get('jobTitle')),
-        "companyNames": merge_lists(llm_intel.get('companyNames'), regex_intel.get('companyNames')),
-        "location": merge_lists(llm_intel.get('location'), regex_intel.get('location')),
-        "suspiciousKeywords": merge_lists(llm_intel.get('suspiciousKeywords'), regex_intel.get('suspiciousKeywords'))
-    }
+    with stage("intel_merge"):
+        # Canonical entities: "+91 98..." and "98..." or UPI IDs in another
+        # case are one entry. History intel is included so every callback
+        # carries everything gathered in the session so far.
+        final_intel = merge_intel(llm_intel, regex_intel, turn["accumulated_intel"])
 
     # 6. Schedule Callback (Guideline 12)
     # Include scam confidence in notes
@@ -230,13 +321,144 @@ async def scam_webhook(
     
     # Only send callback if scam is actually detected or high confidence
     if scam_analysis["is_scam"] or scam_analysis['confidence'] > 0.4:
-        background_tasks.add_task(send_guvi_callback, data.sessionId, msg_count, final_intel, notes)
+        with stage("callback_dispatch"):
+            send_guvi_callback(data.sessionId, msg_count, final_intel, notes)
 
     # 7. Return JSON
-    return AgentAPIResponse(
+    response = AgentAPIResponse(
         status="success",
         reply=reply_text,
         debug_thought=f"{analysis} | {strategy}",
         intelligence=final_intel,
         metrics={"turns": msg_count, "confidence": scam_analysis['confidence']} 
     )
+    return response, {"analysis": analysis, "strategy": strategy, "extractedIntel": llm_intel}
+
+@app.post("/webhook", response_model=AgentAPIResponse)
+async def scam_webhook(
+    data: ChallengeInput, 
+    x_api_key: str = Header(None) # Guideline: 4. API Authentication
+):
+    # Auth Check
+    if x_api_key != "meowdj@32": 
+        raise HTTPException(status_code=401, detail="Invalid API Key")
+
+    turn = await prepare_turn(data)
+
+    # 5. Brain Response (LLM) - now passing accumulated_intel
+    with stage("generate_response"):
+        response_json_str = await brain.generate_response(
+            user_input=data.message.text, 
+            persona=current_persona,
+            conversation_history=data.conversationHistory,
+            extracted_intel=turn["accumulated_intel"],
+            context=turn["context"]
+        )
+
+    response, _ = finish_turn(data, turn, response_json_str)
+    return response
+
+def sse_event(event: str, payload: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+@app.post("/webhook/stream")
+async def scam_webhook_stream(
+    data: ChallengeInput,
+    x_api_key: str = Header(None)
+):
+    """
+    Server-Sent Events version of /webhook for the dashboard and voice bridge.
+    Emits "reply" events ({"delta": ...}) as the reply tokens arrive, then one
+    "final" event with the full /webhook response plus analysis, strategy and
+    extractedIntel.
+    """
+    if x_api_key != "meowdj@32":
+        raise HTTPException(status_code=401, detail="Invalid API Key")
+
+    turn = await prepare_turn(data)
+
+    async def event_stream():
+        response_json_str = None
+        llm_started = time.perf_counter()
+        # Not activated: this generator is resumed once per event, so the span
+        # is ended by hand rather than held in the context across yields
+        llm_span = TRACER.start("generate_response_stream")
+        async for kind, value in brain.generate_response_stream(
+            user_input=data.message.text,
+            persona=current_persona,
+            conversation_history=data.conversationHistory,
+            extracted_intel=turn["accumulated_intel"],
+            context=turn["context"]
+        ):
+            if kind == "reply":
+                yield sse_event("reply", {"delta": value})
+            else:
+                response_json_str = value
+        METRICS.observe("webhook_stage_seconds", time.perf_counter() - llm_started, stage="generate_response_stream")
+        if llm_span is not None:
+            llm_span.end()
+
+        response, brain_fields = finish_turn(data, turn, response_json_str)
+        yield sse_event("final", {**response.model_dump(), **brain_fields})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/extract/batch", response_model=BatchExtractResponse)
+async def extract_batch_endpoint(
+    data: BatchExtractInput,
+    x_api_key: str = Header(None)
+):
+    """
+    Re-runs regex extraction + scam detection over many texts (e.g. archived
+    transcripts) without calling the LLM. Results come back in input order.
+    """
+    if x_api_key != "meowdj@32":
+        raise HTTPException(status_code=401, detail="Invalid API Key")
+
+    results = await extract_batch_async(data.texts, data.chunkSize)
+    return BatchExtractResponse(status="success", count=len(results), results=results)
+
+
+@app.post("/voice/transcript")
+async def voice_transcript(
+    data: VoiceTranscriptInput,
+    x_api_key: str = Header(None)
+):
+    """
+    Finalized scammer transcript segments from a live voice call. Intel is
+    extracted incrementally per call; with final=true the call's intel goes
+    out through the same GUVI callback path as the text webhook, and the
+    call's speculative-reply counters are added to /metrics.
+    """
+    if x_api_key != "meowdj@32":
+        raise HTTPException(status_code=401, detail="Invalid API Key")
+
+    with stage("voice_extract", segments=len(data.segments)):
+        call = voice_calls.feed(data.sessionId, data.segments)
+        if data.final:
+            call = voice_calls.finish(data.sessionId)
+    intel = call.intel.to_dict()
+    scam_analysis = call.scam_analysis()
+
+    speculation = data.stats.speculation if data.final and data.stats else None
+    if speculation is not None:
+        METRICS.inc("voice_speculative_drafts_total", speculation.hits, outcome="hit")
+        METRICS.inc("voice_speculative_drafts_total", speculation.misses, outcome="miss")
+        METRICS.inc("voice_speculative_wasted_tokens_total", speculation.wastedPromptTokens, kind="prompt")
+        METRICS.inc("voice_speculative_wasted_tokens_total", speculation.wastedCompletionTokens, kind="completion")
+
+    if data.final and (scam_analysis["is_scam"] or call.has_identifiers()):
+        notes = (f"Voice call | Scam Confidence: {scam_analysis['confidence']} "
+                 f"({', '.join(scam_analysis['reasons'])})")
+        with stage("callback_dispatch"):
+            send_guvi_callback(data.sessionId, call.segments, intel, notes)
+        log.info("voice.call_finished", route="/voice/transcript", session=data.sessionId,
+                 segments=call.segments, confidence=scam_analysis["confidence"])
+
+    return {"status": "success", "final": data.final, "segments": call.segments,
+            "intelligence": intel, "scamAnalysis": scam_analysis}
@@ -38,3 +38,33 @@ class AgentAPIResponse(BaseModel):
     intelligence: Optional[dict] = None
     metrics: Optional[dict] = None
 
+
+# Batch re-analysis of archived transcripts (no LLM involved)
+class BatchExtractInput(BaseModel):
+    texts: List[str] = Field(..., max_length=20000)
+    chunkSize: Optional[int] = Field(None, ge=1, le=10000)
+
+class BatchExtractResponse(BaseModel):
+    status: str
+    count: int
+    results: List[dict]
+
+
+# Speculative reply drafts on one voice call (see Phase3_Voice/agent/speculation.py)
+class SpeculationStats(BaseModel):
+    drafts: int = Field(0, ge=0)
+    hits: int = Field(0, ge=0)
+    misses: int = Field(0, ge=0)
+    hitRate: Optional[float] = None
+    wastedPromptTokens: int = Field(0, ge=0)
+    wastedCompletionTokens: int = Field(0, ge=0)
+
+class VoiceCallStats(BaseModel):
+    speculation: Optional[SpeculationStats] = None
+
+# Finalized transcript segments from the voice worker (one live call)
+class VoiceTranscriptInput(BaseModel):
+    sessionId: str
+    segments: List[str] = Field(default_factory=list, max_length=500)
+    final: bool = False  # call ended: flush intel through the GUVI callback
+    stats: Optional[VoiceCallStats] = None  # call-level counters, sent with final=true
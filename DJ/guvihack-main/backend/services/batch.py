@@ -0,0 +1,85 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from core.keywords import KEYWORDS
+from services.intelligence import IntelligenceExtractor
+
+# Offline re-analysis of archived transcripts. Extraction and scam detection are
+# pure CPU work, so large batches are split into chunks and spread across a
+# process pool instead of running one text at a time behind the GIL.
+# Workers come from a forkserver (spawn where fork isn't available), never a
+# plain fork of the server: forking while its other threads hold locks (the
+# default executor, the log writer) can deadlock the children.
+
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "0")) or os.cpu_count() or 1
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "256"))
+
+_extractor = IntelligenceExtractor()
+_pool = None
+
+
+def analyze_text(text: str) -> dict:
+    hits = KEYWORDS.scan(text)
+    return {
+        "intelligence": _extractor.extract(text).model_dump(),
+        "scamAnalysis": _extractor.detect_scam(text, hits)
+    }
+
+
+def _analyze_chunk(texts: list) -> list:
+    return [analyze_text(t) for t in texts]
+
+
+def _chunks(texts: list, size: int) -> list:
+    return [texts[i:i + size] for i in range(0, len(texts), size)]
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        _pool = ProcessPoolExecutor(max_workers=BATCH_WORKERS, mp_context=multiprocessing.get_context(method))
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def extract_batch(texts: list, chunk_size: int = None) -> list:
+    """
+    Runs extract + detect_scam over many texts. Results are in input order.
+    Batches that fit in a single chunk run inline; spinning up workers costs
+    more than it saves there.
+    """
+    chunk_size = max(1, chunk_size or BATCH_CHUNK_SIZE)
+    if len(texts) <= chunk_size or BATCH_WORKERS == 1:
+        return _analyze_chunk(texts)
+
+    results = []
+    for chunk_result in get_pool().map(_analyze_chunk, _chunks(texts, chunk_size)):
+        results.extend(chunk_result)
+    return results
+
+
+async def extract_batch_async(texts: list, chunk_size: int = None) -> list:
+    """
+    Same as extract_batch, but awaits the pool so the event loop keeps serving
+    other requests while the batch runs.
+    """
+    chunk_size = max(1, chunk_size or BATCH_CHUNK_SIZE)
+    loop = asyncio.get_running_loop()
+    if len(texts) <= chunk_size or BATCH_WORKERS == 1:
+        return await loop.run_in_executor(None, _analyze_chunk, texts)
+
+    pool = get_pool()
+    chunk_results = await asyncio.gather(*[
+        loop.run_in_executor(pool, _analyze_chunk, chunk)
+        for chunk in _chunks(texts, chunk_size)
+    ])
+    return [result for chunk_result in chunk_results for result in chunk_result]
@@ -0,0 +1,382 @@
+import asyncio
+import glob
+import json
+import os
+import random
+import re
+import time
+
+import httpx
+
+try:
+    import fcntl
+except ImportError:  # Windows: one worker, no outbox locking
+    fcntl = None
+
+from core.logs import get_logger
+from core.tracing import TRACER, span, current_span
+
+# Async delivery of the "Mandatory Final Result Callback".
+#
+# - One shared keep-alive connection pool instead of a new connection per turn.
+# - Per-session coalescing: if a session produces several snapshots before the
+#   previous one went out, only the latest intel is sent.
+# - Retries with full-jitter exponential backoff.
+# - Every submitted payload is appended to an on-disk outbox (JSON lines) and
+#   acknowledged once delivered, so a restart resends whatever was pending.
+#   Each uvicorn worker holds its own outbox slot under a file lock
+#   (callback_outbox.jsonl, callback_outbox.1.jsonl, ...), so workers never
+#   compact or replay each other's records; slots left by workers that are
+#   gone are adopted on start. Outbox writes run in a writer task, off the
+#   event loop.
+# - Each delivery is its own trace, linked to the request spans that submitted
+#   the snapshots it carries.
+
+GUVI_CALLBACK_URL = os.getenv("GUVI_CALLBACK_URL", "https://hackathon.guvi.in/api/updateHoneyPotFinalResult")
+CALLBACK_OUTBOX = os.getenv("CALLBACK_OUTBOX", "callback_outbox.jsonl")
+CALLBACK_MAX_RETRIES = int(os.getenv("CALLBACK_MAX_RETRIES", "6"))
+CALLBACK_TIMEOUT = float(os.getenv("CALLBACK_TIMEOUT", "5"))
+CALLBACK_WORKERS = int(os.getenv("CALLBACK_WORKERS", "4"))
+
+log = get_logger("callbacks")
+
+
+class CallbackDispatcher:
+    def __init__(self, url: str = GUVI_CALLBACK_URL, outbox_path: str = CALLBACK_OUTBOX,
+                 max_retries: int = CALLBACK_MAX_RETRIES, timeout: float = CALLBACK_TIMEOUT,
+                 workers: int = CALLBACK_WORKERS, base_delay: float = 0.5, max_delay: float = 30.0):
+        self.url = url
+        self.outbox_base = outbox_path
+        self.outbox_path = outbox_path  # our slot's file once started
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.workers = max(1, workers)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._pending = {}        # sessionId -> (seq, payload), latest snapshot only
+        self._links = {}          # sessionId -> [(trace_id, span_id)] of submitting requests
+        self._queue = None        # sessionIds waiting for a worker
+        self._in_flight = set()
+        self._tasks = []
+        self._client = None
+        self._outbox = None
+        self._outbox_lock = None  # flock'd file that claims our outbox slot
+        self._outbox_lines = []   # records waiting for the writer task
+        self._outbox_wake = asyncio.Event()
+        self._outbox_compact = False
+        self._writer = None
+        self._closing = False
+        self._seq = 0
+        self._acks_since_compaction = 0
+        self.counters = {"submitted": 0, "coalesced": 0, "sent": 0, "retries": 0, "dropped": 0}
+
+    # --- lifecycle ---
+
+    async def start(self):
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=self.workers * 2, max_keepalive_connections=self.workers)
+        )
+        if self.outbox_path:
+            self._closing = False
+            self._recover(await asyncio.to_thread(self._claim_outbox))
+            self._writer = asyncio.create_task(self._outbox_writer())
+        for session_id in self._pending:
+            self._queue.put_nowait(session_id)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self, drain_timeout: float = 5.0):
+        """
+        Gives queued callbacks a moment to go out, then stops. Anything still
+        pending stays in the outbox for the next start.
+        """
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=drain_timeout)
+        except asyncio.TimeoutError:
+            pass
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self._client.aclose()
+        self._client = None
+        if self._writer:
+            # Last pass rewrites the outbox to exactly what is still pending
+            self._closing = True
+            self._compact_outbox()
+            await self._writer
+            self._writer = None
+            await asyncio.to_thread(self._release_outbox)
+
+    # --- producer side ---
+
+    def submit(self, payload: dict):
+        """
+        Queues a callback for payload["sessionId"]. Never blocks on the network.
+        """
+        session_id = payload["sessionId"]
+        # Microsecond clock, so seqs stay unique across restarts and adopted slots
+        self._seq = max(self._seq + 1, time.time_ns() // 1000)
+        self._write_outbox({"op": "put", "seq": self._seq, "sessionId": session_id, "payload": payload})
+        self.counters["submitted"] += 1
+
+        if session_id in self._pending:
+            self.counters["coalesced"] += 1
+        self._pending[session_id] = (self._seq, payload)
+        request_span = current_span()
+        if request_span is not None and request_span.recording:
+            self._links.setdefault(session_id, []).append(request_span.context())
+            del self._links[session_id][:-16]
+
+        if self._queue is None:
+            # Not started (e.g. called outside the app lifecycle); start lazily
+            asyncio.get_running_loop().create_task(self.start())
+        elif session_id not in self._in_flight:
+            self._queue.put_nowait(session_id)
+
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    # --- delivery ---
+
+    async def _worker(self):
+        while True:
+            session_id = await self._queue.get()
+            try:
+                if session_id in self._pending and session_id not in self._in_flight:
+                    self._in_flight.add(session_id)
+                    try:
+                        await self._deliver(session_id)
+                    finally:
+                        self._in_flight.discard(session_id)
+                    if session_id in self._pending:
+                        # A newer snapshot arrived after our last attempt
+                        self._queue.put_nowait(session_id)
+            finally:
+                self._queue.task_done()
+
+    async def _deliver(self, session_id: str):
+        delivery = TRACER.start("callback.deliver", kind="client", root=True, activate=True,
+                                attributes={"session.id": session_id})
+        try:
+            await self._attempts(session_id, delivery)
+        except BaseException as e:
+            if delivery is not None:
+                delivery.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            TRACER.end_active(delivery)
+
+    async def _attempts(self, session_id: str, delivery):
+        attempt = 0
+        while session_id in self._pending:
+            # Always send the newest snapshot, even mid-retry
+            seq, payload = self._pending[session_id]
+            if delivery is not None:
+                delivery.links.extend(self._links.pop(session_id, []))
+                delivery.set(seq=seq, attempts=attempt + 1)
+            status = None
+            with span("callback.attempt", attempt=attempt + 1) as current:
+                try:
+                    response = await self._client.post(self.url, json=payload)
+                    status = response.status_code
+                except httpx.HTTPError as e:
+                    log.warning("callback.failed", session=session_id, error=str(e))
+                if current is not None:
+                    current.set(**{"http.status_code": status})
+
+            if status is not None and status < 400:
+                self._ack(session_id, seq, "ack")
+                self.counters["sent"] += 1
+                log.info("callback.sent", session=session_id, status=status)
+                return
+            if status is not None and status < 500 and status not in (408, 429):
+                self._ack(session_id, seq, "drop")
+                self.counters["dropped"] += 1
+                log.warning("callback.rejected", session=session_id, status=status)
+                return
+
+            attempt += 1
+            if attempt > self.max_retries:
+                self._ack(session_id, seq, "drop")
+                self.counters["dropped"] += 1
+                log.error("callback.gave_up", session=session_id, attempts=attempt)
+                return
+            self.counters["retries"] += 1
+            cap = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+            await asyncio.sleep(random.uniform(0, cap))
+
+    def _ack(self, session_id: str, seq: int, op: str):
+        current = self._pending.get(session_id)
+        if current and current[0] == seq:
+            del self._pending[session_id]
+        self._write_outbox({"op": op, "seq": seq, "sessionId": session_id})
+        self._acks_since_compaction += 1
+        if self._acks_since_compaction >= 1000:
+            self._compact_outbox()
+
+    # --- outbox ---
+
+    def _write_outbox(self, record: dict):
+        if not self.outbox_path:
+            return
+        self._outbox_lines.append(json.dumps(record, ensure_ascii=False) + "\n")
+        self._outbox_wake.set()
+
+    def _compact_outbox(self):
+        self._outbox_compact = True
+        self._outbox_wake.set()
+
+    async def _outbox_writer(self):
+        """
+        Appends queued records in batches from a worker thread. A compaction
+        rewrites the file from a snapshot of the pending set, which already
+        reflects every record queued before it.
+        """
+        while True:
+            await self._outbox_wake.wait()
+            self._outbox_wake.clear()
+            closing = self._closing
+            lines, self._outbox_lines = self._outbox_lines, []
+            snapshot = None
+            if self._outbox_compact:
+                self._outbox_compact = False
+                self._acks_since_compaction = 0
+                snapshot = list(self._pending.items())
+            try:
+                await asyncio.to_thread(self._flush_outbox, lines, snapshot)
+            except OSError as e:
+                log.error("callback.outbox_write_failed", error=str(e))
+            if closing and snapshot is not None:
+                return
+
+    def _flush_outbox(self, lines: list, snapshot: list = None):
+        if snapshot is not None:
+            if self._outbox:
+                self._outbox.close()
+                self._outbox = None
+            self._write_snapshot(self.outbox_path, snapshot)
+            return
+        if not lines:
+            return
+        if self._outbox is None:
+            self._outbox = open(self.outbox_path, "a", encoding="utf-8")
+        self._outbox.writelines(lines)
+        self._outbox.flush()
+
+    @staticmethod
+    def _write_snapshot(path: str, snapshot: list):
+        tmp_path = f"{path}.{int(time.time() * 1000)}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for session_id, (seq, payload) in snapshot:
+                f.write(json.dumps({"op": "put", "seq": seq, "sessionId": session_id, "payload": payload},
+                                   ensure_ascii=False) + "\n")
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _slot_path(base: str, slot: int) -> str:
+        root, ext = os.path.splitext(base)
+        return base if slot == 0 else f"{root}.{slot}{ext}"
+
+    @staticmethod
+    def _try_lock(path: str):
+        """
+        Open handle on path + ".lock" holding an exclusive flock, or None if
+        another process (or dispatcher) holds it.
+        """
+        handle = open(path + ".lock", "a")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return None
+        return handle
+
+    def _claim_outbox(self) -> dict:
+        """
+        Takes the first free outbox slot and returns what is pending in it,
+        plus in any unclaimed slots, as {sessionId: (seq, payload)}. Adopted
+        entries are written into our slot before their old file is removed.
+        """
+        base = self.outbox_base
+        if fcntl is None:
+            return self._pending_in(base)
+        slot = 0
+        while True:
+            path = self._slot_path(base, slot)
+            self._outbox_lock = self._try_lock(path)
+            if self._outbox_lock is not None:
+                break
+            slot += 1
+        self.outbox_path = path
+        pending = self._pending_in(path)
+
+        root, ext = os.path.splitext(base)
+        slot_re = re.compile(re.escape(root) + r"\.\d+" + re.escape(ext) + "$")
+        others = [p for p in [base] + glob.glob(f"{glob.escape(root)}.*{glob.escape(ext)}")
+                  if p != path and (p == base or slot_re.match(p))]
+        for other in others:
+            lock = self._try_lock(other)
+            if lock is None:
+                continue
+            try:
+                adopted = self._pending_in(other)
+                if adopted:
+                    for session_id, entry in adopted.items():
+                        if entry[0] > pending.get(session_id, (0,))[0]:
+                            pending[session_id] = entry
+                    self._write_snapshot(path, list(pending.items()))
+                    log.info("callback.outbox_adopted", path=other, pending=len(adopted))
+                if os.path.exists(other):
+                    os.remove(other)
+            finally:
+                lock.close()
+        return pending
+
+    def _release_outbox(self):
+        if self._outbox:
+            self._outbox.close()
+            self._outbox = None
+        if self._outbox_lock:
+            self._outbox_lock.close()
+            self._outbox_lock = None
+
+    @staticmethod
+    def _pending_in(path: str) -> dict:
+        """
+        {sessionId: (seq, payload)} for the latest put per session in an
+        outbox file that hasn't been acked or dropped.
+        """
+        if not os.path.exists(path):
+            return {}
+        latest = {}
+        done = set()
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # torn last line after a crash
+                if record.get("op") == "put":
+                    latest[record["sessionId"]] = (record["seq"], record["payload"])
+                else:
+                    done.add(record.get("seq"))
+        return {session_id: entry for session_id, entry in latest.items() if entry[0] not in done}
+
+    def _recover(self, pending: dict):
+        """
+        Adds what the outbox still had pending; newer submissions win.
+        """
+        for session_id, (seq, payload) in pending.items():
+            self._seq = max(self._seq, seq)
+            if session_id not in self._pending:
+                self._pending[session_id] = (seq, payload)
+        if self._pending:
+            log.info("callback.outbox_recovered", pending=len(self._pending))
+        self._compact_outbox()
@@ -1,5 +1,7 @@
 import re
 from pydantic import BaseModel
+from core.keywords import KEYWORDS
+from core.voice_text import normalize_voice_text
 
 class ExtractedIntelligence(BaseModel):
     scammer_name: list[str] = []
@@ -11,21 +13,10 @@ class ExtractedIntelligence(BaseModel):
 class IntelligenceExtractor:
     def _normalize_voice_text(self, text: str) -> str:
         """
-        Converts spoken artifacts (number words, 'at') into digital formats.
+        Converts spoken artifacts (number words, 'at', 'dot') into digital formats.
+        See core/voice_text.py.
         """
-        text = text.lower()
-        
-        # Word-to-Digit mapping
-        num_map = {
-            'zero': '0', 'one': '1', 'two': '2', 'three': '3', 'four': '4',
-            'five': '5', 'six': '6', 'seven': '7', 'eight': '8', 'nine': '9'
-        }
-        for word, digit in num_map.items():
-            text = text.replace(word, digit)
-            
-        # Common voice replacements
-        text = text.replace(" at ", "@").replace(" dot ", ".")
-        return text
+        return normalize_voice_text(text)
 
     def extract(self, text: str) -> ExtractedIntelligence:
         intel = ExtractedIntelligence()
@@ -69,29 +60,28 @@ class IntelligenceExtractor:
 
         return intel
 
-    def detect_scam(self, text: str) -> dict:
+    def detect_scam(self, text: str, keyword_hits: dict = None) -> dict:
         """
         Analyzes message for scam intent using keywords and patterns.
+        keyword_hits is the KEYWORDS.scan(text) result, if the caller already has it.
         """
         score = 0
         reasons = []
-        text_lower = text.lower()
+        if keyword_hits is None:
+            keyword_hits = KEYWORDS.scan(text)
         
         # 1. Urgency & Threats
-        urgency_keywords = ['urgent', 'immediately', 'suspended', 'blocked', 'arrest', 'warrant', 'expire', 'lapse']
-        if any(w in text_lower for w in urgency_keywords):
+        if keyword_hits["urgency"]:
             score += 0.4
             reasons.append("Urgency/Threat detected")
             
         # 2. Financial Requests
-        money_keywords = ['pay', 'transfer', 'upi', 'bank', 'refund', 'gpay', 'paytm', 'credit card', 'kyc']
-        if any(w in text_lower for w in money_keywords):
+        if keyword_hits["financial"]:
             score += 0.3
             reasons.append("Financial request detected")
             
         # 3. Suspicious Links/Actions
-        action_keywords = ['click here', 'link', 'download', 'apk', 'form']
-        if any(w in text_lower for w in action_keywords):
+        if keyword_hits["action"]:
             score += 0.3
             reasons.append("Suspicious action requested")
             
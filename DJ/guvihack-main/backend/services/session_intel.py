@@ -0,0 +1,157 @@
+import hashlib
+import time
+
+from core.context import ContextBuilder, message_parts
+from core.entities import INTEL_KEYS, IntelSet
+from services.session_store import SessionStore, MemorySessionStore
+
+
+def message_digest(msg) -> str:
+    """
+    Stable content hash for a history message (dict or MessageObj).
+    """
+    sender, text = message_parts(msg)
+    raw = f"{sender}\x00{text}".encode("utf-8")
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+class SessionIntel:
+    """
+    Intel gathered so far for one session plus the history messages already seen.
+    Values are kept as canonical entities (core/entities.py) so merging is a
+    set union, and a number or UPI ID seen in another format is not re-added.
+    """
+    def __init__(self):
+        self.intel = IntelSet()
+        self.seen = set()
+        self.processed = 0       # length of the history prefix already handled
+        self.last_digest = None  # digest of history[processed - 1]
+        self.turns = 0
+        self.persona = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        # Rolling prompt context (see core/context.py)
+        self.summary = []
+        self.pinned = []
+        self.summarized = 0
+        self.intel_digests = set()  # history messages that carried intel
+
+    def to_dict(self) -> dict:
+        return {
+            "intel": self.snapshot(),
+            "seen": list(self.seen),
+            "processed": self.processed,
+            "last_digest": self.last_digest,
+            "turns": self.turns,
+            "persona": self.persona,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "summary": self.summary,
+            "pinned": self.pinned,
+            "summarized": self.summarized,
+            "intel_digests": list(self.intel_digests)
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SessionIntel":
+        state = cls()
+        state.merge(data.get("intel") or {})
+        state.seen = set(data.get("seen") or [])
+        state.processed = data.get("processed", 0)
+        state.last_digest = data.get("last_digest")
+        state.turns = data.get("turns", 0)
+        state.persona = data.get("persona")
+        state.created_at = data.get("created_at", state.created_at)
+        state.updated_at = data.get("updated_at", state.updated_at)
+        state.summary = data.get("summary") or []
+        state.pinned = data.get("pinned") or []
+        state.summarized = data.get("summarized", 0)
+        state.intel_digests = set(data.get("intel_digests") or [])
+        return state
+
+    def approx_size(self) -> int:
+        """
+        Rough bytes held by this session, for the memory store's cap.
+        """
+        values = self.intel.size()
+        context = sum(len(line) + 50 for line in self.summary + self.pinned)
+        return 600 + values + context + 100 * (len(self.seen) + len(self.intel_digests))
+
+    def merge(self, new_intel: dict):
+        self.intel.update(new_intel)
+
+    def snapshot(self) -> dict:
+        return self.intel.to_dict()
+
+
+class IntelAccumulator:
+    """
+    Per-sessionId accumulator for history intelligence.
+
+    The tester resends the full conversationHistory on every turn. Instead of
+    re-extracting all of it, we remember which messages were processed (by
+    position, verified with a content hash) and only extract from the new tail.
+    If the client rewrites or trims history we fall back to the content-hash set.
+    """
+    def __init__(self, extract_fn, store: SessionStore = None, context_builder: ContextBuilder = None):
+        self.extract_fn = extract_fn
+        self.store = store if store is not None else MemorySessionStore()
+        self.context_builder = context_builder or ContextBuilder()
+
+    def get(self, session_id: str) -> SessionIntel:
+        state = self.store.get(session_id)
+        if state is None:
+            state = SessionIntel()
+        return state
+
+    def update(self, session_id: str, history: list, persona: str = None) -> dict:
+        """
+        Extracts intel from history messages not seen before and returns the
+        accumulated intel for the session.
+        """
+        state = self.get(session_id)
+        self._absorb(state, history or [], persona)
+        self.store.put(session_id, state)
+        return state.snapshot()
+
+    def update_with_context(self, session_id: str, history: list, persona: str = None) -> tuple:
+        """
+        update() plus the token-budgeted prompt context for the same history
+        (one store round trip). Returns (accumulated intel, context dict).
+        """
+        state = self.get(session_id)
+        history = history or []
+        self._absorb(state, history, persona)
+        context = self.context_builder.build(history, state, message_digest)
+        self.store.put(session_id, state)
+        return state.snapshot(), context
+
+    def _absorb(self, state: SessionIntel, history: list, persona: str = None):
+        # Fast path: the previously processed prefix is unchanged
+        start = 0
+        if 0 < state.processed <= len(history) and \
+                message_digest(history[state.processed - 1]) == state.last_digest:
+            start = state.processed
+        elif state.summarized:
+            # History was rewritten; summary positions no longer line up
+            state.summary, state.pinned, state.summarized = [], [], 0
+
+        for msg in history[start:]:
+            digest = message_digest(msg)
+            if digest not in state.seen:
+                state.seen.add(digest)
+                found = self.extract_fn(message_parts(msg)[1])
+                state.merge(found)
+                if any(found.get(key) for key in INTEL_KEYS if key != "suspiciousKeywords"):
+                    state.intel_digests.add(digest)
+            state.last_digest = digest
+
+        state.processed = len(history)
+        if not history:
+            state.last_digest = None
+        state.turns = len(history) + 1
+        state.persona = persona or state.persona
+        state.updated_at = time.time()
+
+    def reset(self, session_id: str):
+        self.store.delete(session_id)
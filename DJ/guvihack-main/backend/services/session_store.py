@@ -0,0 +1,206 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+# Per-session state (accumulated intel, turn count, persona, timing) behind a
+# small get/put/delete interface.
+#
+#   memory  - bounded LRU in this process (default)
+#   sqlite  - one WAL-mode SQLite file shared by every uvicorn worker on the host
+#
+# Stores hold session objects; the SQLite store converts them with the
+# dumps/loads callables it is given (e.g. SessionIntel.to_dict/from_dict).
+# Stores with blocking = True do disk I/O; async callers run them in a worker
+# thread (asyncio.to_thread) rather than on the event loop.
+
+SESSION_STORE = os.getenv("SESSION_STORE", "memory")
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", "sessions.sqlite3")
+SESSION_TTL = float(os.getenv("SESSION_TTL", "21600"))               # seconds idle before expiry
+SESSION_MAX = int(os.getenv("SESSION_MAX", "10000"))                 # sessions kept
+SESSION_MAX_BYTES = int(os.getenv("SESSION_MAX_BYTES", str(64 * 1024 * 1024)))  # memory store only
+
+
+class SessionStore(ABC):
+    blocking = False
+
+    @abstractmethod
+    def get(self, session_id: str):
+        ...
+
+    @abstractmethod
+    def put(self, session_id: str, state):
+        ...
+
+    @abstractmethod
+    def delete(self, session_id: str):
+        ...
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    def close(self):
+        pass
+
+
+class MemorySessionStore(SessionStore):
+    """
+    LRU with idle TTL, a session count cap and an approximate memory cap.
+    Sizes come from state.approx_size() when the object provides it.
+    """
+    def __init__(self, max_sessions: int = SESSION_MAX, ttl: float = SESSION_TTL,
+                 max_bytes: int = SESSION_MAX_BYTES):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()  # session_id -> (last_used, size, state)
+        self._bytes = 0
+        self.evictions = 0
+
+    def get(self, session_id: str):
+        item = self._items.get(session_id)
+        if item is None:
+            return None
+        now = time.time()
+        if self.ttl and now - item[0] > self.ttl:
+            self.delete(session_id)
+            return None
+        self._items[session_id] = (now, item[1], item[2])
+        self._items.move_to_end(session_id)
+        return item[2]
+
+    def put(self, session_id: str, state):
+        size = state.approx_size() if hasattr(state, "approx_size") else 0
+        old = self._items.pop(session_id, None)
+        if old:
+            self._bytes -= old[1]
+        self._items[session_id] = (time.time(), size, state)
+        self._bytes += size
+        self._evict()
+
+    def delete(self, session_id: str):
+        item = self._items.pop(session_id, None)
+        if item:
+            self._bytes -= item[1]
+
+    def _evict(self):
+        now = time.time()
+        while self._items:
+            oldest_id, (last_used, size, _) = next(iter(self._items.items()))
+            expired = self.ttl and now - last_used > self.ttl
+            if not expired and len(self._items) <= self.max_sessions and self._bytes <= self.max_bytes:
+                break
+            if oldest_id == next(reversed(self._items)) and not expired:
+                break  # never evict the session we just wrote
+            self._items.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def stats(self) -> dict:
+        return {"backend": "memory", "sessions": len(self._items), "approx_bytes": self._bytes,
+                "evictions": self.evictions}
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Sessions as JSON rows in a WAL-mode SQLite file. WAL lets several worker
+    processes read while one writes; busy_timeout covers write contention.
+    """
+    blocking = True
+
+    def __init__(self, path: str = SESSION_DB_PATH, dumps=None, loads=None,
+                 max_sessions: int = SESSION_MAX, ttl: float = SESSION_TTL):
+        self.path = path
+        self.dumps = dumps or (lambda state: state)
+        self.loads = loads or (lambda data: data)
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._writes = 0
+        db = self._db()
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "id TEXT PRIMARY KEY, state TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at)")
+
+    def _db(self) -> sqlite3.Connection:
+        # One connection per thread: callers reach the store from asyncio.to_thread workers
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("PRAGMA busy_timeout=5000")
+            self._local.db = db
+            with self._lock:
+                self._connections.append(db)
+        return db
+
+    def get(self, session_id: str):
+        row = self._db().execute(
+            "SELECT state, updated_at FROM sessions WHERE id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        if self.ttl and time.time() - row[1] > self.ttl:
+            self.delete(session_id)
+            return None
+        return self.loads(json.loads(row[0]))
+
+    def put(self, session_id: str, state):
+        self._db().execute(
+            "INSERT INTO sessions (id, state, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET state = excluded.state, updated_at = excluded.updated_at",
+            (session_id, json.dumps(self.dumps(state), ensure_ascii=False), time.time())
+        )
+        self._writes += 1
+        if self._writes % 500 == 0:
+            self.purge()
+
+    def delete(self, session_id: str):
+        self._db().execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def purge(self):
+        """
+        Drops expired sessions, then the least recently updated beyond max_sessions.
+        """
+        db = self._db()
+        if self.ttl:
+            db.execute("DELETE FROM sessions WHERE updated_at < ?", (time.time() - self.ttl,))
+        db.execute(
+            "DELETE FROM sessions WHERE id IN ("
+            "SELECT id FROM sessions ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_sessions,)
+        )
+
+    def __len__(self) -> int:
+        return self._db().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def stats(self) -> dict:
+        return {"backend": "sqlite", "path": self.path, "sessions": len(self)}
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for db in connections:
+            db.close()
+        self._local = threading.local()
+
+
+def create_session_store(dumps=None, loads=None) -> SessionStore:
+    """
+    Store selected by SESSION_STORE ("memory" or "sqlite").
+    """
+    if SESSION_STORE == "sqlite":
+        return SQLiteSessionStore(SESSION_DB_PATH, dumps=dumps, loads=loads)
+    return MemorySessionStore()
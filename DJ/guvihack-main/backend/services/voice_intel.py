@@ -0,0 +1,137 @@
+import os
+import time
+from collections import OrderedDict
+
+from core.entities import IDENTIFIER_KEYS, IntelSet
+from core.extraction import extract_intel
+from core.keywords import KEYWORDS
+from core.voice_text import VoiceNormalizer
+
+# Per-call intel for live voice calls.
+#
+# The voice worker posts each finalized scammer transcript segment as it
+# arrives (POST /voice/transcript). Segments go through one streaming
+# VoiceNormalizer per call, so a number or UPI ID dictated across two
+# utterances ("nine eight seven ..." / "... six five at paytm") still comes out
+# as one token. Extraction runs only on normalized text up to the last
+# whitespace; the rest is carried to the next segment, since a digit run or
+# handle can still grow there. Identifiers come from the normalized stream,
+# names/places/keywords from the raw segment (they need the original case).
+#
+#   VOICE_CALL_TTL=1800      seconds before an idle call's state is dropped
+#   VOICE_MAX_CALLS=1000     calls kept in memory at once (oldest evicted)
+
+VOICE_CALL_TTL = float(os.getenv("VOICE_CALL_TTL", "1800"))
+VOICE_MAX_CALLS = int(os.getenv("VOICE_MAX_CALLS", "1000"))
+
+_TEXT_KEYS = ("scammerName", "jobTitle", "companyNames", "location", "suspiciousKeywords")
+_DETECTION_GROUPS = ("urgency", "financial", "action")
+
+
+class VoiceCall:
+    __slots__ = ("normalizer", "carry", "intel", "segments", "groups", "has_url", "updated_at")
+
+    def __init__(self):
+        self.normalizer = VoiceNormalizer()
+        self.carry = ""          # normalized text after the last whitespace
+        self.intel = IntelSet()
+        self.segments = 0
+        self.groups = set()      # keyword groups heard anywhere in the call
+        self.has_url = False
+        self.updated_at = time.time()
+
+    def feed(self, text: str):
+        self.segments += 1
+        self.updated_at = time.time()
+        hits = KEYWORDS.scan(text)
+        self.groups.update(group for group in _DETECTION_GROUPS if hits[group])
+        raw = extract_intel(text, hits)
+        self.intel.update({key: raw[key] for key in _TEXT_KEYS})
+        self._absorb(self.normalizer.feed(text + " "), final=False)
+
+    def flush(self):
+        self._absorb(self.normalizer.flush(), final=True)
+
+    def _absorb(self, normalized: str, final: bool):
+        buffer = self.carry + normalized
+        if final:
+            ready, self.carry = buffer, ""
+        else:
+            cut = max(buffer.rfind(" "), buffer.rfind("\n"), buffer.rfind("\t")) + 1
+            ready, self.carry = buffer[:cut], buffer[cut:]
+        if not ready.strip():
+            return
+        if "http" in ready:
+            self.has_url = True
+        found = extract_intel(ready)
+        self.intel.update({key: found[key] for key in IDENTIFIER_KEYS})
+
+    def scam_analysis(self) -> dict:
+        """
+        Same scoring as IntelligenceExtractor.detect_scam, over the whole call.
+        """
+        score = 0
+        reasons = []
+        if "urgency" in self.groups:
+            score += 0.4
+            reasons.append("Urgency/Threat detected")
+        if "financial" in self.groups:
+            score += 0.3
+            reasons.append("Financial request detected")
+        if "action" in self.groups:
+            score += 0.3
+            reasons.append("Suspicious action requested")
+        if self.has_url:
+            score += 0.2
+            reasons.append("Contains URL")
+        return {"is_scam": score >= 0.4, "confidence": min(score, 1.0), "reasons": reasons}
+
+    def has_identifiers(self) -> bool:
+        return any(self.intel.buckets[key] for key in IDENTIFIER_KEYS)
+
+
+class VoiceCallTracker:
+    """
+    Live voice calls by sessionId, idle ones expiring after VOICE_CALL_TTL.
+    """
+    def __init__(self, ttl: float = VOICE_CALL_TTL, max_calls: int = VOICE_MAX_CALLS):
+        self.ttl = ttl
+        self.max_calls = max_calls
+        self.calls = OrderedDict()
+
+    def get(self, session_id: str) -> VoiceCall:
+        self._expire()
+        call = self.calls.get(session_id)
+        if call is None:
+            call = self.calls[session_id] = VoiceCall()
+            while len(self.calls) > self.max_calls:
+                self.calls.popitem(last=False)
+        else:
+            self.calls.move_to_end(session_id)
+        return call
+
+    def feed(self, session_id: str, segments: list) -> VoiceCall:
+        call = self.get(session_id)
+        for text in segments:
+            if text and text.strip():
+                call.feed(text)
+        return call
+
+    def finish(self, session_id: str) -> VoiceCall:
+        """
+        Flushes and forgets the call; returns its final state.
+        """
+        call = self.calls.pop(session_id, None) or VoiceCall()
+        call.flush()
+        return call
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        while self.calls:
+            call = next(iter(self.calls.values()))
+            if call.updated_at >= cutoff:
+                break
+            self.calls.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self.calls)
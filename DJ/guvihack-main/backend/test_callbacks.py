@@ -0,0 +1,151 @@
+# Offline check of the callback dispatcher against a local stand-in for the
+# GUVI endpoint (no network needed).
+#
+#   python test_callbacks.py
+
+import asyncio
+import json
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from services.callbacks import CallbackDispatcher
+
+
+class StandIn:
+    """
+    Minimal HTTP server that records callback bodies. The first `fail_first`
+    requests get a 503 to exercise the retry path.
+    """
+    def __init__(self, fail_first: int = 0):
+        self.received = []
+        self.fail_first = fail_first
+        self.connections = set()
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def do_POST(self):
+                stand_in.connections.add(self.client_address)
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if stand_in.fail_first > 0:
+                    stand_in.fail_first -= 1
+                    status = 503
+                else:
+                    stand_in.received.append(json.loads(body))
+                    status = 200
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/callback"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+
+
+def payload(session_id: str, turn: int) -> dict:
+    return {
+        "sessionId": session_id,
+        "scamDetected": True,
+        "totalMessagesExchanged": turn,
+        "extractedIntelligence": {"upiIds": [f"scammer{turn}@ybl"]},
+        "agentNotes": f"turn {turn}"
+    }
+
+
+async def _coalesce_and_retry(outbox: str):
+    server = StandIn(fail_first=2)
+    dispatcher = CallbackDispatcher(url=server.url, outbox_path=outbox, workers=2, base_delay=0.01)
+    await dispatcher.start()
+    for turn in range(1, 6):
+        dispatcher.submit(payload("session-a", turn))
+    dispatcher.submit(payload("session-b", 1))
+    await dispatcher.stop(drain_timeout=5)
+    server.close()
+    return server, dispatcher
+
+
+async def _outbox_survives_restart(outbox: str):
+    # Nothing is listening on this port, so delivery fails and stays pending
+    dead = CallbackDispatcher(url="http://127.0.0.1:9/callback", outbox_path=outbox,
+                              max_retries=50, base_delay=0.05, timeout=0.2)
+    await dead.start()
+    dead.submit(payload("session-c", 7))
+    await dead.stop(drain_timeout=0.2)
+
+    server = StandIn()
+    revived = CallbackDispatcher(url=server.url, outbox_path=outbox, base_delay=0.01)
+    await revived.start()
+    await revived.stop(drain_timeout=5)
+    server.close()
+    return server, revived
+
+
+async def _workers_share_outbox(outbox: str):
+    # Two workers with the same CALLBACK_OUTBOX, neither able to deliver
+    dead = [CallbackDispatcher(url="http://127.0.0.1:9/callback", outbox_path=outbox,
+                               max_retries=50, base_delay=0.05, timeout=0.2) for _ in range(2)]
+    for i, dispatcher in enumerate(dead):
+        await dispatcher.start()
+        dispatcher.submit(payload(f"session-{i}", 1))
+    await asyncio.sleep(0.05)
+    dead[0]._compact_outbox()  # must not drop the other worker's record
+    slots = {dispatcher.outbox_path for dispatcher in dead}
+    for dispatcher in dead:
+        await dispatcher.stop(drain_timeout=0.1)
+
+    # After a restart (here with one worker) each callback goes out once
+    server = StandIn()
+    revived = CallbackDispatcher(url=server.url, outbox_path=outbox, base_delay=0.01)
+    await revived.start()
+    await revived.stop(drain_timeout=5)
+    server.close()
+    return server, slots
+
+
+def test_coalesces_per_session_and_retries():
+    with tempfile.TemporaryDirectory() as tmp:
+        server, dispatcher = asyncio.run(_coalesce_and_retry(os.path.join(tmp, "outbox.jsonl")))
+    sessions = [p["sessionId"] for p in server.received]
+    latest_a = [p for p in server.received if p["sessionId"] == "session-a"][-1]
+    print(f"Received {len(server.received)} callbacks over {len(server.connections)} connection(s): {sessions}")
+    print(f"Counters: {dispatcher.counters}")
+    assert latest_a["totalMessagesExchanged"] == 5
+    assert sessions.count("session-a") < 5
+    assert "session-b" in sessions
+    assert dispatcher.counters["retries"] >= 2
+    assert dispatcher.pending_count() == 0
+
+
+def test_outbox_survives_restart():
+    with tempfile.TemporaryDirectory() as tmp:
+        server, revived = asyncio.run(_outbox_survives_restart(os.path.join(tmp, "outbox.jsonl")))
+    print(f"After restart: {[p['sessionId'] for p in server.received]}")
+    assert [p["sessionId"] for p in server.received] == ["session-c"]
+    assert revived.pending_count() == 0
+
+
+def test_workers_keep_separate_outboxes():
+    with tempfile.TemporaryDirectory() as tmp:
+        server, slots = asyncio.run(_workers_share_outbox(os.path.join(tmp, "outbox.jsonl")))
+        left = sorted(f for f in os.listdir(tmp) if not f.endswith(".lock"))
+    print(f"Slots: {sorted(os.path.basename(s) for s in slots)}, after restart: "
+          f"{sorted(p['sessionId'] for p in server.received)}")
+    assert len(slots) == 2
+    assert sorted(p["sessionId"] for p in server.received) == ["session-0", "session-1"]
+    assert left == ["outbox.jsonl"]
+
+
+if __name__ == "__main__":
+    test_coalesces_per_session_and_retries()
+    test_outbox_survives_restart()
+    test_workers_keep_separate_outboxes()
+    print("✅ Callback dispatcher OK")
@@ -0,0 +1,111 @@
+# Offline check of intel canonicalisation and merging in core/entities.py.
+#
+#   python test_entities.py
+
+from core.entities import IntelSet, canonical_values, merge_intel, normalize_phone, normalize_upi, normalize_url
+
+# (raw, E.164 or None)
+PHONES = [
+    ("9876543210", "+919876543210"),
+    ("+91 98765-43210", "+919876543210"),
+    ("098765 43210", "+919876543210"),
+    ("919876543210", "+919876543210"),
+    ("(+91) 98765 43210.", "+919876543210"),
+    ("1800 123 4567", "18001234567"),
+    ("+1 415 555 0132", "+14155550132"),
+    ("5876543210", "5876543210"),
+    ("12345", None),
+    ("1234567890123456", None),
+    ("call me", None),
+]
+
+# (raw, canonical or None)
+UPIS = [
+    ("Scammer@PaytM", "scammer@paytm"),
+    ("  rahul.k92@OKAXIS. ", "rahul.k92@okaxis"),
+    ("refund.desk@ybl,", "refund.desk@ybl"),
+    ("@paytm", None),
+    ("scammer@", None),
+    ("no-at-sign", None),
+]
+
+# (raw, canonical or None)
+URLS = [
+    ("HTTPS://Secure-KYC.Example.COM/Verify?ID=AbC", "https://secure-kyc.example.com/Verify?ID=AbC"),
+    ("http://bit.ly", "http://bit.ly/"),
+    ("http://example.com:80/a", "http://example.com/a"),
+    ("https://example.com:443", "https://example.com/"),
+    ("https://example.com:8443/x", "https://example.com:8443/x"),
+    ("https://example.com./pay).", "https://example.com/pay"),
+    ("example.com/pay", None),
+    ("http://[::1", None),
+]
+
+
+def _check(name, fn, cases):
+    failures = [(raw, fn(raw), want) for raw, want in cases if fn(raw) != want]
+    for raw, got, want in failures:
+        print(f"  {name}({raw!r}): got {got!r}, want {want!r}")
+    assert not failures
+
+
+def test_normalizes_phones():
+    _check("normalize_phone", normalize_phone, PHONES)
+
+
+def test_normalizes_upi_ids():
+    _check("normalize_upi", normalize_upi, UPIS)
+
+
+def test_canonicalizes_urls():
+    _check("normalize_url", normalize_url, URLS)
+
+
+def test_canonical_values_dedupe_formats():
+    assert canonical_values("phoneNumbers", ["98765 43210", "+91-9876543210", 9876543210, None]) == ["+919876543210"]
+    assert canonical_values("bankAccounts", ["4532-7788-1122-9034", "4532778811229034", "12"]) == ["4532778811229034"]
+    assert canonical_values("companyNames", ["SBI  Card", "sbi card", "HDFC"]) == ["SBI Card", "HDFC"]
+
+
+def test_merge_keeps_first_source_and_order():
+    llm = {
+        "scammerName": ["Rahul  Sharma"],
+        "upiIds": ["Rahul@Paytm"],
+        "phoneNumbers": "+91 98765 43210",
+        "companyNames": ["State Bank"],
+        "suspiciousKeywords": None,
+    }
+    regex = {
+        "scammerName": ["rahul sharma", "Amit"],
+        "upiIds": ["rahul@paytm", "help@ybl"],
+        "phoneNumbers": ["9876543210", "8765432109"],
+        "companyNames": ["STATE BANK"],
+        "suspiciousKeywords": ["urgent"],
+    }
+    merged = merge_intel(llm, regex)
+    # Earlier sources win for free text; identifiers are always canonical
+    assert merged["scammerName"] == ["Rahul Sharma", "Amit"]
+    assert merged["companyNames"] == ["State Bank"]
+    assert merged["upiIds"] == ["rahul@paytm", "help@ybl"]
+    assert merged["phoneNumbers"] == ["+919876543210", "+918765432109"]
+    assert merged["suspiciousKeywords"] == ["urgent"]
+    assert merge_intel(regex, llm)["scammerName"] == ["rahul sharma", "Amit"]
+    assert merge_intel(llm, regex) == merge_intel(merge_intel(llm), regex)
+
+
+def test_intel_set_ignores_bad_input():
+    intel = IntelSet({"upiIds": ["a@ybl"]}, None, "not a dict", {"upiIds": {"a": 1}, "unknown": ["x"]})
+    assert not intel.add("upiIds", "A@YBL")
+    assert intel.add("upiIds", "b@ybl")
+    assert not intel.add("unknown", "x")
+    assert intel.values("upiIds") == ["a@ybl", "b@ybl"]
+
+
+if __name__ == "__main__":
+    test_normalizes_phones()
+    test_normalizes_upi_ids()
+    test_canonicalizes_urls()
+    test_canonical_values_dedupe_formats()
+    test_merge_keeps_first_source_and_order()
+    test_intel_set_ignores_bad_input()
+    print(f"✅ Intel entities OK ({len(PHONES) + len(UPIS) + len(URLS)} normalisation cases)")
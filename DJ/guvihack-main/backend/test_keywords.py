@@ -0,0 +1,48 @@
+# Offline check of the keyword automaton in core/keywords.py against the
+# plain `kw in text.lower()` scan it replaced.
+#
+#   python test_keywords.py
+
+import random
+
+from core.keywords import KEYWORD_GROUPS, KEYWORDS, KeywordAutomaton
+
+
+def naive_scan(groups: dict, text: str) -> dict:
+    lowered = text.lower()
+    return {group: [w for w in words if w.lower() in lowered] for group, words in groups.items()}
+
+
+def test_overlapping_matches():
+    automaton = KeywordAutomaton({"a": ["he", "she", "hers", "his"], "b": ["her", "e"]})
+    assert automaton.scan("USHERS") == {"a": ["he", "she", "hers"], "b": ["her", "e"]}
+    assert automaton.scan("ahishe") == {"a": ["he", "she", "his"], "b": ["e"]}
+    assert automaton.scan("xyz") == {"a": [], "b": []}
+
+
+def test_keyword_in_several_groups():
+    hits = KEYWORDS.scan("URGENT: your KYC expired, verify now at the link or account gets blocked")
+    assert hits["urgency"] == ["urgent", "blocked", "expire"]
+    assert hits["financial"] == ["kyc"]
+    assert hits["action"] == ["link"]
+    # "verify" is found inside "verify now"; keywords keep their written case
+    assert hits["suspicious"] == ["urgent", "verify", "blocked", "account", "expire", "verify now", "KYC"]
+
+
+def test_matches_naive_scan():
+    alphabet = "abcdeiklnoprstuy "
+    words = [w for group in KEYWORD_GROUPS.values() for w in group]
+    rng = random.Random(0)
+    for _ in range(2000):
+        parts = [rng.choice(words) if rng.random() < 0.3 else
+                 "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 6)))
+                 for _ in range(rng.randint(1, 8))]
+        text = "".join(p.upper() if rng.random() < 0.2 else p for p in parts)
+        assert KEYWORDS.scan(text) == naive_scan(KEYWORD_GROUPS, text), text
+
+
+if __name__ == "__main__":
+    test_overlapping_matches()
+    test_keyword_in_several_groups()
+    test_matches_naive_scan()
+    print("✅ Keyword automaton OK")
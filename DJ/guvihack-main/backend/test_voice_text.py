@@ -0,0 +1,77 @@
+# Offline check of the spoken-number normalizer in core/voice_text.py.
+#
+#   python test_voice_text.py
+
+import random
+
+from core.voice_text import VoiceNormalizer, normalize_voice_text
+
+# (transcript, normalized)
+CASES = [
+    # English digit words, dictated with spaces
+    ("my number is nine eight seven six five four three two one zero", "my number is 9876543210"),
+    ("call one eight zero zero", "call 1800"),
+    ("ninety eight seventy six fifty four thirty two ten", "9876543210"),
+    ("twenty one", "21"),
+    # Words that only look like numbers stay put
+    ("someone often calls you", "someone often calls you"),
+    ("no one called, the one at the end", "no one called, the one at the end"),
+    ("one more thing", "one more thing"),
+    # Repeats
+    ("send to double nine eight eight seven seven", "send to 998877"),
+    ("triple zero one, double check it", "0001, double check it"),
+    ("double one", "11"),
+    # Hinglish, with the weak words read as digits only inside a number
+    ("mera number nau aath saat chhe paanch chaar teen do ek shunya hai", "mera number 9876543210 hai"),
+    ("do you understand", "do you understand"),
+    ("teen log aaye", "teen log aaye"),
+    ("sixty sixteen six aath aat", "6016688"),
+    # Devanagari words and digits
+    ("मेरा नंबर नौ आठ सात है ९८७६५", "मेरा नंबर 987 है 98765"),
+    # Symbols
+    ("rahul underscore 92 at the rate okaxis", "rahul_92@okaxis"),
+    ("email me at rahul dot k at gmail dot com", "email me at rahul.k@gmail.com"),
+    ("plus nine one nine eight seven six five four three two one zero", "+919876543210"),
+    ("call me at home at 5 pm", "call me at home at 5 pm"),
+    ("at the rate of five percent", "at the rate of 5 percent"),
+    ("it's on the dot", "it's on the dot"),
+    # Whitespace is kept
+    ("Hello   World\n nine\tnine  ", "hello   world\n 99  "),
+    ("", ""),
+]
+
+
+def streamed(text: str, seed: int) -> str:
+    """
+    The normalizer fed text in random pieces, like STT partials.
+    """
+    rng = random.Random(seed)
+    normalizer = VoiceNormalizer()
+    out = []
+    i = 0
+    while i < len(text):
+        size = rng.randint(1, 9)
+        out.append(normalizer.feed(text[i:i + size]))
+        i += size
+    return "".join(out) + normalizer.flush()
+
+
+def test_normalizes_cases():
+    failures = [(text, normalize_voice_text(text), want) for text, want in CASES
+                if normalize_voice_text(text) != want]
+    for text, got, want in failures:
+        print(f"  {text!r}: got {got!r}, want {want!r}")
+    assert not failures
+
+
+def test_streaming_matches_one_shot():
+    for text, want in CASES:
+        for seed in range(20):
+            got = streamed(text, seed)
+            assert got == want, (text, seed, got, want)
+
+
+if __name__ == "__main__":
+    test_normalizes_cases()
+    test_streaming_matches_one_shot()
+    print(f"✅ Voice normalizer OK ({len(CASES)} cases)")
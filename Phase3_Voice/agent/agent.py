@@ -2,11 +2,18 @@ import logging
 import os
 import sys
 import asyncio
+import time
 from dotenv import load_dotenv
-from livekit.agents import AutoSubscribe, JobContext, WorkerOptions, cli, llm
+from livekit.agents import AutoSubscribe, JobContext, JobProcess, WorkerOptions, cli, llm
 from livekit.agents.voice import Agent, AgentSession
 from livekit.plugins import deepgram, groq, silero, cartesia
 from personas import PERSONAS, get_persona
+from intel_stream import TranscriptIntelStream
+from backend_http import close_backend_session
+from worker_load import WORKER_LOAD_THRESHOLD, WorkerLoad
+from speculation import SpeculationStats, SpeculativeAgent, turn_handling
+from greetings import GreetingCache, audio_frames
+from vigilante_llm import VigilanteLLM
 
 load_dotenv()
 
@@ -18,6 +25,125 @@ logger = logging.getLogger("voice-agent")
 if sys.platform == 'win32':
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
+# Voice & Greeting Configuration
+# We use Deepgram Aura for stability and speed
+# Mrs. Sharma: aura-athena-en (UK accent - sounds more formal/Indian-English)
+# Ramesh: aura-orion-en (Masculine, mature male)
+# Colonel: aura-zeus-en (Extremely masculine, authoritative)
+PERSONA_CONFIG = {
+    "grandma": {
+        "voice": "aura-athena-en", 
+        "greeting": "Hello? Hello? I can't see who's calling... my eyes are not what they used to be."
+    },
+    "ramesh": {
+        "voice": "aura-orion-en", 
+        "greeting": "Haan, Ramesh here. Tell me quickly, I have a line of customers at the shop."
+    },
+    "priya": {
+        "voice": "aura-luna-en", 
+        "greeting": "Hey! Who is this? Long time! Wait, do I know this number?"
+    },
+    "colonel": {
+        "voice": "aura-zeus-en", 
+        "greeting": "Bakshi here. State your name. I'm in the middle of a Veteran's meeting."
+    }
+}
+
+LLM_MODEL = "llama-3.3-70b-versatile"
+
+# Where the agent's replies come from:
+#   vigilante  the backend's honeypot brain, streamed from /webhook/stream
+#              (VigilanteLLM), so the call gets the same persona strategy and
+#              intel tracking as the text webhook
+#   groq       Groq directly with the persona prompt (LLM_MODEL)
+VOICE_LLM = os.getenv("VOICE_LLM", "vigilante")
+
+# How a persona change mid-call is applied:
+#   light  keep the running STT/VAD/LLM, swap only instructions and TTS voice
+#   full   build a new Agent and hand it to the session (the old behaviour)
+PERSONA_SWAP_MODE = os.getenv("PERSONA_SWAP_MODE", "light")
+
+
+def prewarm(proc: JobProcess):
+    """
+    Runs once per worker process, before it is handed a job: loads the Silero
+    VAD model, builds the Groq LLM client (VOICE_LLM=groq) and renders the
+    persona greetings, so call setup doesn't pay for them. The default process
+    executor runs one job per process, so these never cross event loops.
+    """
+    proc.userdata["vad"] = silero.VAD.load()
+    if VOICE_LLM == "groq":
+        proc.userdata["llm"] = groq.LLM(model=LLM_MODEL, temperature=0.5)
+    greetings = GreetingCache()
+    greetings.prewarm([(cfg["voice"], cfg["greeting"]) for cfg in PERSONA_CONFIG.values()])
+    proc.userdata["greetings"] = greetings
+    logger.info(f"Prewarmed worker process {proc.pid}")
+
+
+class VoiceClients:
+    """
+    Pipeline components for one job. VAD (and a Groq LLM) come from
+    prewarm(); the backend LLM bridge is per call, keyed by session_id. The
+    Deepgram STT/TTS clients bind to the job's HTTP session on first use, so
+    they are built per job (cheap) and kept for every persona swap. The TTS
+    pool holds one client per PERSONA_CONFIG voice, so a swap never builds one.
+    Every persona's agent reports turn ends to the call's SpeculationStats.
+    """
+    def __init__(self, proc: JobProcess, session_id: str = None):
+        if "vad" not in proc.userdata:
+            prewarm(proc)
+        self.vad = proc.userdata["vad"]
+        if VOICE_LLM == "groq":
+            self.llm = proc.userdata["llm"]
+        else:
+            self.llm = VigilanteLLM(session_id=session_id)
+        self.greetings = proc.userdata["greetings"]
+        self.speculation = SpeculationStats()
+        self.stt = deepgram.STT()
+        self._tts = {}
+        for cfg in PERSONA_CONFIG.values():
+            self.tts(cfg["voice"])
+
+    def tts(self, voice: str) -> deepgram.TTS:
+        tts = self._tts.get(voice)
+        if tts is None:
+            tts = self._tts[voice] = deepgram.TTS(model=voice)
+        return tts
+
+    def agent(self, key: str) -> Agent:
+        cfg = PERSONA_CONFIG.get(key, PERSONA_CONFIG["grandma"])
+        return SpeculativeAgent(
+            speculation=self.speculation,
+            stt=self.stt,
+            llm=self.llm,
+            tts=self.tts(cfg["voice"]),
+            vad=self.vad,
+            instructions=get_persona(key),
+        )
+
+    def greet(self, session: AgentSession, key: str, allow_interruptions: bool):
+        """
+        Says the persona's greeting, from pre-rendered audio when it is cached
+        (no TTS request), else through the live TTS.
+        """
+        cfg = PERSONA_CONFIG.get(key, PERSONA_CONFIG["grandma"])
+        frame = self.greetings.get(cfg["voice"], cfg["greeting"])
+        if frame is None:
+            return session.say(cfg["greeting"], allow_interruptions=allow_interruptions)
+        return session.say(cfg["greeting"], audio=audio_frames(frame),
+                           allow_interruptions=allow_interruptions)
+
+    async def swap(self, agent: Agent, key: str):
+        """
+        Re-voices the running agent in place: new instructions, pooled TTS
+        voice, empty chat history. STT, VAD and LLM keep running untouched.
+        """
+        cfg = PERSONA_CONFIG.get(key, PERSONA_CONFIG["grandma"])
+        agent.update_options(tts=self.tts(cfg["voice"]))
+        await agent.update_instructions(get_persona(key))
+        await agent.update_chat_ctx(llm.ChatContext())
+
+
 async def entrypoint(ctx: JobContext):
     # Connect to the room
     logger.info(f"Connecting to room {ctx.room.name}")
@@ -44,41 +170,14 @@ async def entrypoint(ctx: JobContext):
     logger.info(f"PERSONA DETECTED: {persona_key}")
     logger.info(f"Target Identity: {participant.identity}")
 
-    # Voice & Greeting Configuration
-    # We use Deepgram Aura for stability and speed
-    # Mrs. Sharma: aura-athena-en (UK accent - sounds more formal/Indian-English)
-    # Ramesh: aura-orion-en (Masculine, mature male)
-    # Colonel: aura-zeus-en (Extremely masculine, authoritative)
-    persona_config = {
-        "grandma": {
-            "voice": "aura-athena-en", 
-            "greeting": "Hello? Hello? I can't see who's calling... my eyes are not what they used to be."
-        },
-        "ramesh": {
-            "voice": "aura-orion-en", 
-            "greeting": "Haan, Ramesh here. Tell me quickly, I have a line of customers at the shop."
-        },
-        "priya": {
-            "voice": "aura-luna-en", 
-            "greeting": "Hey! Who is this? Long time! Wait, do I know this number?"
-        },
-        "colonel": {
-            "voice": "aura-zeus-en", 
-            "greeting": "Bakshi here. State your name. I'm in the middle of a Veteran's meeting."
-        }
-    }
+    # Backend session for this call: replies (/webhook/stream) and transcript
+    # intel (/voice/transcript) are both keyed by it
+    session_id = f"voice-{ctx.room.name}"
 
-    def create_voice_agent(key):
-        cfg = persona_config.get(key, persona_config["grandma"])
-        instructions = get_persona(key)
-        
-        return Agent(
-            stt=deepgram.STT(),
-            llm=groq.LLM(model="llama-3.3-70b-versatile", temperature=0.5), 
-            tts=deepgram.TTS(model=cfg["voice"]),
-            vad=silero.VAD.load(),
-            instructions=instructions,
-        )
+    # One STT and one TTS per voice for this job, on top of the VAD loaded by
+    # prewarm() and the call's LLM; persona swaps reuse them
+    clients = VoiceClients(ctx.proc, session_id)
+    create_voice_agent = clients.agent
 
     # Initialize first agent
     agent = create_voice_agent(persona_key)
@@ -89,23 +188,62 @@ async def entrypoint(ctx: JobContext):
         llm=agent.llm,
         tts=agent.tts,
         vad=agent.vad,
+        # Draft replies from finalized STT segments before end of turn
+        turn_handling=turn_handling(),
     )
+    speculation = clients.speculation
+    speculation.attach(session)
+
+    # Intel extraction: every finalized scammer utterance goes to the backend,
+    # which keeps the call's intel and sends the GUVI callback at hang-up
+    intel_stream = TranscriptIntelStream(session_id)
+
+    @session.on("user_input_transcribed")
+    def on_user_transcribed(ev):
+        if ev.is_final:
+            intel_stream.push(ev.transcript)
+
+    call_finished = False
+
+    async def finish_call():
+        nonlocal call_finished
+        if call_finished:
+            return
+        call_finished = True
+        stats = speculation.to_dict()
+        logger.info(f"Speculative replies: {stats}")
+        await intel_stream.close(stats={"speculation": stats})
+        # Shutdown callbacks run concurrently, so the pooled session is closed
+        # here, only once the final transcript post is done with it
+        await close_backend_session()
+
+    ctx.add_shutdown_callback(finish_call)
+
+    # Set once the caller subscribes to our audio track, i.e. can hear us
+    track_subscribed = asyncio.Event()
+
+    @ctx.room.on("local_track_subscribed")
+    def on_local_track_subscribed(_):
+        track_subscribed.set()
 
     # Start the agent session in the room
     logger.info("Starting AgentSession...")
     await session.start(agent, room=ctx.room)
     logger.info("Agent session started.")
 
-    # Initial greeting
-    cfg = persona_config.get(persona_key, persona_config["grandma"])
-    # Increase delay to ensure frontend is fully subscribed to the track
-    await asyncio.sleep(2.0)
+    # Initial greeting, as soon as the frontend is subscribed to the track
+    # (bounded by the 2s the agent used to sleep here)
+    cfg = PERSONA_CONFIG.get(persona_key, PERSONA_CONFIG["grandma"])
+    try:
+        await asyncio.wait_for(track_subscribed.wait(), 2.0)
+    except asyncio.TimeoutError:
+        logger.warning("Caller has not subscribed to the agent track yet; greeting anyway")
     
     if ctx.room.isconnected:
         logger.info(f"VERIFIED: Room is connected. Attempting to say greeting: {cfg['greeting']}")
         try:
             # Disable interruptions for the INTRO to ensure it's heard
-            session.say(cfg["greeting"], allow_interruptions=False)
+            clients.greet(session, persona_key, allow_interruptions=False)
             logger.info("--> session.say() CALLED AND RETURNED. Audio should be flowing.")
         except Exception as e:
             logger.error(f"Failed to say greeting: {e}")
@@ -128,23 +266,24 @@ async def entrypoint(ctx: JobContext):
                             logger.warning(f"Aborting swap: Room not connected.")
                             return
 
-                        # Create entirely new agent with the NEW VOICE
-                        new_agent = create_voice_agent(new_persona)
-                        
-                        # Update session to use the new agent pipeline
-                        session.update_agent(new_agent)
-                        
-                        # Clear history
-                        await new_agent.update_chat_ctx(llm.ChatContext())
-                        
-                        # Say new persona-specific greeting
-                        new_cfg = persona_config.get(new_persona, persona_config["grandma"])
-                        
-                        # Use a small delay to ensure update is registered
-                        await asyncio.sleep(0.5)
+                        new_cfg = PERSONA_CONFIG.get(new_persona, PERSONA_CONFIG["grandma"])
+                        started = time.perf_counter()
+                        if PERSONA_SWAP_MODE == "full":
+                            # Create entirely new agent with the NEW VOICE
+                            new_agent = create_voice_agent(new_persona)
+                            session.update_agent(new_agent)
+                            await new_agent.update_chat_ctx(llm.ChatContext())
+                            # Give the new activity time to start before speaking
+                            await asyncio.sleep(0.5)
+                        else:
+                            await clients.swap(session.current_agent, new_persona)
+                            # Cut off whatever the old persona was still saying
+                            session.interrupt(force=True)
+                        logger.info(f"Persona swap ({PERSONA_SWAP_MODE}) took {(time.perf_counter() - started) * 1000:.1f}ms")
+
                         if ctx.room.isconnected:
                             logger.info(f"Swapping to voice: {new_cfg['voice']}")
-                            session.say(new_cfg["greeting"], allow_interruptions=True)
+                            clients.greet(session, new_persona, allow_interruptions=True)
                         
                         persona_key = new_persona
                         logger.info(f"SWAP COMPLETE: {new_persona} with voice {new_cfg['voice']}")
@@ -170,7 +309,14 @@ async def entrypoint(ctx: JobContext):
     # Wait for completion
     logger.info("Agent is now in the wait_for_disconnect loop. Staying alive.")
     await ctx.room.wait_for_disconnect()
+    await finish_call()
     logger.info("Agent job finished (room disconnected).")
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
+    cli.run_app(WorkerOptions(
+        entrypoint_fnc=entrypoint,
+        prewarm_fnc=prewarm,
+        # Report CPU + active calls so LiveKit stops sending calls before VAD saturates
+        load_fnc=WorkerLoad(),
+        load_threshold=WORKER_LOAD_THRESHOLD,
+    ))
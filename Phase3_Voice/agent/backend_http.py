@@ -0,0 +1,47 @@
+import asyncio
+import os
+
+import aiohttp
+
+# One pooled keep-alive HTTP session per worker process for calls to the
+# Vigilante backend (LLM turns, transcript intel). Reusing it skips the TCP
+# (and TLS) handshake on every turn; every request gets bounded timeouts so a
+# stuck backend can't hold a call open.
+#
+#   VIGILANTE_API_URL=http://localhost:8000   backend base URL
+#   VIGILANTE_API_KEY=...                     x-api-key for the backend
+#   BACKEND_MAX_CONNECTIONS=32                pooled connections per process
+
+VIGILANTE_API_URL = os.getenv("VIGILANTE_API_URL", "http://localhost:8000").rstrip("/")
+VIGILANTE_API_KEY = os.getenv("VIGILANTE_API_KEY", "meowdj@32")
+BACKEND_MAX_CONNECTIONS = int(os.getenv("BACKEND_MAX_CONNECTIONS", "32"))
+
+# Short requests (transcript batches)
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=5, connect=2)
+# Streamed replies: bounded wait for the connection and between chunks, and a
+# cap on the whole turn
+STREAM_TIMEOUT = aiohttp.ClientTimeout(total=30, connect=2, sock_read=10)
+
+_session = None
+_session_loop = None
+
+
+def backend_session() -> aiohttp.ClientSession:
+    """
+    The process-wide session, created on first use in the running loop.
+    """
+    global _session, _session_loop
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        connector = aiohttp.TCPConnector(limit=BACKEND_MAX_CONNECTIONS, keepalive_timeout=60,
+                                         ttl_dns_cache=300)
+        _session = aiohttp.ClientSession(connector=connector, timeout=REQUEST_TIMEOUT)
+        _session_loop = loop
+    return _session
+
+
+async def close_backend_session():
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
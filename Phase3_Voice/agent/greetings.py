@@ -0,0 +1,147 @@
+import asyncio
+import hashlib
+import logging
+import os
+import wave
+
+import aiohttp
+from livekit import rtc
+from livekit.plugins import deepgram
+
+logger = logging.getLogger("greetings")
+
+# Pre-rendered persona lines.
+#
+# The fixed lines each persona opens with are synthesized once per worker
+# process (in prewarm) and kept in memory as PCM, so a call's greeting is
+# pushed into the room track as soon as the session starts, with no TTS
+# round-trip on the call-setup path. Rendered lines are also written to disk
+# as WAV, keyed by voice+text, so a restarted worker loads them without
+# calling Deepgram. A line that isn't cached (render failed, text changed) is
+# spoken through live TTS as before.
+#
+#   GREETING_CACHE_DIR=~/.cache/vigilante/greetings   where rendered WAVs live
+#   GREETING_RENDER_TIMEOUT=6    seconds prewarm may spend rendering; keep it
+#                                under the worker's 10s process-init timeout;
+#                                0 only loads what is already on disk
+
+GREETING_CACHE_DIR = os.path.expanduser(
+    os.getenv("GREETING_CACHE_DIR", "~/.cache/vigilante/greetings"))
+GREETING_RENDER_TIMEOUT = float(os.getenv("GREETING_RENDER_TIMEOUT", "6"))
+
+FRAME_MS = 20
+
+
+class GreetingCache:
+    """
+    voice+text -> rendered rtc.AudioFrame, in memory and on disk.
+    """
+    def __init__(self, cache_dir: str = GREETING_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._audio = {}
+
+    @staticmethod
+    def _key(voice: str, text: str) -> str:
+        return hashlib.sha1(f"{voice}\n{text}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.wav")
+
+    def get(self, voice: str, text: str) -> rtc.AudioFrame:
+        """
+        The rendered line, or None if it was never rendered.
+        """
+        key = self._key(voice, text)
+        frame = self._audio.get(key)
+        if frame is None:
+            frame = self._load(key)
+            if frame is not None:
+                self._audio[key] = frame
+        return frame
+
+    def _load(self, key: str) -> rtc.AudioFrame:
+        try:
+            with wave.open(self._path(key), "rb") as f:
+                return rtc.AudioFrame(
+                    data=f.readframes(f.getnframes()),
+                    sample_rate=f.getframerate(),
+                    num_channels=f.getnchannels(),
+                    samples_per_channel=f.getnframes(),
+                )
+        except (OSError, EOFError, wave.Error):
+            return None
+
+    def _store(self, key: str, frame: rtc.AudioFrame):
+        self._audio[key] = frame
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = self._path(key) + ".tmp"
+            with wave.open(tmp, "wb") as f:
+                f.setnchannels(frame.num_channels)
+                f.setsampwidth(2)
+                f.setframerate(frame.sample_rate)
+                f.writeframes(frame.data.tobytes())
+            os.replace(tmp, self._path(key))
+        except OSError as e:
+            logger.warning(f"Could not write greeting cache {self.cache_dir}: {e}")
+
+    async def render(self, lines: list, timeout: float = GREETING_RENDER_TIMEOUT) -> int:
+        """
+        Synthesizes the (voice, text) lines that aren't cached yet, all at
+        once, on a private HTTP session. Returns how many were rendered.
+        """
+        missing = [(voice, text) for voice, text in dict.fromkeys(lines)
+                   if self.get(voice, text) is None]
+        if not missing or timeout <= 0:
+            return 0
+
+        async with aiohttp.ClientSession() as http:
+            voices = {voice: deepgram.TTS(model=voice, http_session=http) for voice, _ in missing}
+
+            async def one(voice: str, text: str) -> bool:
+                try:
+                    frame = await voices[voice].synthesize(text).collect()
+                except Exception as e:
+                    logger.warning(f"Greeting render failed for {voice}: {e}")
+                    return False
+                self._store(self._key(voice, text), frame)
+                return True
+
+            tasks = [asyncio.ensure_future(one(voice, text)) for voice, text in missing]
+            done, pending = await asyncio.wait(tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+                logger.warning(f"Greeting render timed out for {len(pending)} line(s)")
+            return sum(1 for task in done if task.result())
+
+    def prewarm(self, lines: list):
+        """
+        Loads/renders the lines from a sync context (JobProcess prewarm, which
+        runs before the process starts its event loop).
+        """
+        try:
+            rendered = asyncio.run(self.render(lines))
+        except Exception as e:
+            logger.warning(f"Greeting prewarm failed: {e}")
+            return
+        cached = sum(1 for voice, text in lines if self.get(voice, text) is not None)
+        logger.info(f"Greetings ready: {cached}/{len(lines)} cached ({rendered} rendered now)")
+
+
+async def audio_frames(frame: rtc.AudioFrame):
+    """
+    A rendered line as the 20ms frames an audio track is fed with.
+    """
+    step = frame.sample_rate * FRAME_MS // 1000
+    width = 2 * frame.num_channels
+    data = frame.data.cast("B")
+    for start in range(0, frame.samples_per_channel, step):
+        chunk = data[start * width:(start + step) * width]
+        yield rtc.AudioFrame(
+            data=chunk,
+            sample_rate=frame.sample_rate,
+            num_channels=frame.num_channels,
+            samples_per_channel=len(chunk) // width,
+        )
@@ -0,0 +1,96 @@
+import asyncio
+import logging
+
+import aiohttp
+
+from backend_http import VIGILANTE_API_KEY, VIGILANTE_API_URL, backend_session
+
+logger = logging.getLogger("intel-stream")
+
+# Streams what the scammer says on a call to the backend for intel extraction.
+#
+# Only finalized STT transcripts are sent (one small POST per utterance at
+# most, batched when several are waiting), never audio frames, so the cost on
+# the audio path is one queue put per utterance. The backend keeps the
+# per-call state and, when the call ends, sends the intel through the same
+# GUVI callback path as the text webhook. Requests go over the worker's
+# pooled backend session (backend_http).
+
+MAX_BATCH = 20
+
+
+class TranscriptIntelStream:
+    """
+    One per call. push() is non-blocking; close() flushes and finalizes the call.
+    """
+    def __init__(self, session_id: str, api_url: str = VIGILANTE_API_URL, api_key: str = VIGILANTE_API_KEY):
+        self.session_id = session_id
+        self.url = f"{api_url}/voice/transcript"
+        self.headers = {"x-api-key": api_key}
+        self._queue = asyncio.Queue()
+        self._unsent = []        # segments from a failed POST, resent with the next one
+        self._task = None
+        self._closed = False
+        self.sent = 0
+        self.intel = {}          # latest intel snapshot from the backend
+
+    def push(self, text: str):
+        if self._closed or not text or not text.strip():
+            return
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        self._queue.put_nowait(text)
+
+    async def _run(self):
+        while True:
+            text = await self._queue.get()
+            if text is None:
+                return
+            segments = [text]
+            while len(segments) < MAX_BATCH and not self._queue.empty():
+                nxt = self._queue.get_nowait()
+                if nxt is None:
+                    self._queue.put_nowait(None)
+                    break
+                segments.append(nxt)
+            await self._post(segments, final=False)
+
+    async def _post(self, segments: list, final: bool, stats: dict = None) -> bool:
+        segments = self._unsent + segments
+        if not segments and not final:
+            return True
+        payload = {"sessionId": self.session_id, "segments": segments, "final": final}
+        if stats:
+            payload["stats"] = stats
+        try:
+            async with backend_session().post(self.url, json=payload, headers=self.headers) as resp:
+                if resp.status == 200:
+                    data = await resp.json()
+                    self.intel = data.get("intelligence") or self.intel
+                    self.sent += len(segments)
+                    self._unsent = []
+                    return True
+                logger.error(f"Transcript intel POST failed {resp.status}: {await resp.text()}")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Transcript intel POST failed: {e}")
+        self._unsent = segments
+        return False
+
+    async def close(self, *, timeout: float = 10.0, stats: dict = None):
+        """
+        Sends what is left with final=true so the backend emits the callback.
+        `stats` (call-level counters) rides along on the final post.
+        Takes no positional arguments, so it can be a job shutdown callback
+        (LiveKit passes the shutdown reason to callbacks that accept one).
+        """
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            if self._task is not None:
+                self._queue.put_nowait(None)
+                await asyncio.wait_for(self._task, timeout)
+            await asyncio.wait_for(self._post([], final=True, stats=stats), timeout)
+            logger.info(f"Call intel finalized for {self.session_id}: {self.sent} segments")
+        except asyncio.TimeoutError:
+            logger.error(f"Call intel finalize timed out for {self.session_id}")
@@ -0,0 +1,136 @@
+import logging
+import os
+
+from livekit.agents import TurnHandlingOptions
+from livekit.agents.voice import Agent
+
+logger = logging.getLogger("speculation")
+
+# Speculative replies.
+#
+# With SPECULATIVE_REPLIES on, the session starts generating a reply as soon
+# as STT finalizes a segment of the caller's speech, while end-of-turn
+# detection is still waiting out its silence window (LiveKit's preemptive
+# generation). If the turn ends on the same transcript the draft is already
+# underway and is played at once; if the caller kept talking it is cancelled
+# and redrafted from the longer transcript, at most SPECULATIVE_MAX_RETRIES
+# times per turn and not past SPECULATIVE_MAX_SPEECH seconds of speech.
+#
+# SpeculationStats counts, per call, drafts that were played (hits), drafts
+# thrown away (misses) and the LLM tokens the misses cost. The totals go to
+# the backend with the call's final transcript post and show up in /metrics.
+# A reply is known to be a draft when the caller's turn ends
+# (SpeculativeAgent.on_user_turn_completed): LiveKit only picks the draft to
+# play after that hook, so any reply still unscheduled there is a draft.
+#
+#   SPECULATIVE_REPLIES=1        0 waits for end of turn before calling the LLM
+#   SPECULATIVE_MAX_RETRIES=3    drafts per caller turn
+#   SPECULATIVE_MAX_SPEECH=10    seconds of caller speech after which it stops drafting
+
+SPECULATIVE_REPLIES = os.getenv("SPECULATIVE_REPLIES", "1") == "1"
+SPECULATIVE_MAX_RETRIES = int(os.getenv("SPECULATIVE_MAX_RETRIES", "3"))
+SPECULATIVE_MAX_SPEECH = float(os.getenv("SPECULATIVE_MAX_SPEECH", "10"))
+
+
+def turn_handling() -> TurnHandlingOptions:
+    return TurnHandlingOptions(preemptive_generation={
+        "enabled": SPECULATIVE_REPLIES,
+        "preemptive_tts": False,
+        "max_retries": SPECULATIVE_MAX_RETRIES,
+        "max_speech_duration": SPECULATIVE_MAX_SPEECH,
+    })
+
+
+class SpeculationStats:
+    """
+    Hit/miss and wasted-token counters for one call's AgentSession.
+    """
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.wasted_prompt_tokens = 0
+        self.wasted_completion_tokens = 0
+        self._drafts = {}        # speech id -> "pending" / "hit" / "miss"
+        self._unsorted = {}      # speech id -> replies created since the last turn ended
+        self._tokens = {}        # speech id -> [prompt, completion] seen before the draft resolved
+
+    def attach(self, session):
+        session.on("speech_created", self._on_speech_created)
+        # Deprecated upstream, but the only event with tokens per speech id
+        session.on("metrics_collected", self._on_metrics)
+
+    def _on_speech_created(self, ev):
+        if ev.source == "generate_reply":
+            self._unsorted[ev.speech_handle.id] = ev.speech_handle
+            ev.speech_handle.add_done_callback(self._on_reply_done)
+
+    def end_turn(self):
+        """
+        Sorts the replies created during the caller's turn. Ordinary replies
+        are scheduled as they are created; drafts wait for the turn to end.
+        """
+        for speech_id, handle in self._unsorted.items():
+            if handle.scheduled:
+                self._tokens.pop(speech_id, None)
+            else:
+                self._drafts[speech_id] = "pending"
+        self._unsorted.clear()
+
+    def _on_reply_done(self, handle):
+        if self._unsorted.pop(handle.id, None) is not None:
+            if handle.scheduled:
+                self._tokens.pop(handle.id, None)
+                return
+            # Replaced by a newer draft before the turn ended
+        elif self._drafts.get(handle.id) != "pending":
+            return
+        # Played (even if later interrupted) only if the turn ended on its transcript
+        outcome = "hit" if handle.scheduled else "miss"
+        self._drafts[handle.id] = outcome
+        tokens = self._tokens.pop(handle.id, None)
+        if outcome == "hit":
+            self.hits += 1
+        else:
+            self.misses += 1
+            if tokens:
+                self._waste(*tokens)
+
+    def _on_metrics(self, ev):
+        m = ev.metrics
+        if getattr(m, "type", None) != "llm_metrics":
+            return
+        outcome = self._drafts.get(m.speech_id)
+        if outcome == "miss":
+            self._waste(m.prompt_tokens, m.completion_tokens)
+        elif outcome == "pending" or m.speech_id in self._unsorted:
+            tokens = self._tokens.setdefault(m.speech_id, [0, 0])
+            tokens[0] += m.prompt_tokens
+            tokens[1] += m.completion_tokens
+
+    def _waste(self, prompt: int, completion: int):
+        self.wasted_prompt_tokens += prompt
+        self.wasted_completion_tokens += completion
+
+    def to_dict(self) -> dict:
+        drafts = self.hits + self.misses
+        return {
+            "drafts": drafts,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / drafts, 3) if drafts else None,
+            "wastedPromptTokens": self.wasted_prompt_tokens,
+            "wastedCompletionTokens": self.wasted_completion_tokens,
+        }
+
+
+class SpeculativeAgent(Agent):
+    """
+    Agent that tells the call's SpeculationStats when a caller turn ends.
+    """
+    def __init__(self, *, speculation: SpeculationStats, **kwargs):
+        super().__init__(**kwargs)
+        self._speculation = speculation
+
+    async def on_user_turn_completed(self, turn_ctx, new_message):
+        # Must not await: LiveKit picks the draft in the same step this returns
+        self._speculation.end_turn()
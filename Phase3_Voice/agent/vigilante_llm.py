@@ -1,99 +1,165 @@
-from livekit.agents import llm
-import aiohttp
+import asyncio
 import json
 import logging
+import re
+import time
+
+import aiohttp
+from livekit.agents import DEFAULT_API_CONNECT_OPTIONS, APIConnectOptions, llm, utils
+
+from backend_http import STREAM_TIMEOUT, VIGILANTE_API_KEY, VIGILANTE_API_URL, backend_session
 
 logger = logging.getLogger("vigilante-llm")
 
+# LLM bridge to the Vigilante backend: each turn is POSTed to /webhook/stream
+# (the SSE version of /webhook) over the worker's pooled session, and the
+# reply is handed to the voice pipeline a sentence at a time as the tokens
+# arrive, so TTS starts on the first clause while the rest is generated.
+# Long sentences are cut at a comma/semicolon once they pass MAX_CLAUSE_CHARS.
+
+FALLBACK_REPLY = "I'm having trouble connecting."
+MAX_CLAUSE_CHARS = 80
+
+# End of a sentence: terminal punctuation (plus closing quotes) then a space
+_SENTENCE_END_RE = re.compile(r"[.!?…।]+[\"')\]]*\s+")
+_CLAUSE_END_RE = re.compile(r"[,;:—]\s+")
+
+
+def split_ready(buffer: str) -> tuple:
+    """
+    (text ready to speak, rest) for a growing reply: everything up to the last
+    complete sentence, or clause once the buffer gets long.
+    """
+    cut = 0
+    for m in _SENTENCE_END_RE.finditer(buffer):
+        cut = m.end()
+    if not cut and len(buffer) > MAX_CLAUSE_CHARS:
+        for m in _CLAUSE_END_RE.finditer(buffer):
+            cut = m.end()
+    return buffer[:cut], buffer[cut:]
+
+
 class VigilanteLLM(llm.LLM):
-    def __init__(self, api_url, api_key, session_id):
-        # Initialize parent
+    def __init__(self, api_url: str = VIGILANTE_API_URL, api_key: str = VIGILANTE_API_KEY, session_id: str = None):
         super().__init__()
         self.api_url = api_url
         self.api_key = api_key
-        self.session_id = session_id
+        self.session_id = session_id or utils.shortuuid("voice-")
+        # api_url is the backend base URL, or (as callers used to pass) its /webhook endpoint
+        base = api_url.rstrip("/")
+        for suffix in ("/webhook/stream", "/webhook"):
+            if base.endswith(suffix):
+                base = base[:-len(suffix)]
+                break
+        self.url = f"{base}/webhook/stream"
+        self.headers = {"x-api-key": api_key, "Accept": "text/event-stream"}
+
+    @property
+    def model(self) -> str:
+        return "vigilante-backend"
+
+    @property
+    def provider(self) -> str:
+        return "vigilante"
 
-    async def chat(
+    def chat(
         self,
+        *,
         chat_ctx: llm.ChatContext,
-        fnc_ctx: llm.FunctionContext | None = None,
-        temperature: float | None = None,
-        n: int | None = None,
-        parallel_tool_calls: bool | None = None,
-    ) -> llm.LLMStream:
-        
-        # 1. Convert context to API format
-        history = []
-        user_msg = None
-        
-        # chat_ctx.messages contains the history
-        # We need to skip the last message if it is the current user prompt (logic varies by SDK, usually it IS included)
-        # We'll treat the last message from user as the "message" payload
-        
-        ordered_msgs = chat_ctx.messages
-        # Find the last user message
-        last_user_idx = -1
-        for i in range(len(ordered_msgs) -1, -1, -1):
-            if ordered_msgs[i].role == llm.ChatRole.USER:
-                last_user_idx = i
-                break
-        
-        if last_user_idx != -1:
-            user_msg = ordered_msgs[last_user_idx].text
-            # All previous messages are history
-            # But we must preserve order.
-            # API expects: conversationHistory = [ {sender:..., text:...} ... ]
-            
-            # Helper to map role
-            def map_role(r):
-                return "scammer" if r == llm.ChatRole.USER else "user"
-
-            for i in range(last_user_idx):
-                msg = ordered_msgs[i]
-                if msg.text:
-                    history.append({
-                        "sender": map_role(msg.role),
-                        "text": msg.text,
-                        "timestamp": 1234567890 # Placeholder
-                    })
-        
-        if not user_msg:
-             return llm.LLMStream(self._simulate_stream("..."))
-
-        # 2. Call API
-        payload = {
-            "sessionId": self.session_id,
-            "message": {
-                "sender": "scammer",
-                "text": user_msg,
-                "timestamp": 1770005528731
-            },
-            "conversationHistory": history
+        tools: list | None = None,
+        conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS,
+        **kwargs,
+    ) -> "VigilanteStream":
+        return VigilanteStream(self, chat_ctx=chat_ctx, tools=tools or [], conn_options=conn_options)
+
+
+class VigilanteStream(llm.LLMStream):
+    def __init__(self, llm_: VigilanteLLM, **kwargs):
+        super().__init__(llm_, **kwargs)
+        # Never retry once part of the reply has been spoken
+        self._retry_on_chunk_sent = False
+        self._id = utils.shortuuid("vigilante_")
+
+    def _payload(self) -> dict:
+        """
+        The /webhook request for this turn: the last caller message, with the
+        messages before it as conversationHistory.
+        """
+        messages = [m for m in self._chat_ctx.messages() if m.role in ("user", "assistant") and m.text_content]
+        last_user = next((i for i in range(len(messages) - 1, -1, -1) if messages[i].role == "user"), None)
+        if last_user is None:
+            return None
+
+        def entry(msg) -> dict:
+            return {
+                "sender": "scammer" if msg.role == "user" else "user",
+                "text": msg.text_content,
+                "timestamp": int(msg.created_at * 1000),
+            }
+
+        message = entry(messages[last_user])
+        message["timestamp"] = int(time.time() * 1000)
+        return {
+            "sessionId": self._llm.session_id,
+            "message": message,
+            "conversationHistory": [entry(m) for m in messages[:last_user]],
         }
-        
-        headers = {"x-api-key": self.api_key}
-        
-        logger.info(f"Sending to API: {user_msg}")
-        
-        reply = "I'm having trouble connecting."
-        
+
+    def _send(self, text: str):
+        if text.strip():
+            self._event_ch.send_nowait(llm.ChatChunk(
+                id=self._id, delta=llm.ChoiceDelta(role="assistant", content=text)))
+
+    async def _run(self):
+        payload = self._payload()
+        if payload is None:
+            self._send("...")
+            return
+
+        logger.info(f"Sending to API: {payload['message']['text']}")
+        buffer = ""
+        spoken = False
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(self.api_url, json=payload, headers=headers) as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        reply = data.get("reply", "I didn't hear that.")
-                        logger.info(f"API Reply: {reply}")
-                    else:
-                        txt = await resp.text()
-                        logger.error(f"API Error {resp.status}: {txt}")
-        except Exception as e:
-            logger.error(f"API Exception: {e}")
-
-        # 3. Return Stream
-        return llm.LLMStream(self._simulate_stream(reply))
-
-    async def _simulate_stream(self, text):
-        # Yield the text as a single chunk (or we could split it)
-        # LiveKit TTS handles full sentences well.
-        yield llm.ChatChunk(choices=[llm.Choice(delta=llm.ChoiceDelta(content=text, role=llm.ChatRole.ASSISTANT))])
+            async with backend_session().post(self._llm.url, json=payload, headers=self._llm.headers,
+                                              timeout=STREAM_TIMEOUT) as resp:
+                if resp.status != 200:
+                    logger.error(f"API Error {resp.status}: {await resp.text()}")
+                else:
+                    async for event, data in _sse_events(resp):
+                        if event == "reply":
+                            buffer += data.get("delta", "")
+                            ready, buffer = split_ready(buffer)
+                            if ready:
+                                self._send(ready)
+                                spoken = True
+                        elif event == "final":
+                            # Nothing streamed (e.g. the backend fell back): use the full reply
+                            if not spoken and not buffer.strip():
+                                buffer = data.get("reply") or ""
+                            logger.info(f"API Reply: {data.get('reply')}")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"API Exception: {e!r}")
+        except json.JSONDecodeError as e:
+            logger.error(f"Bad event from API: {e}")
+
+        if buffer.strip():
+            self._send(buffer)
+        elif not spoken:
+            self._send(FALLBACK_REPLY)
+
+
+async def _sse_events(resp: aiohttp.ClientResponse):
+    """
+    (event, data dict) pairs from a text/event-stream response.
+    """
+    event, data = "message", []
+    async for raw in resp.content:
+        line = raw.decode("utf-8").rstrip("\r\n")
+        if not line:
+            if data:
+                yield event, json.loads("\n".join(data))
+            event, data = "message", []
+        elif line.startswith("event:"):
+            event = line[6:].strip()
+        elif line.startswith("data:"):
+            data.append(line[5:].lstrip())
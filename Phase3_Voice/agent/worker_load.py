@@ -0,0 +1,63 @@
+import logging
+import os
+import threading
+
+from livekit.agents import utils
+from livekit.agents.utils.hw import get_cpu_monitor
+
+logger = logging.getLogger("worker-load")
+
+# Load reporting for job admission.
+#
+# Every call runs Silero VAD on the caller's audio in real time. Past a few
+# calls per core, inference falls behind and every call on the worker starts
+# to answer and barge in late. The worker reports
+#
+#   load = max(CPU average, WORKER_LOAD_THRESHOLD * active calls / call cap)
+#
+# to LiveKit, so it reads as full (and new calls are routed to another worker,
+# or rejected) once either the CPU or the call cap reaches the threshold.
+#
+#   WORKER_CALLS_PER_CORE=4      concurrent calls per CPU core; measure with
+#                                benchmarks/soak_calls.py on the target machine
+#                                (VAD alone keeps up to ~8/core there, at 100%
+#                                CPU; 4 leaves room for the rest of the job)
+#   WORKER_MAX_CALLS=0           hard cap per worker, 0 = cores x calls per core
+#   WORKER_LOAD_THRESHOLD=0.75   load at which the worker stops taking calls
+
+WORKER_CALLS_PER_CORE = float(os.getenv("WORKER_CALLS_PER_CORE", "4"))
+WORKER_MAX_CALLS = int(os.getenv("WORKER_MAX_CALLS", "0"))
+WORKER_LOAD_THRESHOLD = float(os.getenv("WORKER_LOAD_THRESHOLD", "0.75"))
+
+
+class WorkerLoad:
+    """
+    load_fnc for WorkerOptions. The CPU sampler thread starts on the first
+    call, so only the main worker process (which reports load) runs it.
+    """
+    def __init__(self, calls_per_core: float = WORKER_CALLS_PER_CORE, max_calls: int = WORKER_MAX_CALLS,
+                 threshold: float = WORKER_LOAD_THRESHOLD):
+        self.cpu = get_cpu_monitor()
+        self.threshold = threshold
+        self.max_calls = max_calls or max(1, int(self.cpu.cpu_count() * calls_per_core))
+        self._avg = utils.MovingAverage(5)   # 5 x 0.5s samples
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _sample(self):
+        while True:
+            cpu = self.cpu.cpu_percent(interval=0.5)
+            with self._lock:
+                self._avg.add_sample(cpu)
+
+    def compute(self, cpu: float, active_calls: int) -> float:
+        return min(1.0, max(cpu, self.threshold * active_calls / self.max_calls))
+
+    def __call__(self, worker) -> float:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._sample, daemon=True, name="voice_load_monitor")
+            self._thread.start()
+            logger.info(f"Admitting up to {self.max_calls} calls (load threshold {self.threshold})")
+        with self._lock:
+            cpu = self._avg.get_avg()
+        return self.compute(cpu, len(worker.active_jobs))
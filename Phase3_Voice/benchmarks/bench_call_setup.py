@@ -0,0 +1,127 @@
+# Call-setup cost of the voice worker: per-job time and memory to build the
+# agent pipeline, before (everything built per job and per persona swap) and
+# after prewarm (VAD/LLM loaded once per process, STT/TTS reused within a job).
+#
+#   python benchmarks/bench_call_setup.py [--calls 20] [--swaps 3]
+#
+# Runs offline: no LiveKit/Deepgram/Groq traffic, only object construction and
+# the Silero model load (greetings are only loaded if already rendered to
+# disk). Dummy API keys are set if none are configured.
+# Also times one persona swap in each PERSONA_SWAP_MODE: "full" builds a new
+# Agent, "light" re-voices the running one from the job's TTS pool (the
+# LiveKit activity restart that "full" adds on a live call is not included).
+# Memory is the Python heap (tracemalloc); each extra Silero load also holds
+# an ONNX runtime session in native memory that is not counted here.
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+AGENT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "agent")
+sys.path.insert(0, AGENT_DIR)
+os.environ.setdefault("DEEPGRAM_API_KEY", "bench")
+os.environ.setdefault("GROQ_API_KEY", "bench")
+os.environ.setdefault("GREETING_RENDER_TIMEOUT", "0")
+
+from livekit.agents.voice import Agent
+from livekit.plugins import deepgram, groq, silero
+
+import agent as voice_agent
+
+PERSONAS = list(voice_agent.PERSONA_CONFIG)
+
+
+def legacy_agent(key: str) -> Agent:
+    """
+    The pre-prewarm create_voice_agent, kept as the "before" baseline.
+    """
+    cfg = voice_agent.PERSONA_CONFIG.get(key, voice_agent.PERSONA_CONFIG["grandma"])
+    return Agent(
+        stt=deepgram.STT(),
+        llm=groq.LLM(model="llama-3.3-70b-versatile", temperature=0.5),
+        tts=deepgram.TTS(model=cfg["voice"]),
+        vad=silero.VAD.load(),
+        instructions=voice_agent.get_persona(key),
+    )
+
+
+def run_calls(setup, calls: int, swaps: int) -> dict:
+    """
+    setup() -> build(persona) for one job; each call builds the first persona
+    then swaps `swaps` times. Returns per-call ms and memory figures.
+    """
+    times = []
+    keep = []   # jobs alive at once, like concurrent calls in one process
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    for i in range(calls):
+        started = time.perf_counter()
+        build = setup()
+        agents = [build(PERSONAS[(i + s) % len(PERSONAS)]) for s in range(swaps + 1)]
+        times.append((time.perf_counter() - started) * 1000)
+        keep.append(agents)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    times.sort()
+    return {
+        "setup_ms_p50": times[len(times) // 2],
+        "setup_ms_max": times[-1],
+        "kb_per_call": (current - base) / calls / 1024,
+        "peak_kb": (peak - base) / 1024,
+    }
+
+
+async def time_swaps(clients, swaps: int) -> dict:
+    """
+    Median ms of one persona swap, full (new Agent) vs light (in place).
+    """
+    agent = clients.agent(PERSONAS[0])
+    results = {}
+    for mode in ("full", "light"):
+        times = []
+        for s in range(1, swaps * 10 + 1):
+            key = PERSONAS[s % len(PERSONAS)]
+            started = time.perf_counter()
+            if mode == "full":
+                clients.agent(key)
+            else:
+                await clients.swap(agent, key)
+            times.append((time.perf_counter() - started) * 1000)
+        times.sort()
+        results[mode] = times[len(times) // 2]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--swaps", type=int, default=3, help="persona hot-swaps per call")
+    args = parser.parse_args()
+
+    silero.VAD.load()   # import-time/model-file warm-up for both sides
+
+    before = run_calls(lambda: legacy_agent, args.calls, args.swaps)
+
+    proc = SimpleNamespace(userdata={}, pid=os.getpid())
+    started = time.perf_counter()
+    voice_agent.prewarm(proc)
+    prewarm_ms = (time.perf_counter() - started) * 1000
+    after = run_calls(lambda: voice_agent.VoiceClients(proc).agent, args.calls, args.swaps)
+
+    print(f"{args.calls} calls x (1 start + {args.swaps} swaps)   prewarm once per process: {prewarm_ms:.0f}ms\n")
+    print(f"{'':<10}{'setup p50':>12}{'setup max':>12}{'KB/call':>10}{'peak KB':>10}")
+    for label, r in (("before", before), ("after", after)):
+        print(f"{label:<10}{r['setup_ms_p50']:>10.1f}ms{r['setup_ms_max']:>10.1f}ms"
+              f"{r['kb_per_call']:>10.0f}{r['peak_kb']:>10.0f}")
+    swap = asyncio.run(time_swaps(voice_agent.VoiceClients(proc), args.swaps))
+    print(f"\npersona swap p50: full {swap['full']:.2f}ms, light {swap['light']:.2f}ms")
+    print(f"setup speedup x{before['setup_ms_p50'] / max(after['setup_ms_p50'], 1e-6):.1f}, "
+          f"memory per call x{before['kb_per_call'] / max(after['kb_per_call'], 1e-6):.1f} smaller")
+
+
+if __name__ == "__main__":
+    main()
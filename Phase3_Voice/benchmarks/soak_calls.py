@@ -0,0 +1,146 @@
+# Soak test: how many concurrent calls one CPU core can carry before the
+# per-call audio work falls behind real time.
+#
+#   python benchmarks/soak_calls.py [--max-calls 16] [--seconds 15] [--lag-budget 0.1]
+#
+# Each simulated call is its own process, like a job under the worker's
+# process executor: it loads Silero VAD once (prewarm) and streams 48kHz
+# caller audio through it in 20ms frames at real-time pace, which is the
+# CPU-bound part of a live call (STT, LLM and TTS run remotely). A call's lag
+# is how far VAD output trails the audio pushed so far; once the cores are
+# saturated it grows without bound and turn detection/barge-in go late for
+# every call on the worker. The ramp doubles the call count until p95 lag
+# exceeds --lag-budget and reports the last passing level per core, the
+# figure WORKER_CALLS_PER_CORE (agent/worker_load.py) should be set from.
+# Runs offline; no LiveKit/Deepgram/Groq traffic.
+
+import argparse
+import asyncio
+import multiprocessing as mp
+import os
+import sys
+import time
+
+import numpy as np
+import psutil
+
+AGENT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "agent")
+sys.path.insert(0, AGENT_DIR)
+
+SAMPLE_RATE = 48000
+FRAME_MS = 20
+WARMUP_S = 1.0
+
+
+def caller_audio(seconds: float, seed: int) -> np.ndarray:
+    """
+    Alternating ~1.5s "speech" (noisy harmonics) and ~1s silence, int16.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    voiced = sum(np.sin(2 * np.pi * f * t) / (i + 1) for i, f in enumerate((140, 280, 420, 900)))
+    voiced = voiced * (0.5 + 0.5 * np.sin(2 * np.pi * 4 * t)) + rng.normal(0, 0.05, t.size)
+    gate = (t % 2.5) < 1.5
+    audio = np.where(gate, voiced * 0.3, rng.normal(0, 0.005, t.size))
+    return (np.clip(audio, -1, 1) * 32767).astype(np.int16)
+
+
+async def run_call(seconds: float, seed: int) -> list:
+    from livekit import rtc
+    from livekit.plugins import silero
+
+    vad = silero.VAD.load()
+    stream = vad.stream()
+    audio = caller_audio(seconds, seed)
+    step = SAMPLE_RATE * FRAME_MS // 1000
+    lags = []
+
+    async def push():
+        for i, offset in enumerate(range(0, audio.size - step + 1, step)):
+            # Real-time pace on an absolute schedule: a late loop pushes the
+            # backlog at once, as the room's audio stream would deliver it
+            delay = started + i * FRAME_MS / 1000 - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            stream.push_frame(rtc.AudioFrame(audio[offset:offset + step].tobytes(), SAMPLE_RATE, 1, step))
+        stream.end_input()
+
+    started = time.perf_counter()
+    pusher = asyncio.create_task(push())
+    async for ev in stream:
+        if ev.type.name == "INFERENCE_DONE" and ev.timestamp >= WARMUP_S:
+            lags.append(max(0.0, time.perf_counter() - started - ev.timestamp))
+    await pusher
+    await stream.aclose()
+    return lags
+
+
+def call_process(seconds: float, seed: int, ready, go, results):
+    from livekit.plugins import silero
+    silero.VAD.load()   # model load stays out of the timed window
+    ready.put(seed)
+    go.wait()
+    results.put(asyncio.run(run_call(seconds, seed)))
+
+
+def soak(calls: int, seconds: float) -> dict:
+    ctx = mp.get_context("spawn")
+    ready, results, go = ctx.Queue(), ctx.Queue(), ctx.Event()
+    procs = [ctx.Process(target=call_process, args=(seconds, i, ready, go, results), daemon=True)
+             for i in range(calls)]
+    for p in procs:
+        p.start()
+    for _ in procs:
+        ready.get()
+    psutil.cpu_percent(None)
+    go.set()
+    lags = [results.get() for _ in procs]
+    cpu = psutil.cpu_percent(None) / 100
+    for p in procs:
+        p.join()
+    per_call_p95 = [float(np.percentile(l, 95)) for l in lags if l]
+    flat = np.concatenate([l for l in lags if l])
+    return {
+        "calls": calls,
+        "cpu": cpu,
+        "lag_p50": float(np.percentile(flat, 50)),
+        "lag_p95": float(np.percentile(flat, 95)),
+        "worst_call_p95": max(per_call_p95),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-calls", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=15)
+    parser.add_argument("--lag-budget", type=float, default=0.1, help="max p95 VAD lag in seconds")
+    args = parser.parse_args()
+
+    from worker_load import WORKER_CALLS_PER_CORE, WorkerLoad
+    load = WorkerLoad()
+    cores = load.cpu.cpu_count()
+
+    print(f"{cores:g} core(s), {args.seconds:g}s per step, lag budget {args.lag_budget * 1000:.0f}ms")
+    print(f"\n{'calls':>6}{'cpu':>7}{'lag p50':>10}{'lag p95':>10}{'worst call':>12}{'reported load':>15}")
+    passed = 0
+    calls = 1
+    while calls <= args.max_calls:
+        r = soak(calls, args.seconds)
+        ok = r["worst_call_p95"] <= args.lag_budget
+        reported = load.compute(r["cpu"], calls)
+        print(f"{calls:>6}{r['cpu']:>7.0%}{r['lag_p50'] * 1000:>8.0f}ms{r['lag_p95'] * 1000:>8.0f}ms"
+              f"{r['worst_call_p95'] * 1000:>10.0f}ms{reported:>15.2f}{'' if ok else '  OVER BUDGET'}")
+        if not ok:
+            break
+        passed = calls
+        calls *= 2
+
+    if passed:
+        print(f"\nmax concurrent calls within budget: {passed} ({passed / cores:.1f} per core); "
+              f"WORKER_CALLS_PER_CORE is {WORKER_CALLS_PER_CORE:g}")
+    else:
+        print("\neven one call exceeds the lag budget on this machine")
+
+
+if __name__ == "__main__":
+    main()